@@ -63,11 +63,18 @@ const RaceResults = () => {
           'Content-Type': 'application/json',
           'Authorization': `Bearer ${token}`
         },
-        body: JSON.stringify(values)
+        // The time entered is the athlete's own, stored on their entry for the race
+        body: JSON.stringify({
+          race_name: values.race_name,
+          date: values.date,
+          distance: values.distance,
+          completion_time: values.time
+        })
       });
 
       if (!response.ok) {
-        throw new Error('Failed to add race');
+        const body = await response.json().catch(() => ({}));
+        throw new Error(body.message || 'Failed to add race');
       }
       const data = await response.json();
       setRaces(prevRaces => [...prevRaces, data]); // Update races through context
@@ -121,7 +128,7 @@ const RaceResults = () => {
         {races.length > 0 ? (
           races.map((race) => (
             <li className='results-list-items' key={race.id}>
-              {race.race_name} on {race.date} - Distance: {race.distance}, Time: {race.time}
+              {race.race_name} on {race.date} - Distance: {race.distance}, Time: {race.finish_time}
             </li>
           ))
         ) : (
@@ -6,13 +6,32 @@ from flask_restful import Api, Resource
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 from flask_bcrypt import Bcrypt
+from sqlalchemy import select, delete
 from config import db, app, serializer
-from models import Athlete, Activity, Race, RaceParticipation
-from utils.email_utils import send_reset_email  # Ensure this utility is implemented
+from models import Athlete, Activity, Race, RaceParticipation, TrainingRollup
+from utils.email_utils import send_welcome_email, send_reset_email
+from utils.mail_queue import mail_queue
+from utils.account_deletion import athlete_purger, tombstone_athlete
+from utils.metrics import request_metrics
+from utils.password_hashing import PasswordHashingBusy
+from utils.loaders import loaders_for
+from utils.current_athlete import get_current_athlete, load_current_athlete, forget_athlete
+from utils.conditional import RACES_KEY, athlete_key, bump_versions, conditional
+from utils.pagination import encode_cursor, decode_cursor, parse_limit
+from utils.activity_import import iter_csv_rows, import_activities, validate_row, CSVImportError
+from utils.results_import import import_results
+from utils.race_units import parse_distance, distance_range, normalize_race_name
+from utils.race_catalogue import DEFAULT_SUGGESTIONS, MAX_SUGGESTIONS, get_or_create_race, race_index
+from utils.leaderboards import DEFAULT_TOP, MAX_TOP, DEFAULT_NEIGHBOURS, MAX_NEIGHBOURS, race_leaderboard, distance_leaderboard
+from utils.heatmap import today_key, heatmap_range, daily_minutes
+from utils.analytics import get_analytics, recompute_all
+from utils.rollups import PERIODS, record_activity, rebuild_rollups
+from utils.json_encoding import output_json
+from utils.activity_search import search_activities, rebuild_search_index, MAX_SEARCH_OFFSET
+from utils.read_models import activity_page, athlete_races, athlete_participations, all_athletes
+from utils.streaming import STREAM_BATCH_SIZE, stream_json_array, stream_ndjson, stream_csv, streaming_response
 from datetime import datetime, timedelta
-import os
-import sendgrid
-from sendgrid.helpers.mail import Mail
+import click
 
 # JWT and Bcrypt initialization
 jwt = JWTManager(app)
@@ -22,15 +41,34 @@ bcrypt = Bcrypt(app)
 CORS(app, resources={r"/*": {
     "origins": ["http://localhost:3000"],
     "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    "allow_headers": ["Content-Type", "Authorization"],
+    "allow_headers": ["Content-Type", "Authorization", "If-None-Match", "If-Modified-Since"],
     "supports_credentials": True
 }})
 
 # Set up database migration
 migrate = Migrate(app, db)
 
-# Initialize API
+# Outbound mail is delivered by background workers from the outbox table
+mail_queue.init_app(app)
+
+# Deleted accounts are tombstoned by the request and purged in batches by a background thread
+athlete_purger.init_app(app)
+
+# Race-name autocomplete index, updated as new races are committed
+race_index.init_app(app)
+
+# Route latency, status and SQL timing, served at /metrics when METRICS_TOKEN is set; slow statements go to the slow-query log
+with app.app_context():
+    request_metrics.init_app(app, db.engine)
+
+# Initialize API; resources encode with the shared fast JSON encoder
 api = Api(app)
+api.representation('application/json')(output_json)
+
+@app.errorhandler(PasswordHashingBusy)
+def handle_password_hashing_busy(e):
+    # Back-pressure from the password hashing pool on plain routes such as login and register
+    return jsonify({"message": e.description}), e.code, {'Retry-After': str(e.retry_after)}
 
 @app.before_request
 def handle_options():
@@ -38,31 +76,17 @@ def handle_options():
         response = make_response()
         response.headers['Access-Control-Allow-Origin'] = 'http://localhost:3000'
         response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, If-None-Match, If-Modified-Since'
         return response
 
 @app.after_request
 def after_request(response):
     response.headers['Access-Control-Allow-Origin'] = 'http://localhost:3000'
     response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
+    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, If-None-Match, If-Modified-Since'
+    response.headers['Access-Control-Expose-Headers'] = 'X-Next-Cursor, X-Next-Offset, ETag, Last-Modified'
     return response
 
-def send_welcome_email(user_email):
-    sg = sendgrid.SendGridAPIClient(api_key=os.getenv('SENDGRID_API_KEY'))
-    email_content = Mail(
-        from_email='billychorey@gmail.com',
-        to_emails=user_email,
-        subject="Welcome to Sweat Junkies!",
-        plain_text_content=f"Hi {user_email}, welcome to Sweat Junkies! We're glad to have you.",
-        html_content=f"<strong>Hi {user_email}, welcome to Sweat Junkies! We're glad to have you.</strong>"
-    )
-    try:
-        response = sg.send(email_content)
-        print(f"Email sent to {user_email}, Status Code: {response.status_code}")
-    except Exception as e:
-        print(f"Error sending email: {str(e)}")
-
 # Register route
 @app.route('/api/register', methods=['POST'])
 def register():
@@ -87,10 +111,10 @@ def register():
     )
     new_athlete.set_password(password)
     db.session.add(new_athlete)
-    db.session.commit()
 
-    # Send welcome email after successful registration
+    # Queue the welcome email in the same transaction; it is sent in the background after commit
     send_welcome_email(email)
+    db.session.commit()
 
     return jsonify({"message": "User registered successfully"}), 201
 
@@ -108,13 +132,18 @@ def login():
     email = data.get('email')
     password = data.get('password')
 
-    user = Athlete.query.filter_by(email=email).first()
+    user = Athlete.query.options(*loaders_for('login')).filter_by(email=email).first()
     if not user:
         return jsonify({"message": "Email not found"}), 401  # Return specific message for email not found
 
     if not user.check_password(password):
         return jsonify({"message": "Incorrect password"}), 401  # Return specific message for incorrect password
 
+    # Transparently upgrade hashes made with older work-factor settings
+    if user.password_needs_rehash():
+        user.set_password(password)
+        db.session.commit()
+
     # Create an access token with a 1-day expiry
     access_token = create_access_token(identity={'email': user.email, 'id': user.id}, expires_delta=timedelta(days=1))
     return jsonify({"token": access_token, "user": user.to_dict()}), 200
@@ -122,9 +151,9 @@ def login():
 # AthleteProfileResource
 class AthleteProfileResource(Resource):
     @jwt_required()
+    @conditional(athlete_key)
     def get(self):
-        current_user_email = get_jwt_identity()['email']
-        athlete = Athlete.query.filter_by(email=current_user_email).first()
+        athlete = load_current_athlete(*loaders_for('athlete_profile'))
 
         if not athlete:
             return {'message': 'Athlete profile not found'}, 404
@@ -133,8 +162,7 @@ class AthleteProfileResource(Resource):
 
     @jwt_required()
     def put(self):
-        current_user_email = get_jwt_identity()['email']
-        athlete = Athlete.query.filter_by(email=current_user_email).first()
+        athlete = load_current_athlete()
 
         if not athlete:
             return {'message': 'Athlete profile not found'}, 404
@@ -144,72 +172,300 @@ class AthleteProfileResource(Resource):
         athlete.first_name = data.get('first_name', athlete.first_name)
         athlete.email = data.get('email', athlete.email)
 
+        # Names also appear in the shared race listing
+        bump_versions(athlete_key(athlete.id), RACES_KEY)
         db.session.commit()
+        forget_athlete(athlete.id)
 
         return athlete.to_dict(), 200
 
     @jwt_required()
     def delete(self):
-        current_user_email = get_jwt_identity()['email']
-        athlete = Athlete.query.filter_by(email=current_user_email).first()
+        athlete = load_current_athlete()
 
         if not athlete:
             return {'message': 'Athlete profile not found'}, 404
 
+        if athlete_purger.asynchronous:
+            # Returns straight away; activities and rollups are purged in batches after commit
+            tombstone_athlete(athlete)
+            bump_versions(athlete_key(athlete.id), RACES_KEY)
+            db.session.commit()
+            forget_athlete(athlete.id)
+            return {'message': 'Athlete profile scheduled for deletion'}, 202
+
+        # One DELETE; the ON DELETE CASCADE foreign keys remove the athlete's rows
         db.session.delete(athlete)
+        bump_versions(athlete_key(athlete.id), RACES_KEY)
         db.session.commit()
+        forget_athlete(athlete.id)
 
         return {'message': 'Athlete profile deleted'}, 200
 
+# AthleteAnalyticsResource serves personal records, pace trends and race predictions
+class AthleteAnalyticsResource(Resource):
+    @jwt_required()
+    @conditional(athlete_key)
+    def get(self):
+        athlete = get_current_athlete()
+
+        if not athlete:
+            return {'message': 'Athlete not found'}, 404
+
+        return get_analytics(athlete.id), 200
+
+# AthleteExportResource streams an athlete's full history for download
+EXPORT_CSV_HEADER = ['record_type', 'date', 'description', 'duration', 'race_name', 'distance', 'finish_time', 'completion_time']
+
+class AthleteExportResource(Resource):
+    @jwt_required()
+    def get(self):
+        athlete = get_current_athlete()
+
+        if not athlete:
+            return {'message': 'Athlete not found'}, 404
+
+        athlete_id = athlete.id
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in ('ndjson', 'csv'):
+            return {'message': 'Invalid export format. Use ndjson or csv.'}, 400
+
+        # Core selects read through a server-side cursor, so rows are never all in memory at once
+        activities = (
+            select(Activity.date, Activity.description, Activity.duration)
+            .where(Activity.athlete_id == athlete_id)
+            .order_by(Activity.date, Activity.id)
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        races = (
+            select(Race.date, Race.race_name, Race.distance, Race.finish_time, RaceParticipation.completion_time)
+            .join(RaceParticipation, RaceParticipation.race_id == Race.id)
+            .where(RaceParticipation.athlete_id == athlete_id)
+            .order_by(Race.date, RaceParticipation.id)
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+
+        def records():
+            for date, description, duration in db.session.execute(activities):
+                yield {'record_type': 'activity', 'date': date, 'description': description, 'duration': duration}
+            for date, race_name, distance, finish_time, completion_time in db.session.execute(races):
+                yield {
+                    'record_type': 'race',
+                    'date': date,
+                    'race_name': race_name,
+                    'distance': distance,
+                    'finish_time': finish_time,
+                    'completion_time': completion_time
+                }
+
+        headers = {'Content-Disposition': f'attachment; filename=sweatjunkies-export.{export_format}'}
+        if export_format == 'csv':
+            rows = ([record.get(column) for column in EXPORT_CSV_HEADER] for record in records())
+            return streaming_response(stream_csv(EXPORT_CSV_HEADER, rows), 'text/csv', headers)
+        return streaming_response(stream_ndjson(records()), 'application/x-ndjson', headers)
+
 # ActivityResource for managing activities
 class ActivityResource(Resource):
     @jwt_required()
+    @conditional(athlete_key)
     def get(self):
-        current_user_email = get_jwt_identity()['email']
-        athlete = Athlete.query.filter_by(email=current_user_email).first()
+        athlete = get_current_athlete()
 
         if not athlete:
             return {'message': 'Athlete not found'}, 404
 
-        activities = Activity.query.filter_by(athlete_id=athlete.id).all()
-        return [activity.to_dict() for activity in activities], 200
+        # Keyset pagination, newest first: ?limit=&cursor=&from=YYYY-MM-DD&to=YYYY-MM-DD.
+        # Without limit or cursor every matching activity is returned, as before paging existed.
+        paged = 'limit' in request.args or 'cursor' in request.args
+        try:
+            limit = parse_limit(request.args.get('limit')) if paged else None
+            cursor = request.args.get('cursor')
+            date_from = request.args.get('from')
+            date_to = request.args.get('to')
+            cursor = decode_cursor(cursor) if cursor else None
+            date_from = datetime.strptime(date_from, '%Y-%m-%d').date() if date_from else None
+            date_to = datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else None
+        except ValueError:
+            return {'message': 'Invalid pagination parameters. Use limit, cursor, and YYYY-MM-DD dates for from/to.'}, 400
+
+        if not paged:
+            return activity_page(athlete, None, date_from=date_from, date_to=date_to), 200
+
+        # Fetch one extra row to learn whether another page follows
+        activities = activity_page(athlete, limit + 1, cursor, date_from, date_to)
+        headers = {}
+        if len(activities) > limit:
+            activities = activities[:limit]
+            headers['X-Next-Cursor'] = encode_cursor(activities[-1].date, activities[-1].id)
+
+        return activities, 200, headers
 
     @jwt_required()
     def post(self):
-        current_user_email = get_jwt_identity()['email']
-        athlete = Athlete.query.filter_by(email=current_user_email).first()
+        athlete = get_current_athlete()
 
         if not athlete:
             return {'message': 'Athlete not found'}, 404
 
-        data = request.get_json()
-        
-        # Convert date from string to datetime.date object
+        # Same rules as the bulk import, checked before anything reaches the rollups
         try:
-            date = datetime.strptime(data['date'], '%Y-%m-%d').date()
-        except ValueError:
-            return {'message': 'Invalid date format. Use YYYY-MM-DD.'}, 400
+            date, description, duration = validate_row(request.get_json(silent=True))
+        except ValueError as e:
+            return {'message': str(e)}, 400
 
         new_activity = Activity(
-            description=data['description'],
-            duration=data['duration'],
+            description=description,
+            duration=duration,
             date=date,
             athlete_id=athlete.id
         )
         
         db.session.add(new_activity)
+        db.session.flush()
+        record_activity(new_activity)  # Keep weekly/monthly rollups current in the same transaction
+        bump_versions(athlete_key(athlete.id))
         db.session.commit()
         return new_activity.to_dict(), 201
 
+# Ranked full-text search over the caller's activity descriptions: ?q=hill repeats&limit=&offset=
+class ActivitySearchResource(Resource):
+    @jwt_required()
+    @conditional(athlete_key)
+    def get(self):
+        athlete = get_current_athlete()
+
+        if not athlete:
+            return {'message': 'Athlete not found'}, 404
+
+        # Ranked results page by offset: a relevance score is no stable keyset
+        try:
+            limit = parse_limit(request.args.get('limit'))
+            offset = int(request.args.get('offset', 0))
+            if not 0 <= offset <= MAX_SEARCH_OFFSET:
+                raise ValueError('offset out of range')
+        except ValueError:
+            return {'message': f'Invalid pagination parameters. Use limit and an offset from 0 to {MAX_SEARCH_OFFSET}.'}, 400
+
+        activities = search_activities(athlete, request.args.get('q', ''), limit + 1, offset)
+        headers = {}
+        if len(activities) > limit:
+            activities = activities[:limit]
+            headers['X-Next-Offset'] = str(offset + limit)
+
+        return activities, 200, headers
+
+# ActivityImportResource bulk-loads activities from a JSON array or a CSV upload
+class ActivityImportResource(Resource):
+    @jwt_required()
+    def post(self):
+        athlete = get_current_athlete()
+
+        if not athlete:
+            return {'message': 'Athlete not found'}, 404
+
+        athlete_id = athlete.id
+
+        if 'file' in request.files:
+            rows = iter_csv_rows(request.files['file'].stream)
+        elif request.mimetype == 'text/csv':
+            rows = iter_csv_rows(request.stream)
+        else:
+            rows = request.get_json(silent=True)
+            if not isinstance(rows, list):
+                return {'message': 'Send a JSON array of activities or a CSV file with date,description,duration columns.'}, 400
+
+        try:
+            imported, error_count, errors = import_activities(athlete_id, rows)
+        except CSVImportError as e:
+            db.session.rollback()
+            return {'message': str(e), 'line': e.line}, 400
+        if not imported and error_count:
+            db.session.rollback()
+            return {'message': 'No valid activities to import', 'imported': 0, 'error_count': error_count, 'errors': errors}, 400
+
+        bump_versions(athlete_key(athlete_id))
+        db.session.commit()
+        return {'imported': imported, 'error_count': error_count, 'errors': errors}, 201
+
+# AthleteSummaryResource serves weekly/monthly training totals from the rollup table
+class AthleteSummaryResource(Resource):
+    @jwt_required()
+    def get(self):
+        athlete = get_current_athlete()
+
+        if not athlete:
+            return {'message': 'Athlete not found'}, 404
+
+        athlete_id = athlete.id
+        period = request.args.get('period', 'week')
+        if period not in PERIODS:
+            return {'message': 'Invalid period. Use week or month.'}, 400
+
+        try:
+            date_from = request.args.get('from')
+            date_to = request.args.get('to')
+            date_from = datetime.strptime(date_from, '%Y-%m-%d').date() if date_from else None
+            date_to = datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else None
+        except ValueError:
+            return {'message': 'Invalid date format. Use YYYY-MM-DD.'}, 400
+
+        query = TrainingRollup.query.filter(
+            TrainingRollup.athlete_id == athlete_id,
+            TrainingRollup.period == period,
+            TrainingRollup.activity_count > 0
+        )
+        if date_from:
+            query = query.filter(TrainingRollup.period_start >= date_from)
+        if date_to:
+            query = query.filter(TrainingRollup.period_start <= date_to)
+
+        rollups = query.order_by(TrainingRollup.period_start, TrainingRollup.activity_type).all()
+        return [rollup.to_dict() for rollup in rollups], 200
+
+# Calendar heatmap: minutes per day as a dense array from `start`, ?from=YYYY-MM-DD&to=YYYY-MM-DD (default: last 365 days)
+class AthleteHeatmapResource(Resource):
+    @jwt_required()
+    @conditional(athlete_key, today_key)
+    def get(self):
+        athlete = get_current_athlete()
+
+        if not athlete:
+            return {'message': 'Athlete not found'}, 404
+
+        athlete_id = athlete.id
+
+        try:
+            date_from = request.args.get('from')
+            date_to = request.args.get('to')
+            date_from = datetime.strptime(date_from, '%Y-%m-%d').date() if date_from else None
+            date_to = datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else None
+        except ValueError:
+            return {'message': 'Invalid date format. Use YYYY-MM-DD.'}, 400
+
+        try:
+            start, end = heatmap_range(date_from, date_to)
+        except ValueError as e:
+            return {'message': str(e)}, 400
+
+        return {'start': start, 'end': end, 'minutes': daily_minutes(athlete_id, start, end)}, 200
+
 class RaceResource(Resource):
     @jwt_required()
+    @conditional(athlete_key)
     def get(self):
         current_user = get_jwt_identity()
         athlete_id = current_user['id']
-        
-        races = db.session.query(Race).join(RaceParticipation).filter(RaceParticipation.athlete_id == athlete_id).all()
-        
-        return [race.to_dict() for race in races], 200
+
+        # Optional ?distance=half marathon&sort=time, served by the numeric columns and their indexes
+        meters_range = None
+        distance = request.args.get('distance')
+        if distance:
+            distance_meters = parse_distance(distance)
+            if distance_meters is None:
+                return {'message': "Invalid distance. Use a number with km, mi or m, e.g. '21.097 km'."}, 400
+            meters_range = distance_range(distance_meters)
+
+        return athlete_races(athlete_id, meters_range, request.args.get('sort') == 'time'), 200
 
     @jwt_required()
     def post(self):
@@ -221,32 +477,96 @@ class RaceResource(Resource):
         except ValueError:
             return {'message': 'Invalid date format. Use YYYY-MM-DD.'}, 400
 
-        current_user_email = get_jwt_identity()['email']
-        athlete = Athlete.query.filter_by(email=current_user_email).first()
+        try:
+            if not normalize_race_name(data.get('race_name')):
+                return {'message': 'Race name is required'}, 400
+        except ValueError as e:
+            return {'message': str(e)}, 400
+
+        athlete = get_current_athlete()
 
         if not athlete:
             return {'message': 'Athlete not found'}, 404
 
-        new_race = Race(
-            race_name=data['race_name'],
-            date=date,
-            distance=data['distance'],
-            finish_time=data.get('finish_time')
-        )
+        # The caller's own time goes on their entry; finish_time is still accepted for it, as before the catalogue
+        completion_time = data.get('completion_time')
+        if completion_time is None:
+            completion_time = data.get('finish_time')
+        elif data.get('finish_time') not in (None, completion_time):
+            return {'message': 'finish_time and completion_time disagree. Send your time as completion_time.'}, 400
 
-        db.session.add(new_race)
+        # The model validators reject distances and times that are not strings
+        try:
+            # Athletes who ran the same event and distance share its catalogue entry
+            race, created = get_or_create_race(data['race_name'], date, data['distance'])
+
+            race_participation = db.session.scalar(
+                select(RaceParticipation).where(RaceParticipation.race_id == race.id, RaceParticipation.athlete_id == athlete.id)
+            )
+            if race_participation is None:
+                race_participation = RaceParticipation(race_id=race.id, athlete_id=athlete.id)
+                db.session.add(race_participation)
+            race_participation.completion_time = completion_time
+        except ValueError as e:
+            db.session.rollback()
+            return {'message': str(e)}, 400
+
+        bump_versions(athlete_key(athlete.id), RACES_KEY)
         db.session.commit()
 
-        race_participation = RaceParticipation(
-            race_id=new_race.id,
-            athlete_id=athlete.id,
-            completion_time=data.get('completion_time')
-        )
+        return race.to_dict(race_participation), 201 if created else 200
 
-        db.session.add(race_participation)
-        db.session.commit()
+# Race name suggestions from the in-memory prefix index: ?q=bost&limit=10
+class RaceAutocompleteResource(Resource):
+    @jwt_required()
+    def get(self):
+        limit = min(max(request.args.get('limit', DEFAULT_SUGGESTIONS, type=int), 1), MAX_SUGGESTIONS)
+        return race_index.search(request.args.get('q', ''), limit), 200
+
+# Leaderboards rank finishers in SQL with window functions: ?top=10&neighbours=2
+def leaderboard_args():
+    top = min(max(int(request.args.get('top', DEFAULT_TOP)), 1), MAX_TOP)
+    neighbours = min(max(int(request.args.get('neighbours', DEFAULT_NEIGHBOURS)), 0), MAX_NEIGHBOURS)
+    return top, neighbours
+
+class RaceLeaderboardResource(Resource):
+    @jwt_required()
+    @conditional(RACES_KEY, athlete_key)
+    def get(self, race_id):
+        athlete = get_current_athlete()
+
+        if not athlete:
+            return {'message': 'Athlete not found'}, 404
+
+        if not db.session.get(Race, race_id):
+            return {'message': 'Race not found'}, 404
+        try:
+            top, neighbours = leaderboard_args()
+        except ValueError:
+            return {'message': 'top and neighbours must be whole numbers'}, 400
+
+        leaderboard = race_leaderboard(race_id, athlete.id, top, neighbours)
+        return dict(leaderboard, race_id=race_id), 200
+
+class DistanceLeaderboardResource(Resource):
+    @jwt_required()
+    @conditional(RACES_KEY, athlete_key)
+    def get(self, distance):
+        athlete = get_current_athlete()
+
+        if not athlete:
+            return {'message': 'Athlete not found'}, 404
+
+        distance_meters = parse_distance(distance)
+        if distance_meters is None:
+            return {'message': "Invalid distance. Use a number with km, mi or m, e.g. '21.097 km'."}, 400
+        try:
+            top, neighbours = leaderboard_args()
+        except ValueError:
+            return {'message': 'top and neighbours must be whole numbers'}, 400
 
-        return new_race.to_dict(), 201
+        leaderboard = distance_leaderboard(distance_meters, athlete.id, top, neighbours)
+        return dict(leaderboard, distance_meters=distance_meters), 200
 
 # UserRacesResource
 class UserRacesResource(Resource):
@@ -254,8 +574,7 @@ class UserRacesResource(Resource):
     def get(self):
         current_user = get_jwt_identity()
         athlete_id = current_user['id']
-        races = db.session.query(Race).join(RaceParticipation).filter(RaceParticipation.athlete_id == athlete_id).all()
-        return [race.to_dict() for race in races], 200
+        return athlete_races(athlete_id), 200
 
 # ForgotPasswordResource for handling password resets
 class ForgotPasswordResource(Resource):
@@ -270,6 +589,7 @@ class ForgotPasswordResource(Resource):
         token = serializer.dumps(email, salt='password-reset-salt')
         reset_link = f'http://localhost:3000/reset-password?token={token}'
         send_reset_email(user.email, reset_link)
+        db.session.commit()
         
         return {'message': 'Password reset email sent'}, 200
 
@@ -294,27 +614,46 @@ class ResetPasswordResource(Resource):
 
 # Resource to list races with participants
 class RacesWithParticipantsResource(Resource):
+    @conditional(RACES_KEY)
     def get(self):
-        races = Race.query.all()
-        response = []
-        for race in races:
-            participants = [f"{rp.athlete.first_name} {rp.athlete.last_name}" for rp in race.race_participations]
-            race_info = {
-                'id': race.id,
-                'race_name': race.race_name,
-                'date': race.date.strftime('%Y-%m-%d'),
-                'distance': race.distance,
-                'finish_time': race.finish_time,
-                'participants': participants
-            }
-            response.append(race_info)
-        return jsonify(response)
+        # One ordered outer join over races, participations and athlete names,
+        # streamed out race by race as the rows arrive
+        query = (
+            select(
+                Race.id, Race.race_name, Race.date, Race.distance, Race.finish_time,
+                Athlete.first_name, Athlete.last_name,
+            )
+            .outerjoin(RaceParticipation, RaceParticipation.race_id == Race.id)
+            .outerjoin(Athlete, Athlete.id == RaceParticipation.athlete_id)
+            .order_by(Race.id, RaceParticipation.id)
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+
+        def races():
+            race_info = None
+            for race_id, race_name, race_date, distance, finish_time, first_name, last_name in db.session.execute(query):
+                if race_info is None or race_info['id'] != race_id:
+                    if race_info is not None:
+                        yield race_info
+                    race_info = {
+                        'id': race_id,
+                        'race_name': race_name,
+                        'date': race_date,
+                        'distance': distance,
+                        'finish_time': finish_time,
+                        'participants': []
+                    }
+                if first_name is not None:
+                    race_info['participants'].append(f"{first_name} {last_name}")
+            if race_info is not None:
+                yield race_info
+
+        return streaming_response(stream_json_array(races()), 'application/json')
 
 # Define your resource classes
 class AthleteResource(Resource):
     def get(self):
-        athletes = Athlete.query.all()
-        return [athlete.to_dict() for athlete in athletes], 200
+        return all_athletes(), 200
 
     def post(self):
         data = request.get_json()
@@ -344,32 +683,137 @@ class RaceParticipationResource(Resource):
         current_user = get_jwt_identity()
         athlete_id = current_user['id']
 
-        participations = RaceParticipation.query.filter_by(athlete_id=athlete_id).all()
-        
-        return [participation.to_dict() for participation in participations], 200
+        return athlete_participations(athlete_id), 200
 
+    # Results ingestion: ?race_id=ID with a CSV of email,completion_time (multipart 'file' or a text/csv body),
+    # or a JSON array of {email, completion_time}. Re-uploading a file updates times instead of duplicating rows.
+    # Organisers may import anyone's results; other athletes only their own row.
     @jwt_required()
     def post(self):
-        # Implement post method to add race participation
-        pass
+        athlete = get_current_athlete()
 
+        if not athlete:
+            return {'message': 'Athlete not found'}, 404
+
+        race_id = request.args.get('race_id', type=int)
+        if race_id is None or db.session.get(Race, race_id) is None:
+            return {'message': 'Race not found. Pass an existing race_id.'}, 404
+
+        is_organizer = db.session.scalar(select(Athlete.is_organizer).where(Athlete.id == athlete.id))
+
+        if 'file' in request.files:
+            rows = iter_csv_rows(request.files['file'].stream)
+        elif request.mimetype == 'text/csv':
+            rows = iter_csv_rows(request.stream)
+        else:
+            rows = request.get_json(silent=True)
+            if not isinstance(rows, list):
+                return {'message': 'Send a CSV file with email,completion_time columns or a JSON array of results.'}, 400
+
+        try:
+            report, athlete_ids = import_results(race_id, rows, only_email=None if is_organizer else athlete.email)
+        except CSVImportError as e:
+            db.session.rollback()
+            return {'message': str(e), 'line': e.line}, 400
+        except PermissionError as e:
+            db.session.rollback()
+            return {'message': str(e)}, 403
+        if not report['imported']:
+            db.session.rollback()
+            return dict(report, message='No results matched an athlete'), 400
+
+        bump_versions(RACES_KEY, *(athlete_key(athlete_id) for athlete_id in athlete_ids))
+        db.session.commit()
+        return report, 201
+
+    # Withdraw the caller from a race: ?race_id=ID
     @jwt_required()
     def delete(self):
-        # Implement delete method for race participation
-        pass
+        athlete = get_current_athlete()
+
+        if not athlete:
+            return {'message': 'Athlete not found'}, 404
+
+        athlete_id = athlete.id
+        race_id = request.args.get('race_id', type=int)
+
+        deleted = db.session.execute(
+            delete(RaceParticipation)
+            .where(RaceParticipation.race_id == race_id, RaceParticipation.athlete_id == athlete_id)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not deleted:
+            return {'message': 'Race participation not found'}, 404
+
+        bump_versions(athlete_key(athlete_id), RACES_KEY)
+        db.session.commit()
+        return {'message': 'Race participation deleted'}, 200
 
 
 # Resource Mappings with /api prefix
 api.add_resource(AthleteResource, '/api/athletes')  # CRUD operations for athletes
 api.add_resource(ActivityResource, '/api/activities')  # CRUD operations for activities
+api.add_resource(ActivitySearchResource, '/api/activities/search')  # Ranked full-text search over activity descriptions
+api.add_resource(ActivityImportResource, '/api/activities/import')  # Bulk activity import (JSON array or CSV)
 api.add_resource(RaceResource, '/api/races')  # CRUD operations for races
+api.add_resource(RaceAutocompleteResource, '/api/races/autocomplete')  # Race name suggestions as the user types
+api.add_resource(RaceLeaderboardResource, '/api/races/<int:race_id>/leaderboard')  # Top finishers of a race plus the caller's rank
+api.add_resource(DistanceLeaderboardResource, '/api/leaderboards/<string:distance>')  # Best times at a distance plus the caller's rank
 api.add_resource(RaceParticipationResource, '/api/race_participations')  # CRUD operations for race participations
 api.add_resource(ForgotPasswordResource, '/api/forgot-password')  # Endpoint for password reset request
 api.add_resource(ResetPasswordResource, '/api/reset-password')  # Endpoint for resetting password
 api.add_resource(AthleteProfileResource, '/api/athlete/profile')  # Athlete profile management
+api.add_resource(AthleteSummaryResource, '/api/athlete/summary')  # Weekly/monthly training totals
+api.add_resource(AthleteHeatmapResource, '/api/athlete/heatmap')  # Minutes per day for the calendar heatmap
+api.add_resource(AthleteAnalyticsResource, '/api/athlete/analytics')  # Personal records, pace trend and predictions
+api.add_resource(AthleteExportResource, '/api/athlete/export')  # Streamed NDJSON/CSV export of an athlete's history
 api.add_resource(RacesWithParticipantsResource, '/api/races_with_participants')  # Get races along with participant names
 api.add_resource(UserRacesResource, '/api/user_races')  # User's specific races
 
+# Backfill command: flask rebuild-rollups [--athlete-id ID]
+@app.cli.command('rebuild-rollups')
+@click.option('--athlete-id', type=int, default=None, help='Only rebuild this athlete\'s rollups.')
+def rebuild_rollups_command(athlete_id):
+    count = rebuild_rollups(athlete_id)
+    print(f'Rebuilt {count} training rollups')
+
+# Delivery command: flask send-outbox (drains due messages without the worker threads)
+@app.cli.command('send-outbox')
+def send_outbox_command():
+    count = mail_queue.deliver_due()
+    print(f'Attempted delivery of {count} queued emails')
+
+# Purge command: flask purge-deleted-athletes (finishes tombstoned account deletions without the background thread)
+@app.cli.command('purge-deleted-athletes')
+def purge_deleted_athletes_command():
+    count = athlete_purger.purge_due()
+    print(f'Purged {count} deleted athletes')
+
+# Role command: flask set-organizer EMAIL [--revoke] (organisers may import results for any athlete)
+@app.cli.command('set-organizer')
+@click.argument('email')
+@click.option('--revoke', is_flag=True, help='Take the organiser role away instead.')
+def set_organizer_command(email, revoke):
+    athlete = Athlete.query.filter(Athlete.email == email, Athlete.deleted_at.is_(None)).first()
+    if athlete is None:
+        raise click.ClickException(f'No athlete with email {email}')
+    athlete.is_organizer = not revoke
+    db.session.commit()
+    print(f'{athlete.email} is {"no longer" if revoke else "now"} a race organiser')
+
+# Batch analytics command, e.g. after a bulk import: flask recompute-analytics [--athlete-id ID]
+@app.cli.command('recompute-analytics')
+@click.option('--athlete-id', type=int, default=None, help='Only recompute this athlete\'s analytics.')
+def recompute_analytics_command(athlete_id):
+    count = recompute_all([athlete_id] if athlete_id is not None else None)
+    print(f'Recomputed analytics for {count} athletes')
+
+# Search index command: flask rebuild-search-index (after restoring a backup or editing activities outside the triggers)
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    count = rebuild_search_index()
+    print(f'Rebuilt the search index over {count} activities')
+
 # Root route
 @app.route('/')
 def index():
@@ -0,0 +1,151 @@
+# benchmarks/activity_search.py
+"""Compare FTS5 activity search with the LIKE queries it replaces.
+
+Run from the server directory:
+
+    python -m benchmarks.activity_search --athletes 2000 --activities-per-athlete 500
+
+Unless DATABASE_URL is set, a throwaway SQLite file is used. Activities get
+short free-text descriptions and are bulk-inserted before the search index
+exists; the index is then built with rebuild_search_index(), and one more
+batch is inserted through the sync triggers to show their write cost.
+Each query term is then searched for a sample of athletes three ways:
+
+- fts: search_activities(), the code behind /api/activities/search
+- like_scoped: LIKE '%term%' within the athlete's rows, through the
+  (athlete_id, date, id) index
+- like_global: LIKE '%term%' over every activity, the full table scan an
+  unscoped search would do
+
+Latency percentiles in milliseconds, index build time and size are printed
+as JSON.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+WORDS = [
+    'easy', 'tempo', 'long', 'recovery', 'hill', 'repeats', 'interval', 'track', 'trail', 'river',
+    'morning', 'evening', 'lunch', 'commute', 'rain', 'snow', 'heat', 'windy', 'run', 'ride',
+    'swim', 'laps', 'yoga', 'strength', 'core', 'legs', 'row', 'hike', 'walk', 'stretch',
+    'sprints', 'fartlek', 'threshold', 'marathon', 'pace', 'negative', 'split', 'park', 'club', 'group',
+]
+QUERIES = ['hill repeats', 'tempo', 'fartlek', 'rain run', 'thresh']
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda fraction: round(samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000, 3)
+    return {'p50_ms': pick(0.5), 'p95_ms': pick(0.95), 'max_ms': round(samples[-1] * 1000, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark FTS5 activity search against LIKE.')
+    parser.add_argument('--athletes', type=int, default=400)
+    parser.add_argument('--activities-per-athlete', type=int, default=500)
+    parser.add_argument('--sample-athletes', type=int, default=50)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'search.db')
+    os.environ.setdefault('DATABASE_URL', f'sqlite:///{path}')
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+    from datetime import date, timedelta
+    from types import SimpleNamespace
+    from sqlalchemy import insert, select, text, func
+    from app import app, db
+    from models import Athlete, Activity
+    from utils.activity_search import search_activities, rebuild_search_index, search_terms
+    from utils.read_models import ACTIVITY_COLUMNS
+
+    rng = random.Random(args.seed)
+
+    def description():
+        return ' '.join(rng.sample(WORDS, rng.randint(2, 6))).capitalize()
+
+    def activity_rows(athlete_ids, count):
+        start = date(2020, 1, 1)
+        return [
+            {'description': description(), 'duration': rng.randint(15, 150),
+             'date': start + timedelta(days=rng.randrange(1500)), 'athlete_id': athlete_id}
+            for athlete_id in athlete_ids for _ in range(count)
+        ]
+
+    results = {'activities': args.athletes * args.activities_per_athlete}
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            raise SystemExit('This benchmark measures the SQLite FTS5 index; point DATABASE_URL at a SQLite file.')
+        db.create_all()
+        # Load without the index first, as an existing database would be before the migration
+        for statement in ('DROP TRIGGER activities_fts_ai', 'DROP TRIGGER activities_fts_ad',
+                          'DROP TRIGGER activities_fts_au', 'DROP TABLE activities_fts'):
+            db.session.execute(text(statement))
+        first_id = (db.session.scalar(select(func.max(Athlete.id))) or 0) + 1
+        athlete_ids = list(range(first_id, first_id + args.athletes))
+        db.session.execute(insert(Athlete.__table__), [
+            {'id': athlete_id, 'first_name': 'Search', 'last_name': str(athlete_id),
+             'email': f'search{athlete_id}@bench.test', 'password_hash': 'x'}
+            for athlete_id in athlete_ids
+        ])
+        rows = activity_rows(athlete_ids, args.activities_per_athlete)
+        started = time.perf_counter()
+        db.session.execute(insert(Activity.__table__), rows)
+        db.session.commit()
+        results['insert_without_index_rows_per_second'] = round(len(rows) / (time.perf_counter() - started))
+        size_before = os.path.getsize(path) if os.path.exists(path) else None
+
+        started = time.perf_counter()
+        rebuild_search_index()
+        results['rebuild_seconds'] = round(time.perf_counter() - started, 2)
+        if size_before is not None:
+            results['index_megabytes'] = round((os.path.getsize(path) - size_before) / 2 ** 20, 1)
+
+        # A further batch goes through the sync triggers
+        extra = activity_rows(athlete_ids[:max(1, len(athlete_ids) // 10)], args.activities_per_athlete)
+        started = time.perf_counter()
+        db.session.execute(insert(Activity.__table__), extra)
+        db.session.commit()
+        results['insert_with_triggers_rows_per_second'] = round(len(extra) / (time.perf_counter() - started))
+
+        sample = rng.sample(athlete_ids, min(args.sample_athletes, len(athlete_ids)))
+        timings = {'fts': [], 'like_scoped': [], 'like_global': []}
+        matches = {'fts': 0, 'like_scoped': 0}
+        for query in QUERIES:
+            terms = search_terms(query)
+            like = [Activity.description.ilike(f'%{term}%') for term in terms]
+            # The global scan is the same for every athlete, so it is timed once per query
+            started = time.perf_counter()
+            db.session.execute(
+                select(*ACTIVITY_COLUMNS).where(*like).order_by(Activity.date.desc()).limit(args.limit)
+            ).all()
+            timings['like_global'].append(time.perf_counter() - started)
+            for athlete_id in sample:
+                athlete = SimpleNamespace(id=athlete_id, first_name='Search', last_name=str(athlete_id))
+                started = time.perf_counter()
+                found = search_activities(athlete, query, args.limit)
+                timings['fts'].append(time.perf_counter() - started)
+                matches['fts'] += len(found)
+
+                started = time.perf_counter()
+                found = db.session.execute(
+                    select(*ACTIVITY_COLUMNS)
+                    .where(Activity.athlete_id == athlete_id, *like)
+                    .order_by(Activity.date.desc(), Activity.id.desc())
+                    .limit(args.limit)
+                ).all()
+                timings['like_scoped'].append(time.perf_counter() - started)
+                matches['like_scoped'] += len(found)
+
+    results['queries'] = {name: percentiles(samples) for name, samples in timings.items()}
+    results['rows_returned'] = matches
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
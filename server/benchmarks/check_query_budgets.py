@@ -0,0 +1,101 @@
+# benchmarks/check_query_budgets.py
+"""Fail when an endpoint issues more SQL statements than its budget allows.
+
+Run from the server directory:
+
+    DB_PROFILE=test python -m benchmarks.check_query_budgets
+
+It exits non-zero on failure and runs in CI (.github/workflows/query-budgets.yml).
+
+A throwaway athlete with a long history is created, every budgeted endpoint is
+requested through the Flask test client, and the athlete is removed again.
+"""
+import sys
+from datetime import date, timedelta
+from flask_jwt_extended import create_access_token
+from app import app, db
+from models import Athlete, Activity, Race, RaceParticipation
+from utils.loaders import QUERY_BUDGETS
+from utils.query_counter import query_budget, QueryBudgetExceeded
+
+FIXTURE_EMAIL = 'query-budget@sweatjunkies.test'
+FIXTURE_PASSWORD = 'budget-password'
+HISTORY_SIZE = 50
+
+ENDPOINTS = {
+    'login': ('POST', '/api/login'),
+    'athlete_profile': ('GET', '/api/athlete/profile'),
+    'athletes': ('GET', '/api/athletes'),
+    'activities': ('GET', '/api/activities'),
+    'activity_search': ('GET', '/api/activities/search?q=run'),
+    'heatmap': ('GET', '/api/athlete/heatmap'),
+    'races': ('GET', '/api/races'),
+    'race_participations': ('GET', '/api/race_participations'),
+    'races_with_participants': ('GET', '/api/races_with_participants'),
+}
+
+
+def create_fixture():
+    athlete = Athlete(first_name='Query', last_name='Budget', email=FIXTURE_EMAIL)
+    athlete.set_password(FIXTURE_PASSWORD)
+    db.session.add(athlete)
+    start = date(2020, 1, 1)
+    for i in range(HISTORY_SIZE):
+        day = start + timedelta(days=i)
+        db.session.add(Activity(description='Run', duration=30 + i % 60, date=day, athlete=athlete))
+        race = Race(race_name=f'Budget Race {i}', date=day, distance='5.0 km', finish_time='00:25:00')
+        db.session.add(race)
+        db.session.add(RaceParticipation(race=race, athlete=athlete, completion_time='00:25:00'))
+    db.session.commit()
+    return athlete
+
+
+def remove_fixture(athlete):
+    races = [rp.race for rp in athlete.race_participations]
+    db.session.delete(athlete)
+    for race in races:
+        db.session.delete(race)
+    db.session.commit()
+
+
+def check_budgets():
+    failures = []
+    athlete = create_fixture()
+    try:
+        token = create_access_token(identity={'email': athlete.email, 'id': athlete.id})
+        headers = {'Authorization': f'Bearer {token}'}
+        client = app.test_client()
+        for name, (method, path) in ENDPOINTS.items():
+            budget = QUERY_BUDGETS[name]
+            # Start every request from an empty identity map, like a fresh worker would.
+            db.session.expire_all()
+            db.session.expunge_all()
+            over_budget = None
+            try:
+                with query_budget(db.engine, budget, name) as counter:
+                    if method == 'POST':
+                        response = client.post(path, json={'email': FIXTURE_EMAIL, 'password': FIXTURE_PASSWORD})
+                    else:
+                        response = client.get(path, headers=headers)
+                    # Streamed bodies only run their queries once they are consumed
+                    response.get_data()
+            except QueryBudgetExceeded as e:
+                over_budget = e
+            status = 'OVER BUDGET' if over_budget else 'ok'
+            print(f'{name:<25} {response.status_code} {counter.count:>3} / {budget:<3} {status}')
+            if over_budget:
+                print(over_budget)
+            if response.status_code >= 400 or over_budget:
+                failures.append(name)
+    finally:
+        remove_fixture(db.session.merge(athlete))
+    return failures
+
+
+if __name__ == '__main__':
+    with app.app_context():
+        db.create_all()
+        failures = check_budgets()
+    if failures:
+        print(f'Query budget check failed for: {", ".join(failures)}')
+        sys.exit(1)
@@ -0,0 +1,219 @@
+# benchmarks/endpoints.py
+"""Endpoint load test: throughput and latency percentiles for every API route.
+
+Run from the server directory:
+
+    python -m benchmarks.endpoints --sizes small,medium --output results.json
+    python -m benchmarks.endpoints --sizes small --compare results.json
+
+For each size a seeded SQLite database is built once under benchmarks/data
+(by seed.py), named after the migration head and seed arguments so that a
+schema change rebuilds it, and the app is pointed at it through DATABASE_URL
+in a child process. Every route is driven twice: sequentially through the Flask test
+client, which isolates handler cost, and by concurrent workers over real
+HTTP against a threaded local server. Results are written as JSON. With
+--compare, p95 latencies are checked against an earlier run and the exit
+status is non-zero when any route regressed by more than --threshold percent.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(SERVER_DIR, 'benchmarks', 'data')
+
+SIZES = {
+    'small': ['--athletes', '100', '--activities-per-athlete', '50', '--races', '20', '--races-per-athlete', '3'],
+    'medium': ['--athletes', '1000', '--activities-per-athlete', '200', '--races', '200', '--races-per-athlete', '5'],
+    'large': ['--athletes', '10000', '--activities-per-athlete', '500', '--races', '2000', '--races-per-athlete', '10', '--workers', str(os.cpu_count() or 1)],
+}
+
+PASSWORD = 'password123'
+
+ROUTES = {
+    'login': ('POST', '/api/login'),
+    'profile': ('GET', '/api/athlete/profile'),
+    'activities': ('GET', '/api/activities'),
+    'heatmap': ('GET', '/api/athlete/heatmap'),
+    'races': ('GET', '/api/races'),
+    'races_with_participants': ('GET', '/api/races_with_participants'),
+    'athletes': ('GET', '/api/athletes'),
+}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, elapsed, errors):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else None,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+    }
+
+
+def schema_fingerprint(size):
+    """Identify a seeded database by the migration head and the seed arguments it was built with."""
+    from alembic.script import ScriptDirectory
+    head = ScriptDirectory(os.path.join(SERVER_DIR, 'migrations')).get_current_head()
+    return hashlib.sha1(' '.join([head, *SIZES[size]]).encode()).hexdigest()[:12]
+
+
+def database_path(size):
+    return os.path.join(DATA_DIR, f'sweatjunkies-{size}-{schema_fingerprint(size)}.db')
+
+
+def build_database(size):
+    """Seed the database for a size once; later runs reuse the file until the schema or seed changes."""
+    path = database_path(size)
+    if os.path.exists(path):
+        return path
+    os.makedirs(DATA_DIR, exist_ok=True)
+    # Databases built for an older schema or other seed arguments would only take up space
+    for stale in glob.glob(os.path.join(DATA_DIR, f'sweatjunkies-{size}*.db')):
+        os.remove(stale)
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{path}')
+    subprocess.run([sys.executable, 'seed.py', '--reset', *SIZES[size]], cwd=SERVER_DIR, env=env, check=True)
+    return path
+
+
+def run_size(requests_per_route, concurrency):
+    """Measure every route against the database DATABASE_URL points at. Runs in the child process."""
+    from werkzeug.serving import make_server
+    from flask_jwt_extended import create_access_token
+    from app import app, db
+    from models import Athlete
+
+    with app.app_context():
+        athlete = db.session.get(Athlete, 1)
+        token = create_access_token(identity={'email': athlete.email, 'id': athlete.id})
+        login_body = {'email': athlete.email, 'password': PASSWORD}
+    headers = {'Authorization': f'Bearer {token}'}
+
+    results = {}
+
+    client = app.test_client()
+    for name, (method, path) in ROUTES.items():
+        latencies, errors = [], 0
+        started = time.perf_counter()
+        for _ in range(requests_per_route):
+            request_started = time.perf_counter()
+            if method == 'POST':
+                response = client.post(path, json=login_body)
+            else:
+                response = client.get(path, headers=headers)
+            response.get_data()
+            latencies.append(time.perf_counter() - request_started)
+            errors += response.status_code >= 400
+        results.setdefault(name, {})['test_client'] = summarize(latencies, time.perf_counter() - started, errors)
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+    try:
+        for name, (method, path) in ROUTES.items():
+            def call(_):
+                body = json.dumps(login_body).encode() if method == 'POST' else None
+                request = urllib.request.Request(base_url + path, data=body, method=method, headers={
+                    **headers, 'Content-Type': 'application/json'
+                })
+                request_started = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(request) as response:
+                        response.read()
+                    failed = False
+                except urllib.error.URLError:
+                    failed = True
+                return time.perf_counter() - request_started, failed
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                outcomes = list(pool.map(call, range(requests_per_route)))
+            elapsed = time.perf_counter() - started
+            results[name]['http'] = summarize(
+                [latency for latency, _ in outcomes], elapsed, sum(failed for _, failed in outcomes)
+            )
+    finally:
+        server.shutdown()
+    return results
+
+
+def compare(current, baseline, threshold):
+    """Print p95 changes against a baseline run and return the regressed routes."""
+    regressions = []
+    for size, routes in current['sizes'].items():
+        for route, modes in routes.items():
+            for mode, stats in modes.items():
+                before = baseline.get('sizes', {}).get(size, {}).get(route, {}).get(mode, {}).get('p95_ms')
+                after = stats['p95_ms']
+                if not before or after is None:
+                    continue
+                change = (after - before) / before * 100
+                flag = ' REGRESSION' if change > threshold else ''
+                print(f'{size:<7} {route:<24} {mode:<12} p95 {before:>9.2f} -> {after:>9.2f} ms ({change:+.1f}%){flag}')
+                if flag:
+                    regressions.append(f'{size}/{route}/{mode}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test every API route against seeded databases.')
+    parser.add_argument('--sizes', default='small', help=f'Comma-separated sizes from: {", ".join(SIZES)}')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per route and mode.')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent HTTP workers.')
+    parser.add_argument('--output', help='Write results JSON to this file.')
+    parser.add_argument('--compare', help='Results JSON from an earlier run to compare against.')
+    parser.add_argument('--threshold', type=float, default=20.0, help='Allowed p95 regression in percent.')
+    parser.add_argument('--run-size', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_size:
+        print(json.dumps(run_size(args.requests, args.concurrency)))
+        return
+
+    results = {'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'requests': args.requests,
+               'concurrency': args.concurrency, 'sizes': {}}
+    for size in args.sizes.split(','):
+        path = build_database(size)
+        env = dict(os.environ, DATABASE_URL=f'sqlite:///{path}')
+        child = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.endpoints', '--run-size', size,
+             '--requests', str(args.requests), '--concurrency', str(args.concurrency)],
+            cwd=SERVER_DIR, env=env, check=True, stdout=subprocess.PIPE, text=True,
+        )
+        results['sizes'][size] = json.loads(child.stdout.strip().splitlines()[-1])
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f'p95 regressions over {args.threshold}%: {", ".join(regressions)}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
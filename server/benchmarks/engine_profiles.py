@@ -0,0 +1,151 @@
+# benchmarks/engine_profiles.py
+"""Concurrent read/write throughput for each engine profile.
+
+Run from the server directory, e.g.:
+
+    python -m benchmarks.engine_profiles --readers 8 --writers 2 --seconds 10
+    python -m benchmarks.engine_profiles --profiles production-postgres --postgres-url postgresql://localhost/bench
+
+Each SQLite profile gets a fresh database file in a temporary directory,
+built with the profile's engine options and pragmas. Reader threads page
+through one athlete's activities while writer threads insert activities one
+transaction at a time. Operations per second, "database is locked" style
+errors and p95 latencies are printed as JSON. The test profile shares a
+single in-memory connection, so it is not benchmarked concurrently.
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+from models import Athlete, Activity
+from utils.engine_profiles import PROFILES, get_profile, install_pragmas
+
+TABLES = [Athlete.__table__, Activity.__table__]
+ATHLETE_ID = 1
+READ_PAGE_SIZE = 50
+
+
+def build_engine(name, url):
+    profile = get_profile(name, url)
+    engine = create_engine(profile.database_url, **profile.engine_options)
+    install_pragmas(engine, profile.pragmas)
+    return engine
+
+
+def prepare(engine, history):
+    Athlete.metadata.drop_all(engine, tables=TABLES[::-1])
+    Athlete.metadata.create_all(engine, tables=TABLES)
+    start = date(2020, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(Athlete.__table__), [{
+            'id': ATHLETE_ID, 'first_name': 'Engine', 'last_name': 'Profile',
+            'email': 'engine-profile@sweatjunkies.test', 'password_hash': 'x',
+        }])
+        conn.execute(insert(Activity.__table__), [
+            {'athlete_id': ATHLETE_ID, 'description': 'Run', 'duration': 30, 'date': start + timedelta(days=i % 2000)}
+            for i in range(history)
+        ])
+
+
+def p95(values):
+    values = sorted(values)
+    return round(values[int(0.95 * (len(values) - 1))] * 1000, 3) if values else None
+
+
+def run(engine, readers, writers, seconds):
+    stats = {'read': [], 'write': [], 'read_errors': 0, 'write_errors': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+    page = (
+        select(Activity.__table__)
+        .where(Activity.athlete_id == ATHLETE_ID)
+        .order_by(Activity.date.desc(), Activity.id.desc())
+        .limit(READ_PAGE_SIZE)
+    )
+
+    def read_loop():
+        latencies, errors = [], 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    conn.execute(page).all()
+                latencies.append(time.perf_counter() - started)
+            except OperationalError:
+                errors += 1
+        with lock:
+            stats['read'].extend(latencies)
+            stats['read_errors'] += errors
+
+    def write_loop():
+        latencies, errors = [], 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(Activity.__table__).values(
+                        athlete_id=ATHLETE_ID, description='Ride', duration=45, date=date.today()
+                    ))
+                latencies.append(time.perf_counter() - started)
+            except OperationalError:
+                errors += 1
+        with lock:
+            stats['write'].extend(latencies)
+            stats['write_errors'] += errors
+
+    threads = [threading.Thread(target=read_loop) for _ in range(readers)]
+    threads += [threading.Thread(target=write_loop) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        'reads_per_second': round(len(stats['read']) / seconds, 1),
+        'writes_per_second': round(len(stats['write']) / seconds, 1),
+        'read_errors': stats['read_errors'],
+        'write_errors': stats['write_errors'],
+        'read_p95_ms': p95(stats['read']),
+        'write_p95_ms': p95(stats['write']),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark concurrent reads and writes per engine profile.')
+    parser.add_argument('--profiles', default='dev,production-sqlite', help=f'Comma-separated from: {", ".join(PROFILES)}')
+    parser.add_argument('--postgres-url', help='Database for the production-postgres profile.')
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--history', type=int, default=10000, help='Activities seeded before the run.')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.profiles.split(','):
+            if name == 'test':
+                print('Skipping test: it shares one in-memory connection between threads')
+                continue
+            if name == 'production-postgres':
+                if not args.postgres_url:
+                    print('Skipping production-postgres: pass --postgres-url')
+                    continue
+                url = args.postgres_url
+            else:
+                url = f'sqlite:///{os.path.join(directory, name + ".db")}'
+            engine = build_engine(name, url)
+            try:
+                prepare(engine, args.history)
+                results[name] = run(engine, args.readers, args.writers, args.seconds)
+            finally:
+                engine.dispose()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
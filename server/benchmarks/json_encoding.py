@@ -0,0 +1,76 @@
+# benchmarks/json_encoding.py
+"""Before/after timing of the JSON response path on large payloads.
+
+Run from the server directory:
+
+    python -m benchmarks.json_encoding --rows 10000 --repeat 20
+
+"before" is the previous path: to_dict() formatting each date with strftime
+and flask-restful encoding with the stdlib json module. "after" is to_dict()
+handing out date objects and utils/json_encoding.py encoding them (orjson
+when installed). Both encode activities and races, and timings are printed
+as JSON with the encoder in use.
+"""
+import argparse
+import json
+import time
+from datetime import date, timedelta
+from models import Athlete, Activity, Race
+from utils import json_encoding
+
+
+def build_rows(count):
+    start = date(2020, 1, 1)
+    athlete = Athlete(id=1, first_name='Json', last_name='Benchmark', email='json-benchmark@sweatjunkies.test')
+    activities = [
+        Activity(id=i, athlete=athlete, description='Running', duration=30 + i % 90, date=start + timedelta(days=i % 2000))
+        for i in range(count)
+    ]
+    races = [
+        Race(id=i, race_name=f'City Run {i}', date=start + timedelta(days=i % 2000), distance='10.0 km', finish_time='00:45:00')
+        for i in range(count)
+    ]
+    return activities, races
+
+
+def legacy_to_dict(row):
+    data = row.to_dict()
+    data['date'] = row.date.strftime('%Y-%m-%d')
+    return data
+
+
+def before(rows):
+    return json.dumps([legacy_to_dict(row) for row in rows]).encode()
+
+
+def after(rows):
+    return json_encoding.dumps_bytes([row.to_dict() for row in rows])
+
+
+def measure(func, rows, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(rows)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return {'median_ms': round(timings[len(timings) // 2] * 1000, 2), 'best_ms': round(timings[0] * 1000, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the old and new JSON response encoding.')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    activities, races = build_rows(args.rows)
+    results = {'rows': args.rows, 'encoder': 'orjson' if json_encoding.orjson else 'json'}
+    for name, rows in (('activities', activities), ('races', races)):
+        assert json.loads(before(rows)) == json.loads(after(rows)), f'{name}: encodings differ'
+        old, new = measure(before, rows, args.repeat), measure(after, rows, args.repeat)
+        results[name] = {'before': old, 'after': new, 'speedup': round(old['median_ms'] / new['median_ms'], 2)}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/login_throughput.py
+"""Measure login throughput through the password hashing pool.
+
+Run from the server directory, e.g.:
+
+    PASSWORD_HASH_WORKERS=4 python -m benchmarks.login_throughput --clients 16 --seconds 10
+
+Concurrent clients post to /api/login through the Flask test client for a
+fixed time. Successful logins per second, logins per second per hashing
+core, and 503 back-pressure responses are printed as JSON.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from app import app, db
+from models import Athlete
+from utils.password_hashing import password_hasher
+
+FIXTURE_EMAIL = 'login-benchmark@sweatjunkies.test'
+FIXTURE_PASSWORD = 'benchmark-password'
+
+
+def run(clients, seconds):
+    counts = {'ok': 0, 'busy': 0, 'error': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client_loop():
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            response = client.post('/api/login', json={'email': FIXTURE_EMAIL, 'password': FIXTURE_PASSWORD})
+            outcome = 'ok' if response.status_code == 200 else 'busy' if response.status_code == 503 else 'error'
+            with lock:
+                counts[outcome] += 1
+
+    threads = [threading.Thread(target=client_loop) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    cores = password_hasher.workers or 1
+    return {
+        'method': password_hasher.method_prefix,
+        'hash_workers': password_hasher.workers,
+        'clients': clients,
+        'seconds': round(elapsed, 2),
+        'logins': counts['ok'],
+        'busy_503': counts['busy'],
+        'errors': counts['error'],
+        'logins_per_second': round(counts['ok'] / elapsed, 2),
+        'logins_per_second_per_core': round(counts['ok'] / elapsed / cores, 2),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        athlete = Athlete.query.filter_by(email=FIXTURE_EMAIL).first()
+        if athlete is None:
+            athlete = Athlete(first_name='Login', last_name='Benchmark', email=FIXTURE_EMAIL)
+            db.session.add(athlete)
+        athlete.set_password(FIXTURE_PASSWORD)
+        db.session.commit()
+        try:
+            print(json.dumps(run(args.clients, args.seconds), indent=2))
+        finally:
+            db.session.delete(athlete)
+            db.session.commit()
+            password_hasher.shutdown()
@@ -0,0 +1,91 @@
+# benchmarks/read_path.py
+"""ORM versus Core read path: time and memory per row for list responses.
+
+Run from the server directory against a seeded database, e.g.:
+
+    DATABASE_URL=sqlite:////abs/path/benchmarks/data/sweatjunkies-medium.db \
+        python -m benchmarks.read_path --rows 10000
+
+"orm" hydrates Activity/Race models (plus the owning athletes) and calls
+to_dict(); "core" selects the same columns into the row dataclasses of
+utils/read_models.py. Each side is timed from query to encoded JSON, and the
+memory still held by its result list is measured with tracemalloc.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+from app import app, db
+from models import Activity, Race, RaceParticipation
+from utils.json_encoding import dumps_bytes
+from utils.read_models import ACTIVITY_COLUMNS, RACE_COLUMNS, ActivityRow, RaceRow
+
+
+def orm_activities(rows):
+    return [activity.to_dict() for activity in Activity.query.order_by(Activity.id).limit(rows)]
+
+
+def core_activities(rows):
+    # Names come from the caller's identity in the real endpoint; a constant keeps the comparison fair
+    return [ActivityRow(*row, 'Athlete Name') for row in db.session.execute(select(*ACTIVITY_COLUMNS).order_by(Activity.id).limit(rows))]
+
+
+# Races as an athlete's list shows them, each with that athlete's own time
+def orm_races(rows):
+    participations = RaceParticipation.query.options(joinedload(RaceParticipation.race)).order_by(RaceParticipation.id)
+    return [rp.race.to_dict(rp) for rp in participations.limit(rows)]
+
+
+def core_races(rows):
+    statement = select(*RACE_COLUMNS).join(Race, Race.id == RaceParticipation.race_id).order_by(RaceParticipation.id)
+    return [RaceRow(*row) for row in db.session.execute(statement.limit(rows))]
+
+
+def measure(func, rows, repeat):
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        dumps_bytes(func(rows))
+        timings.append(time.perf_counter() - started)
+    db.session.expunge_all()
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = func(rows)
+    retained = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(before, 'filename'))
+    tracemalloc.stop()
+    count = len(result)
+    del result
+    db.session.expunge_all()
+
+    timings.sort()
+    return {
+        'rows': count,
+        'median_ms': round(timings[len(timings) // 2] * 1000, 2),
+        'bytes_per_row': round(retained / count) if count else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare ORM and Core list reads.')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    results = {}
+    with app.app_context():
+        for name, orm, core in (('activities', orm_activities, core_activities), ('races', orm_races, core_races)):
+            before, after = measure(orm, args.rows, args.repeat), measure(core, args.rows, args.repeat)
+            results[name] = {
+                'orm': before,
+                'core': after,
+                'speedup': round(before['median_ms'] / after['median_ms'], 2) if after['median_ms'] else None,
+            }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
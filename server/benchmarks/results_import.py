@@ -0,0 +1,102 @@
+# benchmarks/results_import.py
+"""Time a full race-results upload through POST /api/race_participations.
+
+Run from the server directory:
+
+    python -m benchmarks.results_import --finishers 50000
+
+Unless DATABASE_URL is set, a throwaway SQLite file is used. Athletes are
+bulk-inserted, a results CSV (with a share of unknown emails) is written to
+disk and posted as a text/csv stream, then posted again to exercise the
+update path. Elapsed time and rows per second for each upload, and the peak
+Python memory of one more traced upload, are printed as JSON.
+"""
+import argparse
+import csv
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bulk race results ingestion.')
+    parser.add_argument('--finishers', type=int, default=50000)
+    parser.add_argument('--unmatched', type=float, default=0.02, help='Share of rows with unknown emails.')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ.setdefault('DATABASE_URL', f'sqlite:///{os.path.join(directory, "results.db")}')
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+    from datetime import date
+    from sqlalchemy import insert, func, select
+    from flask_jwt_extended import create_access_token
+    from app import app, db
+    from models import Athlete, Race, RaceParticipation
+
+    with app.app_context():
+        db.create_all()
+        first_id = (db.session.scalar(select(func.max(Athlete.id))) or 0) + 1
+        db.session.execute(insert(Athlete.__table__), [
+            {'id': first_id + i, 'first_name': 'Finisher', 'last_name': str(i),
+             'email': f'finisher{first_id + i}@results.test', 'password_hash': 'x', 'is_organizer': i == 0}
+            for i in range(args.finishers)
+        ])
+        race = Race(race_name='Benchmark Marathon', date=date(2024, 4, 21), distance='42.195 km', finish_time='02:05:00')
+        db.session.add(race)
+        db.session.commit()
+        race_id = race.id
+        # The first finisher uploads as the race organiser
+        token = create_access_token(identity={'email': f'finisher{first_id}@results.test', 'id': first_id})
+
+    path = os.path.join(directory, 'results.csv')
+    unmatched_every = int(1 / args.unmatched) if args.unmatched else 0
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['email', 'completion_time'])
+        for i in range(args.finishers):
+            unknown = unmatched_every and i % unmatched_every == 0
+            email = f'nobody{i}@results.test' if unknown else f'finisher{first_id + i}@results.test'
+            seconds = 7500 + i
+            writer.writerow([email, f'{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}'])
+
+    client = app.test_client()
+
+    def upload():
+        with open(path, 'rb') as f:
+            return client.post(
+                f'/api/race_participations?race_id={race_id}', data=f, content_type='text/csv',
+                headers={'Authorization': f'Bearer {token}'},
+            )
+
+    results = {'finishers': args.finishers, 'file_bytes': os.path.getsize(path)}
+    for run in ('insert', 'update'):
+        started = time.perf_counter()
+        response = upload()
+        elapsed = time.perf_counter() - started
+        body = response.get_json()
+        results[run] = {
+            'status': response.status_code,
+            'imported': body.get('imported'),
+            'unmatched': body.get('unmatched_count'),
+            'seconds': round(elapsed, 2),
+            'rows_per_second': round(args.finishers / elapsed),
+        }
+
+    # Memory is traced on a separate upload, since tracemalloc slows everything down
+    tracemalloc.start()
+    upload()
+    results['peak_memory_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+    tracemalloc.stop()
+
+    with app.app_context():
+        results['participations'] = db.session.scalar(
+            select(func.count()).select_from(RaceParticipation).where(RaceParticipation.race_id == race_id)
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
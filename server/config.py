@@ -0,0 +1,44 @@
+# config.py
+import os
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import MetaData
+from itsdangerous import URLSafeTimedSerializer
+from utils.engine_profiles import get_profile, install_pragmas
+from utils.json_encoding import FastJSONProvider
+
+# Engine profile: dev, test, production-sqlite or production-postgres (see utils/engine_profiles.py)
+profile_name = os.getenv('DB_PROFILE', 'dev')
+profile = get_profile(profile_name)
+
+# Instantiate app, set attributes
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = profile.database_url
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = profile.engine_options
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['TESTING'] = profile_name == 'test'
+# Signs sessions, reset links and, unless JWT_SECRET_KEY is set, access tokens.
+# The development fallback is public, so production profiles refuse to start without a real key.
+secret_key = os.getenv('SECRET_KEY')
+if not secret_key:
+    if profile_name.startswith('production'):
+        raise ValueError(f'DB_PROFILE {profile_name!r} needs SECRET_KEY')
+    secret_key = 'dev-secret-key-change-me-in-production'
+app.config['SECRET_KEY'] = secret_key
+app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', app.config['SECRET_KEY'])
+# Tokens carry an {'email', 'id'} identity rather than a string subject
+app.config['JWT_VERIFY_SUB'] = False
+app.json = FastJSONProvider(app)
+
+# Define metadata, instantiate db
+metadata = MetaData(naming_convention={
+    "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
+})
+db = SQLAlchemy(metadata=metadata)
+db.init_app(app)
+
+with app.app_context():
+    install_pragmas(db.engine, profile.pragmas)
+
+# Signs password reset tokens
+serializer = URLSafeTimedSerializer(app.config['SECRET_KEY'])
@@ -0,0 +1,52 @@
+# gunicorn.conf.py
+"""Pre-fork server settings: gunicorn -c gunicorn.conf.py wsgi:app
+
+WEB_CONCURRENCY sets the worker processes (default two per core plus one) and
+WEB_THREADS the threads per worker. The app is imported once in the master and
+forked; each worker then drops the inherited connection pool and opens its own.
+
+    kill -HUP <master>    graceful restart of every worker, after in-flight requests finish
+    kill -USR2 <master>   start a new master on new code; then -WINCH and -QUIT the old one
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('BIND', f"0.0.0.0:{os.getenv('PORT', '5555')}")
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('WEB_THREADS', 4))
+worker_class = 'gthread'
+preload_app = True
+
+timeout = int(os.getenv('WEB_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+# Recycle workers now and then so slow leaks cannot build up; jitter keeps them from restarting together
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Connections must never be shared across processes; close=False leaves the parent's sockets alone
+    from config import app, db
+    with app.app_context():
+        db.engine.dispose(close=False)
+    # Background threads do not survive the fork; start this worker's own so it sweeps
+    # the outbox for mail an earlier worker left undelivered, without waiting for new mail
+    from utils.mail_queue import mail_queue
+    mail_queue.start()
+    # Likewise the purger resumes account purges left behind, when deletion is asynchronous
+    from utils.account_deletion import athlete_purger
+    if athlete_purger.asynchronous:
+        athlete_purger.start()
+
+
+def worker_exit(server, worker):
+    # Let in-flight emails finish; anything undelivered stays in the outbox for the next worker
+    from utils.mail_queue import mail_queue
+    mail_queue.stop()
+    # Unfinished account purges keep their tombstone and are resumed by the next sweep
+    from utils.account_deletion import athlete_purger
+    athlete_purger.stop()
@@ -0,0 +1,26 @@
+"""Add composite index on activities(athlete_id, date, id)
+
+Revision ID: 3f9c2b7d4e1a
+Revises: 61add9f070ba
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2b7d4e1a'
+down_revision = '61add9f070ba'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('activities', schema=None) as batch_op:
+        batch_op.create_index('ix_activities_athlete_id_date_id', ['athlete_id', 'date', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('activities', schema=None) as batch_op:
+        batch_op.drop_index('ix_activities_athlete_id_date_id')
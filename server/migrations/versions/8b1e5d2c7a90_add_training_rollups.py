@@ -0,0 +1,35 @@
+"""Add training_rollups table
+
+Revision ID: 8b1e5d2c7a90
+Revises: 3f9c2b7d4e1a
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b1e5d2c7a90'
+down_revision = '3f9c2b7d4e1a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('training_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('athlete_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(length=10), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('activity_type', sa.String(length=100), nullable=False),
+    sa.Column('total_duration', sa.Integer(), nullable=False),
+    sa.Column('activity_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['athlete_id'], ['athletes.id'], name=op.f('fk_training_rollups_athlete_id_athletes'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('athlete_id', 'period', 'period_start', 'activity_type', name='uq_training_rollups_bucket')
+    )
+
+
+def downgrade():
+    op.drop_table('training_rollups')
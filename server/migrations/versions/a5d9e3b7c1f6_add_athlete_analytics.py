@@ -0,0 +1,31 @@
+"""Add athlete_analytics table
+
+Revision ID: a5d9e3b7c1f6
+Revises: f1c6a8e2d4b9
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5d9e3b7c1f6'
+down_revision = 'f1c6a8e2d4b9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('athlete_analytics',
+    sa.Column('athlete_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['athlete_id'], ['athletes.id'], name=op.f('fk_athlete_analytics_athlete_id_athletes'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('athlete_id')
+    )
+
+
+def downgrade():
+    op.drop_table('athlete_analytics')
@@ -0,0 +1,26 @@
+"""Organiser role: athletes allowed to import results for other athletes
+
+Revision ID: a9c4e6b2d8f1
+Revises: e2a8c6f4b1d3
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9c4e6b2d8f1'
+down_revision = 'e2a8c6f4b1d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('athletes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('is_organizer', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade():
+    with op.batch_alter_table('athletes', schema=None) as batch_op:
+        batch_op.drop_column('is_organizer')
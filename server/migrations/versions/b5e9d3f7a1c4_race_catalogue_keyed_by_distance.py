@@ -0,0 +1,31 @@
+"""Key the race catalogue on distance too, so one event can hold several distances
+
+Revision ID: b5e9d3f7a1c4
+Revises: f1d7b3a9c5e2
+Create Date: 2026-10-20 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e9d3f7a1c4'
+down_revision = 'f1d7b3a9c5e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases upgraded before c3f7a1d5e8b2 merged by distance hold this index on (normalized_name, date)
+    # only; newer ones already include distance_meters. Either way it is replaced under its new name.
+    with op.batch_alter_table('races', schema=None) as batch_op:
+        batch_op.drop_index('uq_races_normalized_name_date')
+        batch_op.create_index('uq_races_normalized_name_date_distance', ['normalized_name', 'date', 'distance_meters'], unique=True)
+
+
+def downgrade():
+    # Fails while an event has races at more than one distance; those have to be merged by hand first
+    with op.batch_alter_table('races', schema=None) as batch_op:
+        batch_op.drop_index('uq_races_normalized_name_date_distance')
+        batch_op.create_index('uq_races_normalized_name_date', ['normalized_name', 'date'], unique=True)
@@ -0,0 +1,31 @@
+"""Unique race_participations(race_id, athlete_id) for bulk results upserts
+
+Revision ID: b8e2f4a6c9d1
+Revises: a5d9e3b7c1f6
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e2f4a6c9d1'
+down_revision = 'a5d9e3b7c1f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the earliest result where an athlete was entered in a race more than once
+    op.execute(
+        'DELETE FROM race_participations WHERE id NOT IN '
+        '(SELECT MIN(id) FROM race_participations GROUP BY race_id, athlete_id)'
+    )
+    with op.batch_alter_table('race_participations', schema=None) as batch_op:
+        batch_op.create_index('uq_race_participations_race_id_athlete_id', ['race_id', 'athlete_id'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('race_participations', schema=None) as batch_op:
+        batch_op.drop_index('uq_race_participations_race_id_athlete_id')
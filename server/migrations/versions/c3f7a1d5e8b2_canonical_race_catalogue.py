@@ -0,0 +1,130 @@
+"""Canonical race catalogue: normalized race names, duplicates merged, unique (normalized_name, date, distance_meters)
+
+Revision ID: c3f7a1d5e8b2
+Revises: b8e2f4a6c9d1
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+import re
+import unicodedata
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f7a1d5e8b2'
+down_revision = 'b8e2f4a6c9d1'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+# Copied as they were when this revision was written, so later changes to utils.race_units
+# cannot change which rows an upgrade from an old database merges
+DISTANCE_TOLERANCE = 0.01
+
+_NAME_SEPARATORS = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_race_name(value):
+    if not value:
+        return ''
+    text = unicodedata.normalize('NFKD', value).encode('ascii', 'ignore').decode().lower()
+    return ' '.join(_NAME_SEPARATORS.sub(' ', text).split())
+
+
+def same_distance(meters, other):
+    """Unknown distances only match each other; known ones within DISTANCE_TOLERANCE."""
+    if meters is None or other is None:
+        return meters is None and other is None
+    return abs(meters - other) <= other * DISTANCE_TOLERANCE
+
+
+def _pages(connection, query, *order):
+    """Yield the rows of `query` a batch at a time, paging on the `order` columns (unique together)."""
+    last = None
+    while True:
+        page = query.order_by(*order).limit(BACKFILL_BATCH_SIZE)
+        if last is not None:
+            page = page.where(sa.tuple_(*order) > sa.tuple_(*last))
+        rows = connection.execute(page).all()
+        if not rows:
+            return
+        yield rows
+        last = rows[-1][:len(order)]
+
+
+def upgrade():
+    with op.batch_alter_table('races', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('normalized_name', sa.String(length=255), nullable=True))
+
+    connection = op.get_bind()
+    races = sa.table(
+        'races', sa.column('id'), sa.column('race_name'), sa.column('date'), sa.column('normalized_name'),
+        sa.column('distance_meters'), sa.column('finish_time'), sa.column('finish_time_seconds'),
+    )
+    participations = sa.table(
+        'race_participations', sa.column('id'), sa.column('race_id'), sa.column('athlete_id'),
+        sa.column('completion_time'), sa.column('completion_time_seconds'),
+    )
+
+    # Until now each race row was one athlete's entry and its finish_time their own time. Keep that time on
+    # their participation before rows are merged, so it is neither lost nor shown to the other finishers.
+    def race_time(column):
+        return sa.select(column).where(races.c.id == participations.c.race_id).scalar_subquery()
+
+    connection.execute(
+        participations.update()
+        .where(participations.c.completion_time.is_(None))
+        .values(
+            completion_time=race_time(races.c.finish_time),
+            completion_time_seconds=race_time(races.c.finish_time_seconds),
+        )
+    )
+
+    update = races.update().where(races.c.id == sa.bindparam('row_id')).values(normalized_name=sa.bindparam('new_name'))
+    for rows in _pages(connection, sa.select(races.c.id, races.c.race_name), races.c.id):
+        connection.execute(update, [{'row_id': race_id, 'new_name': normalize_race_name(name)} for race_id, name in rows])
+
+    # Within each (normalized name, date) the oldest row of every distance becomes the canonical race;
+    # rows whose distances differ by more than DISTANCE_TOLERANCE are different races and are kept
+    duplicates = {}
+    group, canonical = None, []
+    order = (races.c.normalized_name, races.c.date, races.c.id)
+    for rows in _pages(connection, sa.select(*order, races.c.distance_meters), *order):
+        for name, race_date, race_id, meters in rows:
+            if (name, race_date) != group:
+                group, canonical = (name, race_date), []
+            match = next((kept for kept, kept_meters in canonical if same_distance(meters, kept_meters)), None)
+            if match is None:
+                canonical.append((race_id, meters))
+            else:
+                duplicates[race_id] = match
+
+    for duplicate_id, canonical_id in duplicates.items():
+        # Drop entries that would collide with the athlete's entry in the canonical race, then repoint the rest
+        connection.execute(
+            participations.delete()
+            .where(participations.c.race_id == duplicate_id)
+            .where(participations.c.athlete_id.in_(
+                sa.select(participations.c.athlete_id).where(participations.c.race_id == canonical_id)
+            ))
+        )
+        connection.execute(
+            participations.update().where(participations.c.race_id == duplicate_id).values(race_id=canonical_id)
+        )
+    if duplicates:
+        ids = list(duplicates)
+        for start in range(0, len(ids), BACKFILL_BATCH_SIZE):
+            connection.execute(races.delete().where(races.c.id.in_(ids[start:start + BACKFILL_BATCH_SIZE])))
+
+    with op.batch_alter_table('races', schema=None) as batch_op:
+        batch_op.alter_column('normalized_name', existing_type=sa.String(length=255), nullable=False)
+        batch_op.create_index('uq_races_normalized_name_date', ['normalized_name', 'date', 'distance_meters'], unique=True)
+
+
+def downgrade():
+    # Merged duplicates are not split apart again
+    with op.batch_alter_table('races', schema=None) as batch_op:
+        batch_op.drop_index('uq_races_normalized_name_date')
+        batch_op.drop_column('normalized_name')
@@ -0,0 +1,113 @@
+"""Re-key catalogue races with the Unicode-aware race name fold
+
+Revision ID: c8a2e6f0d4b9
+Revises: b5e9d3f7a1c4
+Create Date: 2026-10-20 12:00:00.000000
+
+"""
+import re
+import unicodedata
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8a2e6f0d4b9'
+down_revision = 'b5e9d3f7a1c4'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+# Copied as they were when this revision was written, so later changes to utils.race_units
+# cannot change which rows an upgrade from an old database merges
+DISTANCE_TOLERANCE = 0.01
+
+_NAME_SEPARATORS = re.compile(r'[\W_]+')
+
+
+def normalize_race_name(value):
+    if not value:
+        return ''
+    text = ''.join(char for char in unicodedata.normalize('NFKD', value) if unicodedata.category(char) != 'Mn')
+    return ' '.join(_NAME_SEPARATORS.sub(' ', text.casefold()).split())
+
+
+def same_distance(meters, other):
+    if meters is None or other is None:
+        return meters is None and other is None
+    return abs(meters - other) <= other * DISTANCE_TOLERANCE
+
+
+def _pages(connection, query, *order):
+    """Yield the rows of `query` a batch at a time, paging on the `order` columns (unique together)."""
+    last = None
+    while True:
+        page = query.order_by(*order).limit(BACKFILL_BATCH_SIZE)
+        if last is not None:
+            page = page.where(sa.tuple_(*order) > sa.tuple_(*last))
+        rows = connection.execute(page).all()
+        if not rows:
+            return
+        yield rows
+        last = rows[-1][:len(order)]
+
+
+def upgrade():
+    connection = op.get_bind()
+    races = sa.table(
+        'races', sa.column('id'), sa.column('race_name'), sa.column('date'), sa.column('normalized_name'),
+        sa.column('distance_meters'),
+    )
+    participations = sa.table('race_participations', sa.column('race_id'), sa.column('athlete_id'))
+
+    # The old fold dropped every non-ASCII letter and kept 'ß' apart from 'ss', so new keys may collide
+    with op.batch_alter_table('races', schema=None) as batch_op:
+        batch_op.drop_index('uq_races_normalized_name_date_distance')
+
+    update = races.update().where(races.c.id == sa.bindparam('row_id')).values(normalized_name=sa.bindparam('new_name'))
+    for rows in _pages(connection, sa.select(races.c.id, races.c.race_name, races.c.normalized_name), races.c.id):
+        params = [
+            {'row_id': race_id, 'new_name': normalize_race_name(name)}
+            for race_id, name, normalized in rows if normalize_race_name(name) != normalized
+        ]
+        if params:
+            connection.execute(update, params)
+
+    # Races that now share a name, date and distance are merged into the oldest, as c3f7a1d5e8b2 did
+    duplicates = {}
+    group, canonical = None, []
+    order = (races.c.normalized_name, races.c.date, races.c.id)
+    for rows in _pages(connection, sa.select(*order, races.c.distance_meters), *order):
+        for name, race_date, race_id, meters in rows:
+            if (name, race_date) != group:
+                group, canonical = (name, race_date), []
+            match = next((kept for kept, kept_meters in canonical if same_distance(meters, kept_meters)), None)
+            if match is None:
+                canonical.append((race_id, meters))
+            else:
+                duplicates[race_id] = match
+
+    for duplicate_id, canonical_id in duplicates.items():
+        connection.execute(
+            participations.delete()
+            .where(participations.c.race_id == duplicate_id)
+            .where(participations.c.athlete_id.in_(
+                sa.select(participations.c.athlete_id).where(participations.c.race_id == canonical_id)
+            ))
+        )
+        connection.execute(
+            participations.update().where(participations.c.race_id == duplicate_id).values(race_id=canonical_id)
+        )
+    ids = list(duplicates)
+    for start in range(0, len(ids), BACKFILL_BATCH_SIZE):
+        connection.execute(races.delete().where(races.c.id.in_(ids[start:start + BACKFILL_BATCH_SIZE])))
+
+    with op.batch_alter_table('races', schema=None) as batch_op:
+        batch_op.create_index('uq_races_normalized_name_date_distance', ['normalized_name', 'date', 'distance_meters'], unique=True)
+
+
+def downgrade():
+    # Keys stay as they are: the ASCII-only fold would collapse non-Latin names into one empty key,
+    # and merged races are not split apart again
+    pass
@@ -0,0 +1,60 @@
+"""Full-text search over activity descriptions: FTS5 table and sync triggers on SQLite, GIN index on PostgreSQL
+
+Revision ID: d6b4e8a2f0c7
+Revises: c3f7a1d5e8b2
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd6b4e8a2f0c7'
+down_revision = 'c3f7a1d5e8b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        # External content: the index reads row text back from activities instead of storing a copy
+        op.execute(
+            "CREATE VIRTUAL TABLE activities_fts USING fts5("
+            "description, athlete_id, content='activities', content_rowid='id', tokenize='porter unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER activities_fts_ai AFTER INSERT ON activities BEGIN "
+            "INSERT INTO activities_fts(rowid, description, athlete_id) VALUES (new.id, new.description, new.athlete_id); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER activities_fts_ad AFTER DELETE ON activities BEGIN "
+            "INSERT INTO activities_fts(activities_fts, rowid, description, athlete_id) "
+            "VALUES ('delete', old.id, old.description, old.athlete_id); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER activities_fts_au AFTER UPDATE OF description, athlete_id ON activities BEGIN "
+            "INSERT INTO activities_fts(activities_fts, rowid, description, athlete_id) "
+            "VALUES ('delete', old.id, old.description, old.athlete_id); "
+            "INSERT INTO activities_fts(rowid, description, athlete_id) VALUES (new.id, new.description, new.athlete_id); "
+            "END"
+        )
+        # Index the activities that already exist
+        op.execute("INSERT INTO activities_fts(activities_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute(
+            "CREATE INDEX ix_activities_description_tsv ON activities USING gin (to_tsvector('english', description))"
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('activities_fts_au', 'activities_fts_ad', 'activities_fts_ai'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS activities_fts')
+    elif dialect == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_activities_description_tsv')
@@ -0,0 +1,28 @@
+"""Tombstone column for asynchronous account deletion
+
+Revision ID: e2a8c6f4b1d3
+Revises: d6b4e8a2f0c7
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a8c6f4b1d3'
+down_revision = 'd6b4e8a2f0c7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('athletes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_athletes_deleted_at', ['deleted_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('athletes', schema=None) as batch_op:
+        batch_op.drop_index('ix_athletes_deleted_at')
+        batch_op.drop_column('deleted_at')
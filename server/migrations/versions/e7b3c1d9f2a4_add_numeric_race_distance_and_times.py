@@ -0,0 +1,127 @@
+"""Add numeric distance and time columns to races and race_participations
+
+Revision ID: e7b3c1d9f2a4
+Revises: d2f8a6c3e5b7
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+import re
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b3c1d9f2a4'
+down_revision = 'd2f8a6c3e5b7'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+# The parsers are copied here as they were when this revision was written, so later changes to
+# utils.race_units cannot change what an upgrade from an old database produces
+DISTANCE_UNITS = {
+    'm': 1, 'meter': 1, 'meters': 1, 'metre': 1, 'metres': 1,
+    'k': 1000, 'km': 1000, 'kms': 1000, 'kilometer': 1000, 'kilometers': 1000, 'kilometre': 1000, 'kilometres': 1000,
+    'mi': 1609.344, 'mile': 1609.344, 'miles': 1609.344,
+}
+
+NAMED_DISTANCES = {
+    'marathon': 42195,
+    'half marathon': 21097,
+    'half': 21097,
+}
+
+_DISTANCE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([a-z]*)\s*$')
+_DURATION = re.compile(r'^\s*(?:(\d+):)?(\d{1,2}):(\d{1,2})\s*$')
+
+
+def parse_distance(value):
+    if not value:
+        return None
+    text = value.strip().lower()
+    if text in NAMED_DISTANCES:
+        return NAMED_DISTANCES[text]
+    match = _DISTANCE.match(text)
+    if not match:
+        return None
+    number, unit = match.groups()
+    factor = DISTANCE_UNITS.get(unit or 'km')
+    if factor is None:
+        return None
+    return round(float(number) * factor)
+
+
+def parse_duration(value):
+    if not value:
+        return None
+    match = _DURATION.match(value)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    if (hours is not None and int(minutes) > 59) or int(seconds) > 59:
+        return None
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds)
+
+
+def _backfill(connection, table, columns):
+    """Parse each row's string columns once and write the numeric values back in batches.
+
+    Rows are read a batch at a time in id order, so the table is never held in memory.
+    """
+    sources = [table.c[source] for source, _, _ in columns]
+    update = table.update().where(table.c.id == sa.bindparam('row_id')).values(
+        {target: sa.bindparam(f'new_{target}') for _, target, _ in columns}
+    )
+    last_id = None
+    while True:
+        query = sa.select(table.c.id, *sources).order_by(table.c.id).limit(BACKFILL_BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(table.c.id > last_id)
+        rows = connection.execute(query).all()
+        if not rows:
+            return
+        connection.execute(update, [
+            dict({'row_id': row[0]}, **{f'new_{target}': parse(value) for (_, target, parse), value in zip(columns, row[1:])})
+            for row in rows
+        ])
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    with op.batch_alter_table('races', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('distance_meters', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('finish_time_seconds', sa.Integer(), nullable=True))
+
+    with op.batch_alter_table('race_participations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('completion_time_seconds', sa.Integer(), nullable=True))
+
+    connection = op.get_bind()
+    races = sa.table('races', sa.column('id'), sa.column('distance'), sa.column('finish_time'),
+                     sa.column('distance_meters'), sa.column('finish_time_seconds'))
+    participations = sa.table('race_participations', sa.column('id'), sa.column('completion_time'),
+                              sa.column('completion_time_seconds'))
+    _backfill(connection, races, [
+        ('distance', 'distance_meters', parse_distance),
+        ('finish_time', 'finish_time_seconds', parse_duration),
+    ])
+    _backfill(connection, participations, [
+        ('completion_time', 'completion_time_seconds', parse_duration),
+    ])
+
+    with op.batch_alter_table('races', schema=None) as batch_op:
+        batch_op.create_index('ix_races_distance_meters_finish_time_seconds', ['distance_meters', 'finish_time_seconds'], unique=False)
+
+    with op.batch_alter_table('race_participations', schema=None) as batch_op:
+        batch_op.create_index('ix_race_participations_athlete_id_completion_time_seconds', ['athlete_id', 'completion_time_seconds'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('race_participations', schema=None) as batch_op:
+        batch_op.drop_index('ix_race_participations_athlete_id_completion_time_seconds')
+        batch_op.drop_column('completion_time_seconds')
+
+    with op.batch_alter_table('races', schema=None) as batch_op:
+        batch_op.drop_index('ix_races_distance_meters_finish_time_seconds')
+        batch_op.drop_column('finish_time_seconds')
+        batch_op.drop_column('distance_meters')
@@ -0,0 +1,26 @@
+"""Add race_participations(race_id, completion_time_seconds) index for leaderboards
+
+Revision ID: f1c6a8e2d4b9
+Revises: e7b3c1d9f2a4
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c6a8e2d4b9'
+down_revision = 'e7b3c1d9f2a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('race_participations', schema=None) as batch_op:
+        batch_op.create_index('ix_race_participations_race_id_completion_time_seconds', ['race_id', 'completion_time_seconds'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('race_participations', schema=None) as batch_op:
+        batch_op.drop_index('ix_race_participations_race_id_completion_time_seconds')
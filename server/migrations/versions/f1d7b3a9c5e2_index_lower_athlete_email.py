@@ -0,0 +1,24 @@
+"""Index lower(email) for case-insensitive athlete matching in the results import
+
+Revision ID: f1d7b3a9c5e2
+Revises: a9c4e6b2d8f1
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1d7b3a9c5e2'
+down_revision = 'a9c4e6b2d8f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_athletes_email_lower', 'athletes', [sa.text('lower(email)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_athletes_email_lower', table_name='athletes')
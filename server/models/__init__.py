@@ -4,5 +4,9 @@ from .athlete import Athlete
 from .activity import Activity
 from .race import Race
 from .race_participation import RaceParticipation
+from .training_rollup import TrainingRollup
+from .outbox_message import OutboxMessage
+from .data_version import DataVersion
+from .athlete_analytics import AthleteAnalytics
 
-__all__ = ['db', 'Athlete', 'Activity', 'Race', 'RaceParticipation']
+__all__ = ['db', 'Athlete', 'Activity', 'Race', 'RaceParticipation', 'TrainingRollup', 'OutboxMessage', 'DataVersion', 'AthleteAnalytics']
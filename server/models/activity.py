@@ -4,6 +4,10 @@ from sqlalchemy_serializer import SerializerMixin
 
 class Activity(db.Model, SerializerMixin):
     __tablename__ = 'activities'
+    __table_args__ = (
+        # Serves keyset pagination over an athlete's activities ordered by (date, id)
+        db.Index('ix_activities_athlete_id_date_id', 'athlete_id', 'date', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     description = db.Column(db.String(255), nullable=False)
@@ -23,7 +27,7 @@ class Activity(db.Model, SerializerMixin):
             'id': self.id,
             'description': self.description,
             'duration': self.duration,
-            'date': self.date.strftime('%Y-%m-%d'),  # Format date as string
+            'date': self.date,  # Encoded as YYYY-MM-DD by utils/json_encoding.py
             'athlete_id': self.athlete_id,
             'athlete_name': self.athlete.first_name + ' ' + self.athlete.last_name  # Include athlete's full name
         }
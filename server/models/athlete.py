@@ -1,10 +1,16 @@
 # models/athlete.py
 from config import db
 from sqlalchemy_serializer import SerializerMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from utils.password_hashing import password_hasher
 
 class Athlete(db.Model, SerializerMixin):
     __tablename__ = 'athletes'
+    __table_args__ = (
+        # Serves the purger's scan for tombstoned accounts
+        db.Index('ix_athletes_deleted_at', 'deleted_at'),
+        # Serves the results import, which matches emails without regard to case
+        db.Index('ix_athletes_email_lower', db.func.lower(db.text('email'))),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     first_name = db.Column(db.String(100), nullable=False)
@@ -12,16 +18,28 @@ class Athlete(db.Model, SerializerMixin):
     email = db.Column(db.String(100), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
 
-    # Relationship with Activity model
-    activities = db.relationship('Activity', back_populates='athlete', cascade='all, delete-orphan')
-    race_participations = db.relationship('RaceParticipation', back_populates='athlete', cascade='all, delete-orphan')
+    # Organisers may import results for any athlete; others only their own (flask set-organizer)
+    is_organizer = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+    deleted_at = db.Column(db.DateTime, nullable=True)  # Tombstone: set while the account is being purged
 
-    # Password management methods
+    # Relationship with Activity model. Deleting an athlete leaves child rows to the
+    # ON DELETE CASCADE foreign keys (passive_deletes) instead of loading them first.
+    activities = db.relationship('Activity', back_populates='athlete', cascade='all, delete-orphan', passive_deletes=True)
+    race_participations = db.relationship(
+        'RaceParticipation', back_populates='athlete', cascade='all, delete-orphan', passive_deletes=True
+    )
+    training_rollups = db.relationship('TrainingRollup', cascade='all, delete-orphan', passive_deletes=True)
+    analytics = db.relationship('AthleteAnalytics', uselist=False, cascade='all, delete-orphan', passive_deletes=True)
+
+    # Password management methods; hashing runs on the bounded password_hasher pool
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.check(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
 
     # Include a list of related races and activities
     def to_dict(self):
@@ -31,5 +49,5 @@ class Athlete(db.Model, SerializerMixin):
             'last_name': self.last_name,
             'email': self.email,
             'activities': [activity.to_dict() for activity in self.activities],
-            'races': [rp.race.to_dict() for rp in self.race_participations]
+            'races': [rp.race.to_dict(rp) for rp in self.race_participations]
         }
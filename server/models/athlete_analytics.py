@@ -0,0 +1,15 @@
+# models/athlete_analytics.py
+from datetime import datetime
+from config import db
+from sqlalchemy_serializer import SerializerMixin
+
+class AthleteAnalytics(db.Model, SerializerMixin):
+    __tablename__ = 'athlete_analytics'
+
+    athlete_id = db.Column(db.Integer, db.ForeignKey('athletes.id', ondelete='CASCADE'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False)  # The athlete's data version these results were computed from
+    payload = db.Column(db.JSON, nullable=False)
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return dict(self.payload, computed_at=self.computed_at)
@@ -0,0 +1,19 @@
+# models/data_version.py
+from datetime import datetime
+from config import db
+from sqlalchemy_serializer import SerializerMixin
+
+class DataVersion(db.Model, SerializerMixin):
+    __tablename__ = 'data_versions'
+
+    # 'athlete:<id>' for one athlete's data, 'races' for the shared race listing
+    key = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'key': self.key,
+            'version': self.version,
+            'updated_at': self.updated_at
+        }
@@ -0,0 +1,33 @@
+# models/outbox_message.py
+from datetime import datetime
+from config import db
+from sqlalchemy_serializer import SerializerMixin
+
+class OutboxMessage(db.Model, SerializerMixin):
+    __tablename__ = 'outbox_messages'
+    __table_args__ = (
+        # Serves the mail queue's scan for messages that are due
+        db.Index('ix_outbox_messages_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    to_email = db.Column(db.String(100), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    plain_text_content = db.Column(db.Text, nullable=False)
+    html_content = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, sending, sent or failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'to_email': self.to_email,
+            'subject': self.subject,
+            'status': self.status,
+            'attempts': self.attempts,
+            'last_error': self.last_error
+        }
@@ -1,28 +1,61 @@
 # models/race.py
 from config import db
+from sqlalchemy.orm import validates
 from sqlalchemy_serializer import SerializerMixin
+from utils.race_units import parse_distance, parse_duration, normalize_race_name
 
 class Race(db.Model, SerializerMixin):
     __tablename__ = 'races'
+    __table_args__ = (
+        # Serves filtering by distance and sorting by finish time in SQL
+        db.Index('ix_races_distance_meters_finish_time_seconds', 'distance_meters', 'finish_time_seconds'),
+        # One catalogue entry per event and distance: athletes who ran the same race share its row,
+        # while the 10K and the half marathon of one event stay apart
+        db.Index('uq_races_normalized_name_date_distance', 'normalized_name', 'date', 'distance_meters', unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     race_name = db.Column(db.String(255), nullable=False)
+    normalized_name = db.Column(db.String(255), nullable=False)  # Derived from race_name at write time
     date = db.Column(db.Date, nullable=False)
     distance = db.Column(db.String(255), nullable=False)  # Distance of the race
     finish_time = db.Column(db.String(255), nullable=True)  # Finish time of the race
+    distance_meters = db.Column(db.Integer, nullable=True)  # Parsed from distance at write time
+    finish_time_seconds = db.Column(db.Integer, nullable=True)  # Parsed from finish_time at write time
 
     # Many-to-Many Relationship with Athletes through RaceParticipation
-    race_participations = db.relationship('RaceParticipation', back_populates='race', cascade='all, delete-orphan')
+    race_participations = db.relationship(
+        'RaceParticipation', back_populates='race', cascade='all, delete-orphan', passive_deletes=True
+    )
 
     # Serialization rules to avoid circular references
     serialize_rules = ('-race_participations.race',)
 
-    # Convert the object to a dictionary
-    def to_dict(self):
+    # Keep the derived columns in step with the free-form strings on every ORM write
+    @validates('race_name')
+    def validate_race_name(self, key, value):
+        self.normalized_name = normalize_race_name(value)
+        return value
+
+    @validates('distance')
+    def validate_distance(self, key, value):
+        self.distance_meters = parse_distance(value)
+        return value
+
+    @validates('finish_time')
+    def validate_finish_time(self, key, value):
+        self.finish_time_seconds = parse_duration(value)
+        return value
+
+    # Convert the object to a dictionary; given an athlete's participation, the finish time is theirs
+    def to_dict(self, participation=None):
+        timed = participation is not None
         return {
             'id': self.id,
             'race_name': self.race_name,
-            'date': self.date.strftime('%Y-%m-%d'),  # Format date as string
+            'date': self.date,  # Encoded as YYYY-MM-DD by utils/json_encoding.py
             'distance': self.distance,
-            'finish_time': self.finish_time  # Updated to reflect the new column name
+            'finish_time': participation.completion_time if timed else self.finish_time,
+            'distance_meters': self.distance_meters,
+            'finish_time_seconds': participation.completion_time_seconds if timed else self.finish_time_seconds
         }
@@ -1,14 +1,25 @@
 # models/race_participation.py
 from config import db
+from sqlalchemy.orm import validates
 from sqlalchemy_serializer import SerializerMixin
+from utils.race_units import parse_duration
 
 class RaceParticipation(db.Model, SerializerMixin):
     __tablename__ = 'race_participations'
+    __table_args__ = (
+        # Serves "my races at a distance, fastest first" once joined to races.distance_meters
+        db.Index('ix_race_participations_athlete_id_completion_time_seconds', 'athlete_id', 'completion_time_seconds'),
+        # Serves leaderboards: a race's finishers already in time order
+        db.Index('ix_race_participations_race_id_completion_time_seconds', 'race_id', 'completion_time_seconds'),
+        # One result per athlete per race; also the conflict target for bulk results upserts
+        db.Index('uq_race_participations_race_id_athlete_id', 'race_id', 'athlete_id', unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     race_id = db.Column(db.Integer, db.ForeignKey('races.id', ondelete='CASCADE'), nullable=False)
     athlete_id = db.Column(db.Integer, db.ForeignKey('athletes.id', ondelete='CASCADE'), nullable=False)
     completion_time = db.Column(db.String(255), nullable=True)  # Store finish time for this athlete in this race
+    completion_time_seconds = db.Column(db.Integer, nullable=True)  # Parsed from completion_time at write time
 
     # Relationships
     race = db.relationship('Race', back_populates='race_participations')
@@ -16,9 +27,15 @@ class RaceParticipation(db.Model, SerializerMixin):
 
     serialize_rules = ('-race.race_participations', '-athlete.race_participations')
 
+    @validates('completion_time')
+    def validate_completion_time(self, key, value):
+        self.completion_time_seconds = parse_duration(value)
+        return value
+
     def to_dict(self):
         return {
             'completion_time': self.completion_time,
+            'completion_time_seconds': self.completion_time_seconds,
             'race_name': self.race.race_name if self.race else None,
             'athlete_name': f'{self.athlete.first_name} {self.athlete.last_name}' if self.athlete else None
         }
@@ -0,0 +1,26 @@
+# models/training_rollup.py
+from config import db
+from sqlalchemy_serializer import SerializerMixin
+
+class TrainingRollup(db.Model, SerializerMixin):
+    __tablename__ = 'training_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('athlete_id', 'period', 'period_start', 'activity_type', name='uq_training_rollups_bucket'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    athlete_id = db.Column(db.Integer, db.ForeignKey('athletes.id', ondelete='CASCADE'), nullable=False)
+    period = db.Column(db.String(10), nullable=False)  # 'week' or 'month'
+    period_start = db.Column(db.Date, nullable=False)  # Monday of the week or first day of the month
+    activity_type = db.Column(db.String(100), nullable=False)
+    total_duration = db.Column(db.Integer, nullable=False, default=0)  # Duration in minutes
+    activity_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'period': self.period,
+            'period_start': self.period_start,
+            'activity_type': self.activity_type,
+            'total_duration': self.total_duration,
+            'activity_count': self.activity_count
+        }
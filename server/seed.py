@@ -1,158 +1,173 @@
-from datetime import date
+# seed.py
+"""Generate a synthetic SweatJunkies database of any size.
+
+    python seed.py                                   # a small demo database
+    python seed.py --athletes 100000 --activities-per-athlete 500 --workers 8
+
+Output is deterministic for a given --seed. Rows are generated in chunks of
+athletes, optionally across worker processes, and written by the parent with
+batched Core INSERTs. Every athlete shares one precomputed password hash, and
+numeric race columns and training rollups are filled in the same way the API
+would fill them.
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from multiprocessing import Pool
+from faker import Faker
+from sqlalchemy import insert, func, select
 from config import db, app
 from models import Athlete, Activity, Race, RaceParticipation
-from faker import Faker
-
-fake = Faker()
-
-# Function to seed the database
-def seed_data():
-    # Create some athletes
-    athlete1 = Athlete(
-        first_name='John',
-        last_name='Doe',
-        email='john@example.com',
-    )
-    athlete1.set_password('password123')
-
-    athlete2 = Athlete(
-        first_name='Jane',
-        last_name='Smith',
-        email='jane@example.com',
-    )
-    athlete2.set_password('password123')
-
-    athlete3 = Athlete(
-        first_name='Alice',
-        last_name='Johnson',
-        email='alice@example.com',
-    )
-    athlete3.set_password('password123')
-
-    athlete4 = Athlete(
-        first_name='Bob',
-        last_name='Brown',
-        email='bob@example.com',
-    )
-    athlete4.set_password('password123')
-
-    athlete5 = Athlete(
-        first_name='Charlie',
-        last_name='Davis',
-        email='charlie@example.com',
-    )
-    athlete5.set_password('password123')
-
-    # Add athletes to the session
-    db.session.add_all([athlete1, athlete2, athlete3, athlete4, athlete5])
-
-    # Create some activities
-    activity1 = Activity(
-        description='Swimming',
-        duration=60,
-        date=date(2024, 9, 3),
-        athlete=athlete1
-    )
-
-    activity2 = Activity(
-        description='Cycling',
-        duration=90,
-        date=date(2024, 9, 4),
-        athlete=athlete2
-    )
-
-    activity3 = Activity(
-        description='Running',
-        duration=45,
-        date=date(2024, 9, 5),
-        athlete=athlete3
-    )
-
-    activity4 = Activity(
-        description='Yoga',
-        duration=30,
-        date=date(2024, 9, 6),
-        athlete=athlete4
-    )
-
-    activity5 = Activity(
-        description='Hiking',
-        duration=120,
-        date=date(2024, 9, 7),
-        athlete=athlete5
-    )
-
-    # Add activities to the session
-    db.session.add_all([activity1, activity2, activity3, activity4, activity5])
-
-    # Create some races with the updated `finish_time` field
-    race1 = Race(
-        race_name='5K Marathon',
-        date=date(2024, 9, 5),
-        distance='5.0 km',  # Use a string format for distance
-        finish_time='00:20:45'  # Updated field name
-    )
-
-    race2 = Race(
-        race_name='10K City Run',
-        date=date(2024, 9, 6),
-        distance='10.0 km',  # Use a string format for distance
-        finish_time='00:42:30'  # Updated field name
-    )
-
-    race3 = Race(
-        race_name='Half Marathon',
-        date=date(2024, 9, 8),
-        distance='21.097 km',  # Use a string format for distance
-        finish_time='01:45:00'  # Updated field name
-    )
-
-    race4 = Race(
-        race_name='Marathon',
-        date=date(2024, 9, 9),
-        distance='42.195 km',  # Use a string format for distance
-        finish_time='03:30:15'  # Updated field name
-    )
-
-    race5 = Race(
-        race_name='Trail Run',
-        date=date(2024, 9, 10),
-        distance='15.0 km',  # Use a string format for distance
-        finish_time='01:20:00'  # Updated field name
-    )
-
-    # Add races to the session
-    db.session.add_all([race1, race2, race3, race4, race5])
-
-    # Commit the session before creating race participations
+from utils.password_hashing import password_hasher
+from utils.race_units import parse_distance, parse_duration, format_duration, normalize_race_name
+from utils.rollups import rebuild_rollups
+import utils.activity_search  # noqa: F401 - db.create_all() also builds the search index and its triggers
+
+DEFAULT_PASSWORD = 'password123'
+ACTIVITY_TYPES = ['Running', 'Cycling', 'Swimming', 'Yoga', 'Hiking', 'Rowing', 'Strength', 'Walking']
+RACE_DISTANCES = ['5.0 km', '10.0 km', '15.0 km', '21.097 km', '42.195 km']
+RACE_SUFFIXES = ['5K', '10K City Run', 'Trail Run', 'Half Marathon', 'Marathon']
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Generate a synthetic SweatJunkies database.')
+    parser.add_argument('--athletes', type=int, default=5)
+    parser.add_argument('--activities-per-athlete', type=int, default=5)
+    parser.add_argument('--races', type=int, default=5)
+    parser.add_argument('--races-per-athlete', type=int, default=1)
+    parser.add_argument('--start-date', type=date.fromisoformat, default=date(2020, 1, 1))
+    parser.add_argument('--days', type=int, default=5 * 365, help='Length of the generated history.')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Shared password for every athlete.')
+    parser.add_argument('--chunk-size', type=int, default=500, help='Athletes generated per chunk.')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Rows per INSERT batch.')
+    parser.add_argument('--workers', type=int, default=1, help='Processes generating chunks.')
+    parser.add_argument('--reset', action='store_true', help='Drop and recreate all tables first.')
+    parser.add_argument('--skip-rollups', action='store_true', help='Do not rebuild training rollups afterwards.')
+    return parser.parse_args()
+
+
+def generate_races(args, first_id):
+    rng = random.Random(args.seed)
+    fake = Faker()
+    fake.seed_instance(args.seed)
+    races = []
+    catalogue = set()
+    for offset in range(args.races):
+        kind = rng.randrange(len(RACE_DISTANCES))
+        distance = RACE_DISTANCES[kind]
+        finish_time = format_duration(parse_distance(distance) / 1000 * rng.randint(170, 210))
+        race_name = f'{fake.city()} {RACE_SUFFIXES[kind]}'
+        normalized_name = normalize_race_name(race_name)
+        race_date = args.start_date + timedelta(days=rng.randrange(args.days))
+        # Races are unique by (normalized name, date); move a clash to the next free day
+        while (normalized_name, race_date) in catalogue:
+            race_date += timedelta(days=1)
+        catalogue.add((normalized_name, race_date))
+        races.append({
+            'id': first_id + offset,
+            'race_name': race_name,
+            'normalized_name': normalized_name,
+            'date': race_date,
+            'distance': distance,
+            'finish_time': finish_time,
+            'distance_meters': parse_distance(distance),
+            'finish_time_seconds': parse_duration(finish_time),
+        })
+    return races
+
+
+def generate_chunk(task):
+    """Build the athlete, activity and participation rows for one chunk of athlete ids.
+
+    Runs in worker processes, so it only touches its arguments: the same task
+    always produces the same rows.
+    """
+    args, first_athlete_id, count, password_hash, races = task
+    rng = random.Random(args.seed * 1000003 + first_athlete_id)
+    fake = Faker()
+    fake.seed_instance(args.seed * 1000003 + first_athlete_id)
+
+    athletes, activities, participations = [], [], []
+    for athlete_id in range(first_athlete_id, first_athlete_id + count):
+        first_name, last_name = fake.first_name(), fake.last_name()
+        athletes.append({
+            'id': athlete_id,
+            'first_name': first_name,
+            'last_name': last_name,
+            'email': f'{first_name}.{last_name}.{athlete_id}@example.com'.lower(),
+            'password_hash': password_hash,
+        })
+        for _ in range(args.activities_per_athlete):
+            activities.append({
+                'athlete_id': athlete_id,
+                'description': rng.choice(ACTIVITY_TYPES),
+                'duration': rng.randint(15, 150),
+                'date': args.start_date + timedelta(days=rng.randrange(args.days)),
+            })
+        for race_id, meters in rng.sample(races, min(args.races_per_athlete, len(races))):
+            completion_time = format_duration(meters / 1000 * rng.randint(220, 420))
+            participations.append({
+                'race_id': race_id,
+                'athlete_id': athlete_id,
+                'completion_time': completion_time,
+                'completion_time_seconds': parse_duration(completion_time),
+            })
+    return athletes, activities, participations
+
+
+def insert_batches(model, rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(insert(model.__table__), rows[start:start + batch_size])
+
+
+def seed_data(args):
+    started = time.perf_counter()
+    # One hash for everybody instead of one CPU-heavy hash per athlete
+    password_hash = password_hasher.hash(args.password)
+
+    first_race_id = (db.session.scalar(select(func.max(Race.id))) or 0) + 1
+    races = generate_races(args, first_race_id)
+    insert_batches(Race, races, args.batch_size)
     db.session.commit()
+    race_choices = [(race['id'], race['distance_meters']) for race in races]
+
+    first_athlete_id = (db.session.scalar(select(func.max(Athlete.id))) or 0) + 1
+    tasks = [
+        (args, first_athlete_id + start, min(args.chunk_size, args.athletes - start), password_hash, race_choices)
+        for start in range(0, args.athletes, args.chunk_size)
+    ]
+
+    totals = [0, 0, 0]
+    pool = Pool(args.workers) if args.workers > 1 else None
+    chunks = pool.imap(generate_chunk, tasks) if pool else map(generate_chunk, tasks)
+    try:
+        for athletes, activities, participations in chunks:
+            insert_batches(Athlete, athletes, args.batch_size)
+            insert_batches(Activity, activities, args.batch_size)
+            insert_batches(RaceParticipation, participations, args.batch_size)
+            db.session.commit()
+            totals[0] += len(athletes)
+            totals[1] += len(activities)
+            totals[2] += len(participations)
+            print(f'{totals[0]}/{args.athletes} athletes, {totals[1]} activities, {totals[2]} race participations')
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    if not args.skip_rollups:
+        print(f'Rebuilt {rebuild_rollups()} training rollups')
+    print(f'Database seeded successfully in {time.perf_counter() - started:.1f}s '
+          f'({len(races)} races, password {args.password!r})')
 
-    # Create race participations to link athletes with races
-    race_participation1 = RaceParticipation(
-        race_id=race1.id, 
-        athlete_id=athlete1.id,
-        completion_time='00:25:00'
-    )
-    race_participation2 = RaceParticipation(
-        race_id=race2.id, 
-        athlete_id=athlete2.id,
-        completion_time='00:45:00'
-    )
-    race_participation3 = RaceParticipation(
-        race_id=race3.id, 
-        athlete_id=athlete3.id,
-        completion_time='01:30:00'
-    )
-
-    # Add race participations to the session
-    db.session.add_all([race_participation1, race_participation2, race_participation3])
-
-    # Commit the session for race participations
-    db.session.commit()
-    print('Database seeded successfully!')
 
 # Create tables and seed data
 if __name__ == '__main__':
+    args = parse_args()
     with app.app_context():
+        if args.reset:
+            db.drop_all()
         db.create_all()  # Create all tables
-        seed_data()  # Seed the database
+        seed_data(args)  # Seed the database
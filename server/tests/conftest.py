@@ -0,0 +1,71 @@
+# tests/conftest.py
+"""Request-level tests through app.test_client() on the in-memory test profile.
+
+Run from the server directory with `python -m pytest`. The environment is set
+before the app is imported, because config.py picks its engine profile at
+import time. The test profile runs no background threads, so mail waits in the
+outbox for mail_queue.deliver_due() and tombstones for athlete_purger.purge_due().
+"""
+import os
+
+os.environ['DB_PROFILE'] = 'test'
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+os.environ['MAIL_TRANSPORT'] = 'memory'
+
+from collections import namedtuple  # noqa: E402
+import pytest  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+from app import app as flask_app  # noqa: E402
+from config import db  # noqa: E402
+from models import Athlete  # noqa: E402
+from utils.current_athlete import identity_cache  # noqa: E402
+from utils.race_catalogue import race_index  # noqa: E402
+
+PASSWORD = 'password123'
+
+Runner = namedtuple('Runner', ['id', 'email', 'headers'])
+
+
+@pytest.fixture
+def app():
+    """The app on an empty schema, with the per-process caches emptied too."""
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        race_index.load()
+    identity_cache.clear()
+    yield flask_app
+    with flask_app.app_context():
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_runner(app):
+    """Create an athlete and return a Runner with the bearer headers to act as them."""
+    def make(email='runner@sweatjunkies.test', first_name='Test', last_name='Runner', is_organizer=False):
+        with app.app_context():
+            athlete = Athlete(first_name=first_name, last_name=last_name, email=email, is_organizer=is_organizer)
+            athlete.set_password(PASSWORD)
+            db.session.add(athlete)
+            db.session.commit()
+            token = create_access_token(identity={'email': athlete.email, 'id': athlete.id})
+            return Runner(athlete.id, athlete.email, {'Authorization': f'Bearer {token}'})
+    return make
+
+
+@pytest.fixture
+def runner(make_runner):
+    return make_runner()
+
+
+@pytest.fixture
+def stranger(app):
+    """Headers carrying a valid token for an athlete who does not exist."""
+    with app.app_context():
+        token = create_access_token(identity={'email': 'ghost@sweatjunkies.test', 'id': 999999})
+    return {'Authorization': f'Bearer {token}'}
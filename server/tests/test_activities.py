@@ -0,0 +1,128 @@
+# tests/test_activities.py
+from datetime import datetime, timedelta
+from werkzeug.http import http_date
+import pytest
+
+
+def post_activity(client, runner, **fields):
+    body = dict({'date': '2024-05-01', 'description': 'Easy run', 'duration': 45}, **fields)
+    return client.post('/api/activities', json=body, headers=runner.headers)
+
+
+def test_create_activity(client, runner):
+    response = post_activity(client, runner)
+
+    assert response.status_code == 201
+    assert response.get_json()['date'] == '2024-05-01'
+    assert len(client.get('/api/activities', headers=runner.headers).get_json()) == 1
+
+
+@pytest.mark.parametrize('fields, message', [
+    ({'date': '05/01/2024'}, 'Invalid date format. Use YYYY-MM-DD.'),
+    ({'description': '  '}, 'Description is required'),
+    ({'duration': 'long'}, 'Duration must be a whole number of minutes'),
+    ({'duration': 0}, 'Duration must be at least 1 minute'),
+])
+def test_create_activity_rejects_invalid_rows(client, runner, fields, message):
+    response = post_activity(client, runner, **fields)
+
+    assert response.status_code == 400
+    assert response.get_json()['message'] == message
+    assert client.get('/api/athlete/summary', headers=runner.headers).get_json() == []
+
+
+def test_create_activity_rejects_a_non_object_body(client, runner):
+    response = client.post('/api/activities', data='not json', headers=runner.headers)
+
+    assert response.status_code == 400
+
+
+def test_activities_are_paged_by_cursor(client, runner):
+    for day in range(1, 4):
+        post_activity(client, runner, date=f'2024-05-0{day}')
+
+    first = client.get('/api/activities?limit=2', headers=runner.headers)
+    assert [activity['date'] for activity in first.get_json()] == ['2024-05-03', '2024-05-02']
+
+    cursor = first.headers['X-Next-Cursor']
+    second = client.get(f'/api/activities?limit=2&cursor={cursor}', headers=runner.headers)
+    assert [activity['date'] for activity in second.get_json()] == ['2024-05-01']
+    assert 'X-Next-Cursor' not in second.headers
+
+
+@pytest.mark.parametrize('query', ['limit=0', 'limit=many', 'cursor=garbage', 'from=2024-13-01'])
+def test_activities_reject_invalid_paging(client, runner, query):
+    assert client.get(f'/api/activities?{query}', headers=runner.headers).status_code == 400
+
+
+def test_activities_answer_304_until_a_write(client, runner):
+    post_activity(client, runner)
+    etag = client.get('/api/activities', headers=runner.headers).headers['ETag']
+
+    cached = client.get('/api/activities', headers=dict(runner.headers, **{'If-None-Match': etag}))
+    assert cached.status_code == 304
+
+    post_activity(client, runner, date='2024-05-02')
+    changed = client.get('/api/activities', headers=dict(runner.headers, **{'If-None-Match': etag}))
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+
+def test_if_modified_since_counts_a_write_in_the_same_second_as_modified(client, runner):
+    post_activity(client, runner)
+    last_modified = client.get('/api/activities', headers=runner.headers).headers['Last-Modified']
+    post_activity(client, runner, date='2024-05-02')
+
+    since = dict(runner.headers, **{'If-Modified-Since': last_modified})
+    assert client.get('/api/activities', headers=since).status_code == 200
+
+    later = dict(runner.headers, **{'If-Modified-Since': http_date(datetime.utcnow() + timedelta(minutes=1))})
+    assert client.get('/api/activities', headers=later).status_code == 304
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since(client, runner):
+    post_activity(client, runner)
+    later = http_date(datetime.utcnow() + timedelta(minutes=1))
+
+    headers = dict(runner.headers, **{'If-None-Match': '"stale"', 'If-Modified-Since': later})
+    response = client.get('/api/activities', headers=headers)
+
+    assert response.status_code == 200
+
+
+def test_activities_of_other_athletes_stay_private(client, make_runner):
+    alice = make_runner('alice@sweatjunkies.test')
+    bob = make_runner('bob@sweatjunkies.test')
+    post_activity(client, alice)
+
+    assert client.get('/api/activities', headers=bob.headers).get_json() == []
+
+
+def test_search_ranks_matching_descriptions(client, runner):
+    post_activity(client, runner, description='Hill repeats on the bridge')
+    post_activity(client, runner, description='Easy recovery jog', date='2024-05-02')
+
+    response = client.get('/api/activities/search?q=hill', headers=runner.headers)
+
+    assert response.status_code == 200
+    assert [activity['description'] for activity in response.get_json()] == ['Hill repeats on the bridge']
+
+
+@pytest.mark.parametrize('query', ['q=run&limit=0', 'q=run&offset=-1', 'q=run&offset=many'])
+def test_search_rejects_invalid_paging(client, runner, query):
+    assert client.get(f'/api/activities/search?{query}', headers=runner.headers).status_code == 400
+
+
+def test_search_answers_304_until_a_write(client, runner):
+    post_activity(client, runner, description='Tempo run')
+    etag = client.get('/api/activities/search?q=tempo', headers=runner.headers).headers['ETag']
+
+    headers = dict(runner.headers, **{'If-None-Match': etag})
+    assert client.get('/api/activities/search?q=tempo', headers=headers).status_code == 304
+    post_activity(client, runner, description='Another tempo run', date='2024-05-02')
+    assert client.get('/api/activities/search?q=tempo', headers=headers).status_code == 200
+
+
+def test_unknown_athlete_gets_404(client, stranger):
+    assert client.get('/api/activities', headers=stranger).status_code == 404
+    assert client.post('/api/activities', json={}, headers=stranger).status_code == 404
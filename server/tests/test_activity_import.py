@@ -0,0 +1,77 @@
+# tests/test_activity_import.py
+import io
+import pytest
+
+ROWS = [
+    {'date': '2024-05-06', 'description': 'Long run', 'duration': 90},
+    {'date': '2024-05-07', 'description': 'Easy run', 'duration': 40},
+]
+
+
+def upload(client, runner, content):
+    data = {'file': (io.BytesIO(content), 'activities.csv')}
+    return client.post('/api/activities/import', data=data, headers=runner.headers, content_type='multipart/form-data')
+
+
+def test_import_json_rows(client, runner):
+    response = client.post('/api/activities/import', json=ROWS, headers=runner.headers)
+
+    assert response.status_code == 201
+    assert response.get_json() == {'imported': 2, 'error_count': 0, 'errors': []}
+    summary = client.get('/api/athlete/summary?period=week', headers=runner.headers).get_json()
+    assert {week['period_start'] for week in summary} == {'2024-05-06'}
+    assert sum(week['total_duration'] for week in summary) == 130
+
+
+def test_import_reports_invalid_rows_and_keeps_the_rest(client, runner):
+    rows = ROWS + [{'date': 'yesterday', 'description': 'Run', 'duration': 30}]
+
+    response = client.post('/api/activities/import', json=rows, headers=runner.headers)
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['imported'] == 2
+    assert body['error_count'] == 1
+    assert body['errors'][0]['message'] == 'Invalid date format. Use YYYY-MM-DD.'
+
+
+def test_import_with_no_valid_rows_is_rejected(client, runner):
+    response = client.post('/api/activities/import', json=[{'date': 'yesterday'}], headers=runner.headers)
+
+    assert response.status_code == 400
+    assert response.get_json()['imported'] == 0
+    assert client.get('/api/activities', headers=runner.headers).get_json() == []
+
+
+def test_import_rejects_a_body_that_is_not_an_array(client, runner):
+    response = client.post('/api/activities/import', json={'date': '2024-05-06'}, headers=runner.headers)
+
+    assert response.status_code == 400
+
+
+def test_import_csv_upload(client, runner):
+    response = upload(client, runner, b'date,description,duration\n2024-05-06,Long run,90\n2024-05-07,Easy run,40\n')
+
+    assert response.status_code == 201
+    assert response.get_json()['imported'] == 2
+
+
+@pytest.mark.parametrize('content, line', [
+    (b'date,description,duration\n2024-05-06,Long run,90\n2024-05-07,\xff\xfe run,40\n', 3),
+    (b'date,description,duration\n2024-05-06,' + b'x' * 200000 + b',90\n', 2),  # Past csv.field_size_limit()
+])
+def test_import_rejects_unreadable_csv(client, runner, content, line):
+    response = upload(client, runner, content)
+
+    assert response.status_code == 400
+    assert response.get_json()['line'] == line
+    assert client.get('/api/activities', headers=runner.headers).get_json() == []
+
+
+def test_summary_rejects_invalid_arguments(client, runner):
+    assert client.get('/api/athlete/summary?period=year', headers=runner.headers).status_code == 400
+    assert client.get('/api/athlete/summary?from=May', headers=runner.headers).status_code == 400
+
+
+def test_import_answers_404_for_an_unknown_athlete(client, stranger):
+    assert client.post('/api/activities/import', json=ROWS, headers=stranger).status_code == 404
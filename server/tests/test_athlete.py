@@ -0,0 +1,118 @@
+# tests/test_athlete.py
+import csv
+import io
+from datetime import date, timedelta
+from conftest import PASSWORD
+from config import db
+from models import Athlete
+from utils.account_deletion import athlete_purger
+from utils.mail_queue import mail_queue
+
+
+def add_activity(client, runner, day='2024-05-01', duration=45):
+    body = {'date': day, 'description': 'Easy run', 'duration': duration}
+    return client.post('/api/activities', json=body, headers=runner.headers)
+
+
+def test_profile_answers_304_until_it_changes(client, runner):
+    etag = client.get('/api/athlete/profile', headers=runner.headers).headers['ETag']
+    headers = dict(runner.headers, **{'If-None-Match': etag})
+
+    assert client.get('/api/athlete/profile', headers=headers).status_code == 304
+    client.put('/api/athlete/profile', json={'first_name': 'Renamed'}, headers=runner.headers)
+    response = client.get('/api/athlete/profile', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['first_name'] == 'Renamed'
+
+
+def test_deleting_the_profile_removes_the_account(client, runner):
+    add_activity(client, runner)
+
+    response = client.delete('/api/athlete/profile', headers=runner.headers)
+
+    assert response.status_code == 200
+    assert client.get('/api/athlete/profile', headers=runner.headers).status_code == 404
+    assert client.post('/api/login', json={'email': runner.email, 'password': PASSWORD}).status_code == 401
+
+
+def test_asynchronous_deletion_tombstones_then_purges(client, runner, app, monkeypatch):
+    monkeypatch.setattr(athlete_purger, 'asynchronous', True)
+    add_activity(client, runner)
+
+    response = client.delete('/api/athlete/profile', headers=runner.headers)
+
+    assert response.status_code == 202
+    assert client.get('/api/activities', headers=runner.headers).status_code == 404
+    with app.app_context():
+        assert athlete_purger.purge_due() == 1
+        assert db.session.get(Athlete, runner.id) is None
+
+
+def test_heatmap_counts_minutes_per_day(client, runner):
+    today = date.today()
+    add_activity(client, runner, today.isoformat(), 30)
+    add_activity(client, runner, today.isoformat(), 15)
+
+    response = client.get('/api/athlete/heatmap', headers=runner.headers)
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['end'] == today.isoformat()
+    assert body['minutes'][-1] == 45
+
+
+def test_heatmap_rejects_invalid_ranges(client, runner):
+    assert client.get('/api/athlete/heatmap?from=May', headers=runner.headers).status_code == 400
+    assert client.get('/api/athlete/heatmap?from=2024-05-02&to=2024-05-01', headers=runner.headers).status_code == 400
+    assert client.get('/api/athlete/heatmap?from=2000-01-01&to=2024-01-01', headers=runner.headers).status_code == 400
+
+
+def test_heatmap_answers_304_until_a_write(client, runner):
+    etag = client.get('/api/athlete/heatmap', headers=runner.headers).headers['ETag']
+    headers = dict(runner.headers, **{'If-None-Match': etag})
+
+    assert client.get('/api/athlete/heatmap', headers=headers).status_code == 304
+    add_activity(client, runner, (date.today() - timedelta(days=1)).isoformat())
+    assert client.get('/api/athlete/heatmap', headers=headers).status_code == 200
+
+
+def test_analytics_follow_new_races(client, runner):
+    race = {'race_name': 'Parkrun', 'date': '2024-05-04', 'distance': '5 km', 'completion_time': '0:22:00'}
+    client.post('/api/races', json=race, headers=runner.headers)
+
+    response = client.get('/api/athlete/analytics', headers=runner.headers)
+
+    assert response.status_code == 200
+    records = response.get_json()['personal_records']
+    assert [(record['name'], record['time']) for record in records] == [('5K', '00:22:00')]
+
+    headers = dict(runner.headers, **{'If-None-Match': response.headers['ETag']})
+    assert client.get('/api/athlete/analytics', headers=headers).status_code == 304
+    client.post('/api/races', json=dict(race, date='2024-05-11', completion_time='0:21:00'), headers=runner.headers)
+    assert client.get('/api/athlete/analytics', headers=headers).status_code == 200
+
+
+def test_export_streams_the_full_history_as_csv(client, runner):
+    add_activity(client, runner)
+
+    response = client.get('/api/athlete/export?format=csv', headers=runner.headers)
+
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [(row['record_type'], row['date'], row['duration']) for row in rows] == [('activity', '2024-05-01', '45')]
+
+
+def test_export_rejects_unknown_formats(client, runner, stranger):
+    assert client.get('/api/athlete/export?format=xml', headers=runner.headers).status_code == 400
+    assert client.get('/api/athlete/export', headers=stranger).status_code == 404
+
+
+def test_welcome_mail_waits_in_the_outbox(client, app):
+    body = {'firstName': 'New', 'lastName': 'Runner', 'email': 'new@sweatjunkies.test', 'password': PASSWORD}
+
+    assert client.post('/api/register', json=body).status_code == 201
+    assert client.post('/api/register', json=body).status_code == 400
+    sent = len(mail_queue.transport.sent)
+    with app.app_context():
+        assert mail_queue.deliver_due() == 1
+    assert mail_queue.transport.sent[sent]['to_email'] == 'new@sweatjunkies.test'
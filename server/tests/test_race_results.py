@@ -0,0 +1,97 @@
+# tests/test_race_results.py
+import io
+import pytest
+
+
+@pytest.fixture
+def race_id(client, runner):
+    body = {'race_name': 'City 10K', 'date': '2024-06-01', 'distance': '10 km', 'completion_time': '0:45:00'}
+    return client.post('/api/races', json=body, headers=runner.headers).get_json()['id']
+
+
+def import_results(client, athlete, race_id, rows):
+    return client.post(f'/api/race_participations?race_id={race_id}', json=rows, headers=athlete.headers)
+
+
+def test_athletes_may_import_their_own_result(client, runner, race_id):
+    response = import_results(client, runner, race_id, [{'email': runner.email, 'completion_time': '0:44:10'}])
+
+    assert response.status_code == 201
+    assert response.get_json()['imported'] == 1
+    races = client.get('/api/races', headers=runner.headers).get_json()
+    assert races[0]['finish_time'] == '0:44:10'
+
+
+def test_only_organisers_import_results_for_others(client, runner, make_runner, race_id):
+    other = make_runner('other@sweatjunkies.test')
+
+    response = import_results(client, runner, race_id, [{'email': other.email, 'completion_time': '0:50:00'}])
+
+    assert response.status_code == 403
+    assert client.get('/api/races', headers=other.headers).get_json() == []
+
+
+def test_organisers_import_every_finisher(client, runner, make_runner, race_id):
+    organiser = make_runner('organiser@sweatjunkies.test', is_organizer=True)
+    other = make_runner('other@sweatjunkies.test')
+    rows = [
+        {'email': runner.email, 'completion_time': '0:44:10'},
+        {'email': 'OTHER@sweatjunkies.test', 'completion_time': '0:50:00'},
+        {'email': 'nobody@sweatjunkies.test', 'completion_time': '0:55:00'},
+        {'email': other.email, 'completion_time': 'soon'},
+    ]
+
+    response = import_results(client, organiser, race_id, rows)
+
+    assert response.status_code == 201
+    report = response.get_json()
+    assert report['imported'] == 2
+    assert report['unmatched'] == [{'row': 3, 'email': 'nobody@sweatjunkies.test'}]
+    assert report['error_count'] == 1
+    assert client.get('/api/races', headers=other.headers).get_json()[0]['finish_time'] == '0:50:00'
+
+
+def test_reimporting_updates_times_instead_of_duplicating(client, runner, race_id):
+    import_results(client, runner, race_id, [{'email': runner.email, 'completion_time': '0:44:10'}])
+    import_results(client, runner, race_id, [{'email': runner.email, 'completion_time': '0:43:00'}])
+
+    participations = client.get('/api/race_participations', headers=runner.headers).get_json()
+
+    assert [p['completion_time'] for p in participations] == ['0:43:00']
+
+
+def test_import_without_a_match_is_rejected(client, make_runner, race_id):
+    organiser = make_runner('organiser@sweatjunkies.test', is_organizer=True)
+
+    response = import_results(client, organiser, race_id, [{'email': 'nobody@sweatjunkies.test', 'completion_time': '0:55:00'}])
+
+    assert response.status_code == 400
+    assert response.get_json()['unmatched_count'] == 1
+
+
+def test_import_needs_an_existing_race(client, runner):
+    assert import_results(client, runner, 999, []).status_code == 404
+    assert client.post('/api/race_participations', json=[], headers=runner.headers).status_code == 404
+
+
+def test_import_rejects_a_body_that_is_not_results(client, runner, race_id):
+    assert import_results(client, runner, race_id, {'email': runner.email}).status_code == 400
+
+
+def test_import_reports_the_line_of_unreadable_csv(client, runner, race_id):
+    content = f'email,completion_time\n{runner.email},0:44:10\n\xff,0:45:00\n'.encode('latin-1')
+    data = {'file': (io.BytesIO(content), 'results.csv')}
+
+    response = client.post(
+        f'/api/race_participations?race_id={race_id}', data=data, headers=runner.headers, content_type='multipart/form-data'
+    )
+
+    assert response.status_code == 400
+    assert response.get_json()['line'] == 3
+
+
+def test_withdrawing_from_a_race(client, runner, race_id):
+    url = f'/api/race_participations?race_id={race_id}'
+
+    assert client.delete(url, headers=runner.headers).status_code == 200
+    assert client.delete(url, headers=runner.headers).status_code == 404
@@ -0,0 +1,21 @@
+# tests/test_race_units.py
+import pytest
+from utils.race_units import normalize_race_name
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('Boston Marathon', 'boston marathon'),
+    (' boston  MARATHON!', 'boston marathon'),
+    ('Bóston-Marathon', 'boston marathon'),
+    ('Straße Lauf', 'strasse lauf'),
+    ('東京マラソン', '東京マラソン'),
+    ('Москва Марафон', 'москва марафон'),
+    (None, ''),
+])
+def test_normalize_race_name(name, expected):
+    assert normalize_race_name(name) == expected
+
+
+def test_normalize_race_name_rejects_non_strings():
+    with pytest.raises(ValueError):
+        normalize_race_name(42)
@@ -0,0 +1,148 @@
+# tests/test_races.py
+import pytest
+
+
+def post_race(client, runner, **fields):
+    body = dict({'race_name': 'Boston Marathon', 'date': '2024-04-15', 'distance': 'Marathon', 'completion_time': '3:05:00'}, **fields)
+    return client.post('/api/races', json=body, headers=runner.headers)
+
+
+def test_athletes_who_ran_the_same_race_share_it(client, make_runner):
+    alice = make_runner('alice@sweatjunkies.test')
+    bob = make_runner('bob@sweatjunkies.test')
+
+    first = post_race(client, alice)
+    second = post_race(client, bob, race_name=' boston  MARATHON!', distance='42.2 km', completion_time='3:20:00')
+
+    assert first.status_code == 201
+    assert second.status_code == 200
+    assert second.get_json()['id'] == first.get_json()['id']
+    # Each athlete sees their own time on the shared race
+    assert first.get_json()['finish_time'] == '3:05:00'
+    assert second.get_json()['finish_time'] == '3:20:00'
+
+
+def test_another_distance_at_the_same_event_is_its_own_race(client, make_runner):
+    alice = make_runner('alice@sweatjunkies.test')
+    bob = make_runner('bob@sweatjunkies.test')
+
+    marathon = post_race(client, alice)
+    five_k = post_race(client, bob, distance='5K', completion_time='0:21:00')
+
+    assert five_k.status_code == 201
+    assert five_k.get_json()['id'] != marathon.get_json()['id']
+    assert five_k.get_json()['distance_meters'] == 5000
+
+
+def test_race_names_in_any_script_are_accepted(client, runner):
+    response = post_race(client, runner, race_name='東京マラソン', date='2024-03-03')
+
+    assert response.status_code == 201
+    suggestions = client.get('/api/races/autocomplete?q=東京', headers=runner.headers).get_json()
+    assert [race['race_name'] for race in suggestions] == ['東京マラソン']
+
+
+@pytest.mark.parametrize('fields, message', [
+    ({'date': '15/04/2024'}, 'Invalid date format. Use YYYY-MM-DD.'),
+    ({'race_name': '  !! '}, 'Race name is required'),
+    ({'race_name': 42}, 'Race name must be a string'),
+    ({'distance': 'far'}, "Invalid distance. Use a number with km, mi or m, e.g. '21.097 km'."),
+    ({'finish_time': '3:10:00'}, 'finish_time and completion_time disagree. Send your time as completion_time.'),
+])
+def test_create_race_rejects_invalid_input(client, runner, fields, message):
+    response = post_race(client, runner, **fields)
+
+    assert response.status_code == 400
+    assert response.get_json()['message'] == message
+    assert client.get('/api/races', headers=runner.headers).get_json() == []
+
+
+def test_finish_time_is_accepted_as_the_callers_time(client, runner):
+    response = post_race(client, runner, completion_time=None, finish_time='3:10:00')
+
+    assert response.status_code == 201
+    assert response.get_json()['finish_time_seconds'] == 3 * 3600 + 10 * 60
+
+
+def test_races_filter_by_distance(client, runner):
+    post_race(client, runner)
+    post_race(client, runner, race_name='Parkrun', date='2024-04-20', distance='5 km', completion_time='0:22:00')
+
+    five_ks = client.get('/api/races?distance=5K', headers=runner.headers).get_json()
+
+    assert [race['race_name'] for race in five_ks] == ['Parkrun']
+    assert client.get('/api/races?distance=far', headers=runner.headers).status_code == 400
+
+
+def test_races_answer_304_until_a_write(client, runner):
+    post_race(client, runner)
+    etag = client.get('/api/races', headers=runner.headers).headers['ETag']
+    headers = dict(runner.headers, **{'If-None-Match': etag})
+
+    assert client.get('/api/races', headers=headers).status_code == 304
+    post_race(client, runner, race_name='Parkrun', date='2024-04-20', distance='5 km')
+    assert client.get('/api/races', headers=headers).status_code == 200
+
+
+def test_shared_race_listing_answers_304_until_a_write(client, make_runner):
+    alice = make_runner('alice@sweatjunkies.test')
+    bob = make_runner('bob@sweatjunkies.test')
+    post_race(client, alice)
+    etag = client.get('/api/races_with_participants').headers['ETag']
+
+    assert client.get('/api/races_with_participants', headers={'If-None-Match': etag}).status_code == 304
+    post_race(client, bob)
+    assert client.get('/api/races_with_participants', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_race_leaderboard_ranks_finishers(client, make_runner):
+    alice = make_runner('alice@sweatjunkies.test')
+    bob = make_runner('bob@sweatjunkies.test')
+    race_id = post_race(client, alice, completion_time='3:30:00').get_json()['id']
+    post_race(client, bob, completion_time='3:00:00')
+
+    response = client.get(f'/api/races/{race_id}/leaderboard', headers=alice.headers)
+
+    assert response.status_code == 200
+    board = response.get_json()
+    assert [entry['athlete_id'] for entry in board['top']] == [bob.id, alice.id]
+    assert board['me']['rank'] == 2
+
+
+def test_race_leaderboard_answers_304_until_a_write(client, make_runner):
+    alice = make_runner('alice@sweatjunkies.test')
+    bob = make_runner('bob@sweatjunkies.test')
+    race_id = post_race(client, alice).get_json()['id']
+    etag = client.get(f'/api/races/{race_id}/leaderboard', headers=alice.headers).headers['ETag']
+    headers = dict(alice.headers, **{'If-None-Match': etag})
+
+    assert client.get(f'/api/races/{race_id}/leaderboard', headers=headers).status_code == 304
+    post_race(client, bob, completion_time='2:59:00')
+    assert client.get(f'/api/races/{race_id}/leaderboard', headers=headers).status_code == 200
+
+
+def test_leaderboards_reject_invalid_arguments(client, runner):
+    race_id = post_race(client, runner).get_json()['id']
+
+    assert client.get('/api/races/999/leaderboard', headers=runner.headers).status_code == 404
+    assert client.get(f'/api/races/{race_id}/leaderboard?top=many', headers=runner.headers).status_code == 400
+    assert client.get('/api/leaderboards/far', headers=runner.headers).status_code == 400
+    assert client.get('/api/leaderboards/marathon?neighbours=x', headers=runner.headers).status_code == 400
+
+
+def test_distance_leaderboard_covers_races_within_tolerance(client, make_runner):
+    alice = make_runner('alice@sweatjunkies.test')
+    bob = make_runner('bob@sweatjunkies.test')
+    post_race(client, alice, completion_time='3:30:00')
+    post_race(client, bob, race_name='Chicago Marathon', date='2024-10-13', distance='26.2 mi', completion_time='3:10:00')
+
+    board = client.get('/api/leaderboards/marathon', headers=alice.headers).get_json()
+
+    assert [entry['athlete_id'] for entry in board['top']] == [bob.id, alice.id]
+
+
+def test_leaderboards_answer_404_for_an_unknown_athlete(client, runner, stranger):
+    race_id = post_race(client, runner).get_json()['id']
+
+    assert client.get(f'/api/races/{race_id}/leaderboard', headers=stranger).status_code == 404
+    assert client.get('/api/leaderboards/marathon', headers=stranger).status_code == 404
@@ -0,0 +1,172 @@
+# utils/account_deletion.py
+"""Account deletion, immediate or tombstone-then-purge.
+
+The relationships on Athlete use passive_deletes, so deleting an athlete is
+one DELETE statement and the ON DELETE CASCADE foreign keys remove their
+activities, race entries, rollups and analytics inside the database; nothing
+is loaded into the session first.
+
+That is still one transaction over every child row, which for a long-time
+user holds the write lock for a while. With ACCOUNT_DELETE_MODE=async (the
+default is sync) the request only writes a tombstone and answers 202 instead
+of 200: the athlete is marked deleted, their email is released and their
+race entries are removed, so they vanish from login, identity lookups and
+shared listings straight away. AthletePurger then deletes the remaining rows
+PURGE_BATCH_SIZE at a time, one short transaction per batch, and finally the
+athlete row itself. Tombstones live in the athletes table, so a purge that a
+stopped process left unfinished is picked up by the next sweep.
+"""
+import logging
+import os
+import queue
+import threading
+from datetime import datetime
+from sqlalchemy import event, select, delete
+from config import db
+from models import Athlete, Activity, RaceParticipation, TrainingRollup
+
+PURGE_BATCH_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+# Deleted in batches, largest first; anything left is removed by the cascade from athletes
+PURGED_MODELS = (Activity, TrainingRollup, RaceParticipation)
+
+
+def tombstone_athlete(athlete):
+    """Mark an athlete deleted in the current transaction; their rows are purged after commit."""
+    athlete.deleted_at = datetime.utcnow()
+    athlete.email = f'deleted-{athlete.id}@deleted.invalid'  # Free the address for a new account
+    athlete.password_hash = '!'
+    db.session.execute(
+        delete(RaceParticipation)
+        .where(RaceParticipation.athlete_id == athlete.id)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.info.setdefault('purge_ids', []).append(athlete.id)
+
+
+def purge_athlete(athlete_id, batch_size=PURGE_BATCH_SIZE):
+    """Delete a tombstoned athlete's rows in batches, each committed on its own, then the athlete.
+
+    Returns the number of child rows deleted. Safe to run twice or
+    concurrently for the same athlete.
+    """
+    deleted = 0
+    for model in PURGED_MODELS:
+        while True:
+            batch = select(model.id).where(model.athlete_id == athlete_id).limit(batch_size)
+            result = db.session.execute(
+                delete(model).where(model.id.in_(batch.scalar_subquery())).execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                break
+
+    db.session.execute(
+        delete(Athlete)
+        .where(Athlete.id == athlete_id, Athlete.deleted_at.is_not(None))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return deleted
+
+
+class AthletePurger:
+    """One background thread per process that purges tombstoned athletes.
+
+    Athletes tombstoned by this process are queued once the request commits;
+    between requests the thread sweeps the athletes table for tombstones any
+    process left behind.
+    """
+
+    def __init__(self):
+        self.app = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.asynchronous = os.getenv('ACCOUNT_DELETE_MODE', 'sync') == 'async'
+        self.batch_size = int(os.getenv('PURGE_BATCH_SIZE', PURGE_BATCH_SIZE))
+        self.sweep_interval = int(os.getenv('PURGE_SWEEP_INTERVAL_SECONDS', 60))
+        # As with the mail queue, the test profile runs no thread; purge_due() does the work there
+        self.threaded = not app.testing
+        event.listen(db.session, 'after_commit', self._after_commit)
+        event.listen(db.session, 'after_rollback', self._after_rollback)
+        # The sweep must run even if nothing is deleted here, to finish purges a previous process left.
+        # gunicorn starts it in post_fork; this covers the development server.
+        if self.asynchronous:
+            app.before_request(self.start)
+
+    def start(self):
+        """Start the purge thread, once per process."""
+        if not self.threaded:
+            return
+        if self._thread and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                # Threads and queued ids do not survive a fork
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='athlete-purger', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        """Stop after the current batch; unfinished purges keep their tombstone for the next sweep."""
+        with self._lock:
+            self._stopping.set()
+            if self._thread:
+                self._thread.join(timeout)
+            self._thread = None
+
+    def purge_due(self):
+        """Synchronously purge every tombstoned athlete. Returns the number purged."""
+        athlete_ids = self._tombstoned_ids()
+        for athlete_id in athlete_ids:
+            purge_athlete(athlete_id, self.batch_size)
+        return len(athlete_ids)
+
+    def _after_commit(self, session):
+        athlete_ids = session.info.pop('purge_ids', None)
+        if athlete_ids and self.threaded:
+            self.start()
+            for athlete_id in athlete_ids:
+                self._queue.put(athlete_id)
+
+    def _after_rollback(self, session):
+        session.info.pop('purge_ids', None)
+
+    def _tombstoned_ids(self):
+        return db.session.scalars(
+            select(Athlete.id).where(Athlete.deleted_at.is_not(None)).order_by(Athlete.deleted_at)
+        ).all()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                athlete_ids = [self._queue.get(timeout=self.sweep_interval)]
+            except queue.Empty:
+                athlete_ids = None
+            with self.app.app_context():
+                try:
+                    if athlete_ids is None:
+                        athlete_ids = self._tombstoned_ids()
+                    for athlete_id in athlete_ids:
+                        if self._stopping.is_set():
+                            break
+                        purge_athlete(athlete_id, self.batch_size)
+                except Exception:
+                    db.session.rollback()
+                    logger.exception('Athlete purge error')
+
+
+athlete_purger = AthletePurger()
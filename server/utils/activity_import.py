@@ -0,0 +1,118 @@
+# utils/activity_import.py
+import csv
+import io
+import re
+from datetime import date
+from sqlalchemy import insert
+from config import db
+from models import Activity
+from utils.rollups import aggregate, record_totals
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+# Bytes that are not valid UTF-8 decode to lone surrogates under surrogateescape
+UNDECODABLE = re.compile('[\udc80-\udcff]')
+
+
+class CSVImportError(ValueError):
+    """The upload is not readable as CSV; `line` is the 1-based line in the file."""
+
+    def __init__(self, line, message):
+        super().__init__(f'Line {line}: {message}')
+        self.line = line
+
+
+def iter_csv_rows(stream):
+    """Read a date,description,duration CSV upload one row at a time.
+
+    Raises CSVImportError for text that is not UTF-8 or not valid CSV.
+    Decoding errors are caught line by line rather than per buffered chunk,
+    so the reported line is the one holding the bad bytes.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8', errors='surrogateescape', newline='')
+    line_number = 0
+
+    def lines():
+        nonlocal line_number
+        for line_number, line in enumerate(text, start=1):
+            if UNDECODABLE.search(line):
+                raise CSVImportError(line_number, 'not valid UTF-8 text')
+            yield line
+
+    try:
+        yield from csv.DictReader(lines())
+    except csv.Error as e:
+        raise CSVImportError(line_number, str(e))
+
+
+def validate_row(row):
+    """Return (date, description, duration) for a valid row, or raise ValueError."""
+    if not isinstance(row, dict):
+        raise ValueError('Row must be an object with date, description and duration')
+
+    raw_date = row.get('date')
+    try:
+        if not isinstance(raw_date, str) or len(raw_date) != 10:
+            raise ValueError
+        activity_date = date.fromisoformat(raw_date)
+    except ValueError:
+        raise ValueError('Invalid date format. Use YYYY-MM-DD.')
+
+    description = row.get('description')
+    if not isinstance(description, str) or not description.strip():
+        raise ValueError('Description is required')
+    if len(description) > 255:
+        raise ValueError('Description must be at most 255 characters')
+
+    try:
+        duration = int(row.get('duration'))
+    except (TypeError, ValueError):
+        raise ValueError('Duration must be a whole number of minutes')
+    if duration < 1:
+        raise ValueError('Duration must be at least 1 minute')
+
+    return activity_date, description, duration
+
+
+def import_activities(athlete_id, rows, batch_size=IMPORT_BATCH_SIZE):
+    """Validate rows as they stream in and insert the valid ones in executemany batches.
+
+    Everything, including the rollup update, happens in the caller's transaction.
+    Returns (imported_count, error_count, errors); errors lists the first
+    MAX_REPORTED_ERRORS problems as {'row': n, 'message': ...} with 1-based row numbers.
+    """
+    imported = 0
+    error_count = 0
+    errors = []
+    batch = []
+    totals = None
+
+    def flush():
+        nonlocal totals
+        db.session.execute(insert(Activity), batch)
+        totals = aggregate(
+            ((athlete_id, row['date'], row['description'], row['duration']) for row in batch),
+            totals,
+        )
+        batch.clear()
+
+    for row_number, row in enumerate(rows, start=1):
+        try:
+            activity_date, description, duration = validate_row(row)
+        except ValueError as e:
+            error_count += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({'row': row_number, 'message': str(e)})
+            continue
+
+        batch.append({'athlete_id': athlete_id, 'date': activity_date, 'description': description, 'duration': duration})
+        imported += 1
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    if totals:
+        record_totals(totals)
+    return imported, error_count, errors
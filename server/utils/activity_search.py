@@ -0,0 +1,126 @@
+# utils/activity_search.py
+"""Full-text search over activity descriptions.
+
+On SQLite, activities_fts is an external-content FTS5 table over
+activities(description, athlete_id): it stores only the inverted index and
+reads row text back from activities. Triggers keep it in step with every
+insert, delete and update, so ORM writes, bulk imports and raw SQL all stay
+searchable. athlete_id is indexed as a token, which lets FTS5 intersect the
+athlete's rows with the matching terms inside the index instead of
+filtering a global match list afterwards. bm25 weighs only the description.
+
+On PostgreSQL the same search runs against a GIN index on
+to_tsvector('english', description), ranked by ts_rank.
+
+The migration that adds the index is frozen; the DDL here also creates it
+for databases built with db.create_all().
+"""
+import re
+from sqlalchemy import DDL, column, event, func, literal_column, select, table, text
+from config import db
+from models import Activity
+from utils.read_models import ACTIVITY_COLUMNS, ActivityRow
+
+MAX_SEARCH_TERMS = 8
+MAX_SEARCH_OFFSET = 10000
+
+FTS_TABLE = 'activities_fts'
+PG_INDEX = 'ix_activities_description_tsv'
+
+# Not a model: only the FTS5 hidden columns the search query reads
+activities_fts = table(FTS_TABLE, column('rowid'), column(FTS_TABLE))
+
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS activities_fts USING fts5("
+    "description, athlete_id, content='activities', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS activities_fts_ai AFTER INSERT ON activities BEGIN "
+    "INSERT INTO activities_fts(rowid, description, athlete_id) VALUES (new.id, new.description, new.athlete_id); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS activities_fts_ad AFTER DELETE ON activities BEGIN "
+    "INSERT INTO activities_fts(activities_fts, rowid, description, athlete_id) "
+    "VALUES ('delete', old.id, old.description, old.athlete_id); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS activities_fts_au AFTER UPDATE OF description, athlete_id ON activities BEGIN "
+    "INSERT INTO activities_fts(activities_fts, rowid, description, athlete_id) "
+    "VALUES ('delete', old.id, old.description, old.athlete_id); "
+    "INSERT INTO activities_fts(rowid, description, athlete_id) VALUES (new.id, new.description, new.athlete_id); "
+    "END",
+)
+POSTGRES_SEARCH_DDL = (
+    f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON activities USING gin (to_tsvector('english', description))",
+)
+
+
+def search_terms(query):
+    """Split user input into at most MAX_SEARCH_TERMS lower-cased word tokens.
+
+    Only word characters survive, so nothing typed can reach the FTS5 or
+    tsquery syntax as an operator.
+    """
+    return re.findall(r'\w+', query.lower())[:MAX_SEARCH_TERMS]
+
+
+def _fts5_query(athlete_id, terms):
+    # Every term must match; the last one is a prefix so partly typed words still find results
+    phrases = [f'"{term}"' for term in terms]
+    phrases[-1] += '*'
+    return f'athlete_id : "{athlete_id}" AND description : ({" AND ".join(phrases)})'
+
+
+def _tsquery(terms):
+    return ' & '.join(terms[:-1] + [f'{terms[-1]}:*'])
+
+
+def search_activities(athlete, query, limit, offset=0):
+    """The athlete's activities matching every term of `query`, best match first.
+
+    Returns ActivityRow items, the same shape as the activities list.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    if db.engine.dialect.name == 'sqlite':
+        rank = func.bm25(literal_column(FTS_TABLE), 1.0, 0.0)
+        statement = (
+            select(*ACTIVITY_COLUMNS)
+            .join(activities_fts, activities_fts.c.rowid == Activity.id)
+            .where(activities_fts.c[FTS_TABLE].match(_fts5_query(athlete.id, terms)))
+            .order_by(rank, Activity.id.desc())
+        )
+    else:
+        vector = func.to_tsvector('english', Activity.description)
+        tsquery = func.to_tsquery('english', _tsquery(terms))
+        statement = (
+            select(*ACTIVITY_COLUMNS)
+            .where(Activity.athlete_id == athlete.id, vector.op('@@')(tsquery))
+            .order_by(func.ts_rank(vector, tsquery).desc(), Activity.id.desc())
+        )
+    statement = statement.limit(limit).offset(offset)
+
+    athlete_name = f'{athlete.first_name} {athlete.last_name}'
+    return [ActivityRow(*row, athlete_name) for row in db.session.execute(statement)]
+
+
+def rebuild_search_index():
+    """Recreate the search index from the activities table and return the number of rows indexed."""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            db.session.execute(text(statement))
+        db.session.execute(text("INSERT INTO activities_fts(activities_fts) VALUES ('rebuild')"))
+        db.session.execute(text("INSERT INTO activities_fts(activities_fts) VALUES ('optimize')"))
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_SEARCH_DDL:
+            db.session.execute(text(statement))
+        db.session.execute(text(f'REINDEX INDEX {PG_INDEX}'))
+    db.session.commit()
+    return db.session.scalar(select(func.count()).select_from(Activity))
+
+
+# Databases built with db.create_all() get the index too; 'rebuild' also
+# refills an activities_fts left behind by an earlier drop_all()
+for _statement in SQLITE_SEARCH_DDL + ("INSERT INTO activities_fts(activities_fts) VALUES ('rebuild')",):
+    event.listen(Activity.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in POSTGRES_SEARCH_DDL:
+    event.listen(Activity.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
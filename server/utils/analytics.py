@@ -0,0 +1,211 @@
+# utils/analytics.py
+"""Personal records, pace trends and race-time predictions computed with NumPy.
+
+An athlete's races and activities are read in one UNION ALL query and turned
+into column arrays; every statistic is then computed with array operations
+rather than per-row Python loops. Results are stored in athlete_analytics
+together with the athlete's data version (see utils/conditional.py), so they
+are recomputed only after a race or activity write has bumped that version.
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from itertools import groupby
+import numpy as np
+from sqlalchemy import select, literal, null, union_all
+from config import db
+from models import Activity, AthleteAnalytics, DataVersion, Race, RaceParticipation
+from utils.race_units import DISTANCE_TOLERANCE, format_duration
+from utils.upsert import upsert_insert
+
+STANDARD_DISTANCES = np.array([5000, 10000, 21097, 42195])
+STANDARD_DISTANCE_NAMES = ['5K', '10K', 'Half Marathon', 'Marathon']
+RIEGEL_EXPONENT = 1.06
+PACE_WINDOW = 5  # Races per rolling pace average
+PREDICTION_LOOKBACK_DAYS = 365  # Only recent races reflect current fitness
+TRAINING_WINDOW_DAYS = 28
+TRAINING_WEEKS = 12
+
+RACE, ACTIVITY = 0, 1
+
+
+def history_query(athlete_ids=None):
+    """Races and activities as (athlete_id, kind, date, meters, seconds) rows in a single statement."""
+    races = (
+        select(
+            RaceParticipation.athlete_id, literal(RACE).label('kind'), Race.date,
+            Race.distance_meters.label('meters'), RaceParticipation.completion_time_seconds.label('seconds'),
+        )
+        .join(Race, Race.id == RaceParticipation.race_id)
+        .where(Race.distance_meters > 0, RaceParticipation.completion_time_seconds > 0)
+    )
+    activities = select(
+        Activity.athlete_id, literal(ACTIVITY).label('kind'), Activity.date,
+        null().label('meters'), (Activity.duration * 60).label('seconds'),
+    )
+    if athlete_ids is not None:
+        races = races.where(RaceParticipation.athlete_id.in_(athlete_ids))
+        activities = activities.where(Activity.athlete_id.in_(athlete_ids))
+    history = union_all(races, activities).subquery()
+    return select(history).order_by(history.c.athlete_id)
+
+
+def to_arrays(rows):
+    """Split history rows into race and activity column arrays."""
+    rows = list(rows)
+    kinds = np.fromiter((row[1] for row in rows), dtype=np.int8, count=len(rows))
+    days = np.fromiter((row[2].toordinal() for row in rows), dtype=np.int64, count=len(rows))
+    meters = np.fromiter((row[3] or 0 for row in rows), dtype=np.float64, count=len(rows))
+    seconds = np.fromiter((row[4] for row in rows), dtype=np.float64, count=len(rows))
+    is_race = kinds == RACE
+    return (days[is_race], meters[is_race], seconds[is_race]), (days[~is_race], seconds[~is_race] / 60)
+
+
+def _day(ordinal):
+    return date.fromordinal(int(ordinal)).strftime('%Y-%m-%d')
+
+
+def personal_records(days, meters, seconds):
+    """Fastest time at every distance run, and at each standard distance within tolerance."""
+    if not len(seconds):
+        return [], []
+    order = np.lexsort((seconds, meters))
+    _, first = np.unique(meters[order], return_index=True)
+    best = order[first]
+    by_distance = [
+        {'distance_meters': int(meters[i]), 'date': _day(days[i]), 'seconds': int(seconds[i]), 'time': format_duration(seconds[i])}
+        for i in best
+    ]
+
+    # A race counts toward a standard distance when within DISTANCE_TOLERANCE of it
+    matches = np.abs(meters[:, None] - STANDARD_DISTANCES[None, :]) <= STANDARD_DISTANCES[None, :] * DISTANCE_TOLERANCE
+    candidate_times = np.where(matches, seconds[:, None], np.inf)
+    best_race = candidate_times.argmin(axis=0)
+    has_record = np.isfinite(candidate_times.min(axis=0))
+    standard = [
+        {
+            'name': name, 'distance_meters': int(distance), 'date': _day(days[i]),
+            'seconds': int(seconds[i]), 'time': format_duration(seconds[i])
+        }
+        for name, distance, i, found in zip(STANDARD_DISTANCE_NAMES, STANDARD_DISTANCES, best_race, has_record) if found
+    ]
+    return standard, by_distance
+
+
+def pace_trend(days, meters, seconds):
+    """Pace per race (seconds per km) with a trailing PACE_WINDOW-race moving average."""
+    if not len(days):
+        return []
+    order = np.argsort(days, kind='stable')
+    pace = seconds[order] / (meters[order] / 1000)
+    window = np.ones(min(PACE_WINDOW, len(pace)))
+    sums = np.convolve(pace, window)[:len(pace)]
+    rolling = sums / np.minimum(np.arange(1, len(pace) + 1), len(window))
+    return [
+        {'date': _day(day), 'pace_seconds_per_km': round(float(p), 1), 'rolling_pace_seconds_per_km': round(float(r), 1)}
+        for day, p, r in zip(days[order], pace, rolling)
+    ]
+
+
+def predictions(days, meters, seconds):
+    """Riegel predictions T2 = T1 * (D2 / D1) ** 1.06, taking the best estimate over recent races."""
+    if not len(days):
+        return []
+    recent = days >= days.max() - PREDICTION_LOOKBACK_DAYS
+    estimates = seconds[recent, None] * (STANDARD_DISTANCES[None, :] / meters[recent, None]) ** RIEGEL_EXPONENT
+    best = estimates.min(axis=0)
+    return [
+        {'name': name, 'distance_meters': int(distance), 'seconds': int(round(t)), 'time': format_duration(t)}
+        for name, distance, t in zip(STANDARD_DISTANCE_NAMES, STANDARD_DISTANCES, best)
+    ]
+
+
+def training_load(days, minutes):
+    """Minutes trained over the TRAINING_WINDOW_DAYS ending on each of the last TRAINING_WEEKS weeks."""
+    if not len(days):
+        return []
+    first, last = days.min(), days.max()
+    per_day = np.bincount(days - first, weights=minutes)
+    cumulative = np.concatenate(([0.0], np.cumsum(per_day)))
+    ends = last - 7 * np.arange(TRAINING_WEEKS)[::-1]
+    ends = ends[ends >= first]
+    end_index = ends - first + 1
+    start_index = np.maximum(end_index - TRAINING_WINDOW_DAYS, 0)
+    totals = cumulative[end_index] - cumulative[start_index]
+    return [{'date': _day(end), 'minutes': int(total)} for end, total in zip(ends, totals)]
+
+
+def compute_analytics(rows):
+    (race_days, race_meters, race_seconds), (activity_days, activity_minutes) = to_arrays(rows)
+    standard, by_distance = personal_records(race_days, race_meters, race_seconds)
+    return {
+        'personal_records': standard,
+        'personal_records_by_distance': by_distance,
+        'pace_trend': pace_trend(race_days, race_meters, race_seconds),
+        'predictions': predictions(race_days, race_meters, race_seconds),
+        'training_load': training_load(activity_days, activity_minutes)
+    }
+
+
+def _data_versions(athlete_ids=None):
+    """Map athlete id to data version; athletes never written to are at version 0."""
+    query = select(DataVersion.key, DataVersion.version)
+    if athlete_ids is None:
+        rows = db.session.execute(query.where(DataVersion.key.like('athlete:%'))).all()
+        return defaultdict(int, {int(key.split(':', 1)[1]): version for key, version in rows})
+    keys = {f'athlete:{athlete_id}': athlete_id for athlete_id in athlete_ids}
+    rows = db.session.execute(query.where(DataVersion.key.in_(keys))).all()
+    versions = dict.fromkeys(athlete_ids, 0)
+    versions.update({keys[key]: version for key, version in rows})
+    return versions
+
+
+def _store(results, versions):
+    now = datetime.utcnow()
+    for athlete_id, payload in results.items():
+        upsert = upsert_insert(AthleteAnalytics)
+        values = {'athlete_id': athlete_id, 'version': versions[athlete_id], 'payload': payload, 'computed_at': now}
+        if upsert is not None:
+            db.session.execute(upsert.values(**values).on_conflict_do_update(
+                index_elements=['athlete_id'],
+                set_={'version': values['version'], 'payload': payload, 'computed_at': now},
+            ))
+        else:
+            db.session.merge(AthleteAnalytics(**values))
+
+
+def get_analytics(athlete_id):
+    """Return cached analytics for an athlete, recomputing them if their data changed since."""
+    version = _data_versions([athlete_id])[athlete_id]
+    cached = db.session.get(AthleteAnalytics, athlete_id)
+    if cached is not None and cached.version == version:
+        return cached.to_dict()
+
+    payload = compute_analytics(db.session.execute(history_query([athlete_id])))
+    _store({athlete_id: payload}, {athlete_id: version})
+    db.session.commit()
+    return dict(payload, computed_at=datetime.utcnow())
+
+
+def recompute_all(athlete_ids=None, batch_size=500):
+    """Batch mode: recompute analytics for many athletes from one streamed history query.
+
+    Rows arrive ordered by athlete, so each athlete's arrays are built and
+    released in turn; results are written every `batch_size` athletes.
+    """
+    # Versions are read before the history, so a write landing mid-run leaves its athlete tagged
+    # with the older version and recomputed on their next read instead of cached as current
+    versions = _data_versions(athlete_ids)
+    rows = db.session.execute(history_query(athlete_ids).execution_options(yield_per=10000))
+    results = {}
+    computed = 0
+    for athlete_id, athlete_rows in groupby(rows, key=lambda row: row[0]):
+        results[athlete_id] = compute_analytics(athlete_rows)
+        if len(results) >= batch_size:
+            _store(results, versions)
+            computed += len(results)
+            results = {}
+    if results:
+        _store(results, versions)
+        computed += len(results)
+    db.session.commit()
+    return computed
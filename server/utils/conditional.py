@@ -0,0 +1,120 @@
+# utils/conditional.py
+"""ETag / Last-Modified support driven by version counters that write paths bump.
+
+Each cached read declares the version keys its response depends on:
+'athlete:<id>' for one athlete's own data and RACES_KEY for the shared race
+listing. Write paths call bump_versions() in the same transaction as their
+change. A GET whose validators still match answers 304 after one primary-key
+lookup, without running the real query or serializing anything.
+"""
+import hashlib
+from datetime import datetime
+from functools import wraps
+from flask import request, make_response
+from werkzeug.http import http_date
+from sqlalchemy import select
+from config import db
+from models import DataVersion
+from utils.current_athlete import current_athlete_id
+from utils.upsert import upsert_insert
+
+RACES_KEY = 'races'
+BUMP_BATCH_SIZE = 1000
+
+# Responses may be stored but must be revalidated, so browsers send If-None-Match on every refetch
+CACHE_CONTROL = 'private, no-cache'
+
+
+def athlete_key(athlete_id=None):
+    return f'athlete:{current_athlete_id() if athlete_id is None else athlete_id}'
+
+
+def bump_versions(*keys):
+    """Advance the version of each key; call before the session commits."""
+    if not keys:
+        return
+    now = datetime.utcnow()
+    upsert = upsert_insert(DataVersion)
+    if upsert is not None:
+        # executemany in chunks, so bumping every finisher of an imported race stays cheap
+        statement = upsert.on_conflict_do_update(
+            index_elements=['key'],
+            set_={'version': DataVersion.version + 1, 'updated_at': now},
+        )
+        keys = list(dict.fromkeys(keys))
+        for start in range(0, len(keys), BUMP_BATCH_SIZE):
+            db.session.execute(statement, [
+                {'key': key, 'version': 1, 'updated_at': now} for key in keys[start:start + BUMP_BATCH_SIZE]
+            ])
+        return
+
+    for key in keys:
+        version = db.session.get(DataVersion, key, with_for_update=True)
+        if version is None:
+            db.session.add(DataVersion(key=key, version=1, updated_at=now))
+        else:
+            version.version += 1
+            version.updated_at = now
+
+
+def current_validators(keys):
+    """Return (etag, last_modified) for the current versions of `keys` and this request's URL."""
+    rows = db.session.execute(
+        select(DataVersion.key, DataVersion.version, DataVersion.updated_at).where(DataVersion.key.in_(keys))
+    ).all()
+    versions = {key: (version, updated_at) for key, version, updated_at in rows}
+    fingerprint = ';'.join(f'{key}={versions.get(key, (0, None))[0]}' for key in keys)
+    fingerprint += '|' + request.full_path
+    etag = hashlib.sha1(fingerprint.encode()).hexdigest()
+    timestamps = [updated_at for _, updated_at in versions.values()]
+    return etag, max(timestamps) if timestamps else None
+
+
+def _not_modified(etag, last_modified):
+    # The ETag is exact; If-Modified-Since is only a fallback for clients that send no If-None-Match
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and last_modified:
+        # HTTP dates have whole seconds, so a second write within the client's second would look
+        # unchanged; a version last bumped in that same second counts as modified
+        return last_modified.replace(microsecond=0) < request.if_modified_since.replace(tzinfo=None)
+    return False
+
+
+def _set_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+def conditional(*keys):
+    """Decorate a GET handler with validators built from version keys.
+
+    Keys are strings or callables evaluated per request (e.g. athlete_key).
+    The handler may return a (data, status[, headers]) tuple or a Response.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(*args, **kwargs):
+            resolved = [key() if callable(key) else key for key in keys]
+            etag, last_modified = current_validators(resolved)
+            if _not_modified(etag, last_modified):
+                return _set_validators(make_response('', 304), etag, last_modified)
+
+            result = handler(*args, **kwargs)
+            if isinstance(result, tuple):
+                data, status = result[0], result[1]
+                headers = dict(result[2]) if len(result) > 2 else {}
+                if status == 200:
+                    headers['ETag'] = f'"{etag}"'
+                    headers['Cache-Control'] = CACHE_CONTROL
+                    if last_modified:
+                        headers['Last-Modified'] = http_date(last_modified)
+                return data, status, headers
+            if result.status_code == 200:
+                _set_validators(result, etag, last_modified)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,118 @@
+# utils/current_athlete.py
+"""Resolve the athlete behind the JWT once per request.
+
+Tokens carry {'email', 'id'}. The id is authoritative: athletes are always
+looked up by primary key, and the email in a token is never used for lookups.
+Changing an email through the profile endpoint therefore leaves existing
+tokens valid, and a token minted before the change cannot resolve to whoever
+takes the old address later. Deleting an athlete makes their outstanding
+tokens resolve to nothing (404) as soon as the cache entry is invalidated,
+including while a tombstoned account is still being purged.
+
+The identity cache is per process. Profile updates and deletes invalidate it
+locally; other server processes see the change within IDENTITY_CACHE_TTL
+seconds.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import select
+from config import db
+from models import Athlete
+
+CurrentAthlete = namedtuple('CurrentAthlete', ['id', 'email', 'first_name', 'last_name'])
+
+
+class IdentityCache:
+    """Small thread-safe LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize=1024, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+identity_cache = IdentityCache(
+    maxsize=int(os.getenv('IDENTITY_CACHE_SIZE', 1024)),
+    ttl=float(os.getenv('IDENTITY_CACHE_TTL', 30))
+)
+
+
+def current_athlete_id():
+    return get_jwt_identity()['id']
+
+
+def _remember(athlete):
+    current = CurrentAthlete(athlete.id, athlete.email, athlete.first_name, athlete.last_name)
+    identity_cache.set(athlete.id, current)
+    g.current_athlete = current
+    return current
+
+
+def get_current_athlete():
+    """Return the caller as a CurrentAthlete tuple, or None if the account no longer exists.
+
+    Memoized for the request and served from the identity cache when possible,
+    so handlers that only need the id cost no query.
+    """
+    if 'current_athlete' in g:
+        return g.current_athlete
+
+    athlete_id = current_athlete_id()
+    current = identity_cache.get(athlete_id)
+    if current is None:
+        row = db.session.execute(
+            select(Athlete.id, Athlete.email, Athlete.first_name, Athlete.last_name)
+            .where(Athlete.id == athlete_id, Athlete.deleted_at.is_(None))
+        ).first()
+        current = CurrentAthlete(*row) if row else None
+        if current is not None:
+            identity_cache.set(athlete_id, current)
+    g.current_athlete = current
+    return current
+
+
+def load_current_athlete(*options):
+    """Load the caller as an Athlete model by primary key, with optional loader options."""
+    athlete = db.session.get(Athlete, current_athlete_id(), options=options)
+    if athlete is None or athlete.deleted_at is not None:
+        return None
+    _remember(athlete)
+    return athlete
+
+
+def forget_athlete(athlete_id):
+    """Drop an athlete from the identity cache after their profile changes or is deleted."""
+    identity_cache.invalidate(athlete_id)
+    g.pop('current_athlete', None)
@@ -1,6 +1,21 @@
 # utils/email_utils.py
+from utils.mail_queue import mail_queue
+
+# Both helpers only write to the outbox in the caller's transaction.
+# The message goes out from the mail queue's workers once the caller commits.
+
+def send_welcome_email(user_email):
+    mail_queue.enqueue(
+        to_email=user_email,
+        subject="Welcome to Sweat Junkies!",
+        plain_text_content=f"Hi {user_email}, welcome to Sweat Junkies! We're glad to have you.",
+        html_content=f"<strong>Hi {user_email}, welcome to Sweat Junkies! We're glad to have you.</strong>"
+    )
 
 def send_reset_email(to_email, reset_url):
-    # Function to send an email (use an email library like smtplib or a service like SendGrid)
-    # This is a placeholder function for now
-    print(f"Password reset link: {reset_url}")
+    mail_queue.enqueue(
+        to_email=to_email,
+        subject="Reset your Sweat Junkies password",
+        plain_text_content=f"Use this link to reset your password. It expires in one hour: {reset_url}",
+        html_content=f"<p>Use this link to reset your password. It expires in one hour:</p><p><a href=\"{reset_url}\">{reset_url}</a></p>"
+    )
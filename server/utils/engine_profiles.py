@@ -0,0 +1,101 @@
+# utils/engine_profiles.py
+"""Named SQLAlchemy engine profiles, chosen with the DB_PROFILE environment variable.
+
+    dev                  file-backed SQLite with default pooling
+    test                 one shared in-memory SQLite connection; the app runs no background threads
+    production-sqlite    SQLite in WAL mode with pragmas tuned for concurrent readers
+    production-postgres  pooled Postgres connections, pre-pinged and recycled
+
+DATABASE_URL overrides the profile's database, and the DB_POOL_SIZE,
+DB_MAX_OVERFLOW, DB_POOL_TIMEOUT and DB_POOL_RECYCLE variables override its
+pool settings. SQLite pragmas run on every new DBAPI connection; every SQLite
+profile enforces foreign keys, which SQLite leaves off by default, so the
+ON DELETE CASCADE constraints remove an athlete's rows with the athlete.
+"""
+import os
+from collections import namedtuple
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+
+EngineProfile = namedtuple('EngineProfile', ['database_url', 'engine_options', 'pragmas'])
+
+PROFILES = {
+    'dev': EngineProfile(
+        database_url='sqlite:///app.db',
+        engine_options={},
+        pragmas={'foreign_keys': 'ON', 'busy_timeout': 5000},
+    ),
+    'test': EngineProfile(
+        database_url='sqlite://',
+        engine_options={'poolclass': StaticPool, 'connect_args': {'check_same_thread': False}},
+        pragmas={'foreign_keys': 'ON'},
+    ),
+    'production-sqlite': EngineProfile(
+        database_url='sqlite:///app.db',
+        engine_options={'pool_size': 10, 'max_overflow': 10, 'pool_timeout': 30},
+        pragmas={
+            'foreign_keys': 'ON',
+            'journal_mode': 'WAL',  # Readers no longer block the writer, or the writer readers
+            'synchronous': 'NORMAL',  # Durable across application crashes; fsync only at checkpoints in WAL mode
+            'busy_timeout': 5000,  # Wait for the write lock instead of failing with "database is locked"
+            'cache_size': -64000,  # 64 MB page cache per connection (negative values are KiB)
+            'mmap_size': 268435456,  # Read pages through a 256 MB memory map
+            'temp_store': 'MEMORY',
+        },
+    ),
+    'production-postgres': EngineProfile(
+        database_url=None,  # DATABASE_URL is required
+        engine_options={
+            'pool_size': 10,
+            'max_overflow': 20,
+            'pool_timeout': 30,
+            'pool_pre_ping': True,  # Replace connections the server or a proxy closed while idle
+            'pool_recycle': 1800,
+        },
+        pragmas={},
+    ),
+}
+
+POOL_OVERRIDES = {
+    'DB_POOL_SIZE': ('pool_size', int),
+    'DB_MAX_OVERFLOW': ('max_overflow', int),
+    'DB_POOL_TIMEOUT': ('pool_timeout', float),
+    'DB_POOL_RECYCLE': ('pool_recycle', int),
+}
+
+
+def get_profile(name=None, database_url=None):
+    """Resolve a profile by name (default DB_PROFILE, then 'dev') with environment overrides applied."""
+    name = name or os.getenv('DB_PROFILE', 'dev')
+    if name not in PROFILES:
+        raise ValueError(f'Unknown DB_PROFILE {name!r}; expected one of {", ".join(PROFILES)}')
+    profile = PROFILES[name]
+
+    database_url = database_url or os.getenv('DATABASE_URL') or profile.database_url
+    if database_url is None:
+        raise ValueError(f'DB_PROFILE {name!r} needs DATABASE_URL')
+    if database_url.startswith('postgres://'):
+        # Hosting providers still hand out the scheme SQLAlchemy dropped
+        database_url = 'postgresql://' + database_url[len('postgres://'):]
+
+    engine_options = dict(profile.engine_options)
+    if 'poolclass' not in engine_options:
+        for variable, (option, cast) in POOL_OVERRIDES.items():
+            if os.getenv(variable):
+                engine_options[option] = cast(os.getenv(variable))
+    return profile._replace(database_url=database_url, engine_options=engine_options)
+
+
+def install_pragmas(engine, pragmas):
+    """Run `pragmas` on every new connection of a SQLite engine."""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma, value in pragmas.items():
+                cursor.execute(f'PRAGMA {pragma}={value}')
+        finally:
+            cursor.close()
@@ -0,0 +1,46 @@
+# utils/heatmap.py
+"""Minutes trained per day, for the dashboard's calendar heatmap.
+
+One GROUP BY over an athlete's activity dates, served in date order by the
+(athlete_id, date, id) index, is expanded into a dense list with one integer
+per day of the range. A year encodes as about 1-2 KB of JSON.
+"""
+from datetime import date, timedelta
+from sqlalchemy import select, func
+from config import db
+from models import Activity
+
+DEFAULT_DAYS = 365
+MAX_DAYS = 3 * 366
+
+
+def today_key():
+    """Version key that changes at midnight, so cached "last 365 days" responses move with the calendar."""
+    return f'day:{date.today().isoformat()}'
+
+
+def heatmap_range(date_from=None, date_to=None):
+    """Resolve optional bounds to (start, end), by default the DEFAULT_DAYS days up to today.
+
+    Raises ValueError for a reversed range or one longer than MAX_DAYS.
+    """
+    end = date_to or (date_from + timedelta(days=DEFAULT_DAYS - 1) if date_from else date.today())
+    start = date_from or end - timedelta(days=DEFAULT_DAYS - 1)
+    if start > end:
+        raise ValueError('from must not be after to')
+    if (end - start).days + 1 > MAX_DAYS:
+        raise ValueError(f'Range is limited to {MAX_DAYS} days')
+    return start, end
+
+
+def daily_minutes(athlete_id, start, end):
+    """Total activity minutes for each day from start to end inclusive; days without activities are 0."""
+    statement = (
+        select(Activity.date, func.sum(Activity.duration))
+        .where(Activity.athlete_id == athlete_id, Activity.date.between(start, end))
+        .group_by(Activity.date)
+    )
+    minutes = [0] * ((end - start).days + 1)
+    for day, total in db.session.execute(statement):
+        minutes[(day - start).days] = int(total)
+    return minutes
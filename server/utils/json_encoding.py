@@ -0,0 +1,67 @@
+# utils/json_encoding.py
+"""One JSON encoder for every response: orjson when installed, the stdlib otherwise.
+
+Dates and datetimes are encoded natively as ISO 8601 ('2024-05-01',
+'2024-05-01T07:30:00'), so models hand out date objects and never format
+them per row. The same dumps() backs flask-restful resources (output_json),
+plain Flask routes (FastJSONProvider) and the streaming helpers.
+"""
+import dataclasses
+import json
+from datetime import date
+from decimal import Decimal
+from flask import make_response
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speed-up
+    orjson = None
+
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+
+def _default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if dataclasses.is_dataclass(value):  # Row DTOs from utils/read_models.py; orjson encodes these itself
+        return {field.name: getattr(value, field.name) for field in dataclasses.fields(value)}
+    if hasattr(value, 'tolist'):  # NumPy scalars and arrays
+        return value.tolist()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps_bytes(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(obj, default=_default, separators=(',', ':')).encode()
+
+
+def dumps(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS).decode()
+    return json.dumps(obj, default=_default, separators=(',', ':'))
+
+
+def loads(s):
+    return orjson.loads(s) if orjson is not None else json.loads(s)
+
+
+def output_json(data, code, headers=None):
+    """flask-restful representation for application/json."""
+    response = make_response(dumps_bytes(data), code)
+    response.headers['Content-Type'] = 'application/json'
+    response.headers.extend(headers or {})
+    return response
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider for jsonify() and request.get_json(), sharing the encoder above."""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj)
+
+    def loads(self, s, **kwargs):
+        return loads(s)
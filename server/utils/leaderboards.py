@@ -0,0 +1,111 @@
+# utils/leaderboards.py
+from sqlalchemy import select, func, or_, and_
+from config import db
+from models import Athlete, Race, RaceParticipation
+from utils.race_units import distance_range
+
+DEFAULT_TOP = 10
+MAX_TOP = 100
+DEFAULT_NEIGHBOURS = 2
+MAX_NEIGHBOURS = 10
+
+
+def _race_results(race_id):
+    """Every timed finisher of one race."""
+    return (
+        select(
+            RaceParticipation.athlete_id,
+            RaceParticipation.race_id,
+            RaceParticipation.completion_time,
+            RaceParticipation.completion_time_seconds,
+            RaceParticipation.id.label('participation_id'),
+        )
+        .where(RaceParticipation.race_id == race_id, RaceParticipation.completion_time_seconds.isnot(None))
+    )
+
+
+def _distance_results(distance_meters):
+    """Each athlete's best time over all races at a distance."""
+    low, high = distance_range(distance_meters)
+    timed = (
+        select(
+            RaceParticipation.athlete_id,
+            RaceParticipation.race_id,
+            RaceParticipation.completion_time,
+            RaceParticipation.completion_time_seconds,
+            RaceParticipation.id.label('participation_id'),
+            func.row_number().over(
+                partition_by=RaceParticipation.athlete_id,
+                order_by=(RaceParticipation.completion_time_seconds, RaceParticipation.id),
+            ).label('attempt'),
+        )
+        .join(Race, Race.id == RaceParticipation.race_id)
+        .where(Race.distance_meters.between(low, high), RaceParticipation.completion_time_seconds.isnot(None))
+        .subquery()
+    )
+    return (
+        select(
+            timed.c.athlete_id, timed.c.race_id, timed.c.completion_time,
+            timed.c.completion_time_seconds, timed.c.participation_id,
+        )
+        .where(timed.c.attempt == 1)
+    )
+
+
+def _leaderboard(results, athlete_id, top, neighbours):
+    """Rank results with window functions and return the top K plus the athlete's own neighbourhood.
+
+    Everything comes back from one statement: the ranked CTE is filtered to rows
+    that are in the top K or within `neighbours` places of the athlete.
+    """
+    results = results.subquery()
+    ranked = (
+        select(
+            results,
+            func.rank().over(order_by=results.c.completion_time_seconds).label('rank'),
+            func.row_number().over(order_by=(results.c.completion_time_seconds, results.c.participation_id)).label('position'),
+            func.count().over().label('finishers'),
+        )
+        .cte('ranked')
+    )
+    own_position = select(func.min(ranked.c.position)).where(ranked.c.athlete_id == athlete_id).scalar_subquery()
+    rows = db.session.execute(
+        select(ranked, Athlete.first_name, Athlete.last_name)
+        .join(Athlete, Athlete.id == ranked.c.athlete_id)
+        .where(or_(
+            ranked.c.position <= top,
+            and_(ranked.c.position >= own_position - neighbours, ranked.c.position <= own_position + neighbours),
+        ))
+        .order_by(ranked.c.position)
+    ).mappings().all()
+
+    entries = [
+        {
+            'rank': row['rank'],
+            'position': row['position'],
+            'athlete_id': row['athlete_id'],
+            'athlete_name': f"{row['first_name']} {row['last_name']}",
+            'race_id': row['race_id'],
+            'completion_time': row['completion_time'],
+            'completion_time_seconds': row['completion_time_seconds']
+        }
+        for row in rows
+    ]
+    me = next((entry for entry in entries if entry['athlete_id'] == athlete_id), None)
+    return {
+        'finishers': rows[0]['finishers'] if rows else 0,
+        'top': [entry for entry in entries if entry['position'] <= top],
+        'me': me,
+        'neighbours': [
+            entry for entry in entries
+            if me is not None and abs(entry['position'] - me['position']) <= neighbours
+        ]
+    }
+
+
+def race_leaderboard(race_id, athlete_id, top=DEFAULT_TOP, neighbours=DEFAULT_NEIGHBOURS):
+    return _leaderboard(_race_results(race_id), athlete_id, top, neighbours)
+
+
+def distance_leaderboard(distance_meters, athlete_id, top=DEFAULT_TOP, neighbours=DEFAULT_NEIGHBOURS):
+    return _leaderboard(_distance_results(distance_meters), athlete_id, top, neighbours)
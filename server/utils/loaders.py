@@ -0,0 +1,39 @@
+# utils/loaders.py
+from sqlalchemy.orm import selectinload
+from models import Athlete, RaceParticipation
+
+# Loader strategies for each endpoint, so nested responses are built in a fixed
+# number of queries instead of lazy-loading one relationship per row.
+# Activity.athlete is never listed: it is a many-to-one on the primary key, so it
+# resolves from the identity map once the parent Athlete has been loaded.
+ATHLETE_PROFILE_LOADERS = (
+    selectinload(Athlete.activities),
+    selectinload(Athlete.race_participations).joinedload(RaceParticipation.race),
+)
+
+# List endpoints (athletes, activities, races, race_participations) skip the ORM
+# altogether and read through utils/read_models.py.
+ENDPOINT_LOADERS = {
+    'login': ATHLETE_PROFILE_LOADERS,
+    'athlete_profile': ATHLETE_PROFILE_LOADERS,
+}
+
+# Maximum number of SQL statements each endpoint may issue per request.
+# benchmarks/check_query_budgets.py fails when a response goes over budget.
+# Endpoints with conditional GET support spend one extra query reading data versions.
+QUERY_BUDGETS = {
+    'login': 3,
+    'athlete_profile': 4,
+    'athletes': 3,
+    'activities': 3,
+    'activity_search': 3,
+    'heatmap': 2,
+    'races': 2,
+    'race_participations': 1,
+    'races_with_participants': 2,
+}
+
+
+def loaders_for(endpoint):
+    """Return the loader options declared for an endpoint."""
+    return ENDPOINT_LOADERS[endpoint]
@@ -0,0 +1,255 @@
+# utils/mail_queue.py
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import event, select, update, or_
+from config import db
+from models import OutboxMessage
+
+# Messages claimed by a worker are leased for this long; if the worker dies
+# mid-send the sweeper picks the message up again once the lease runs out.
+SEND_LEASE = timedelta(minutes=5)
+
+logger = logging.getLogger(__name__)
+
+
+class SendGridTransport:
+    """Delivers through SendGrid, reusing one API client for every message."""
+
+    def __init__(self, api_key=None, from_email=None):
+        self.api_key = api_key or os.getenv('SENDGRID_API_KEY')
+        self.from_email = from_email or os.getenv('MAIL_FROM', 'billychorey@gmail.com')
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                import sendgrid
+                self._client = sendgrid.SendGridAPIClient(api_key=self.api_key)
+            return self._client
+
+    def send(self, message):
+        from sendgrid.helpers.mail import Mail
+        response = self.client.send(Mail(
+            from_email=self.from_email,
+            to_emails=message.to_email,
+            subject=message.subject,
+            plain_text_content=message.plain_text_content,
+            html_content=message.html_content
+        ))
+        if response.status_code >= 300:
+            raise RuntimeError(f'SendGrid returned {response.status_code}')
+
+
+class FileTransport:
+    """Appends each message to a JSON-lines file, for local development."""
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv('MAIL_OUTBOX_FILE', 'outbox.jsonl')
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        line = json.dumps({
+            'to': message.to_email,
+            'subject': message.subject,
+            'text': message.plain_text_content,
+            'html': message.html_content
+        })
+        with self._lock, open(self.path, 'a') as outbox:
+            outbox.write(line + '\n')
+
+
+class MemoryTransport:
+    """Keeps delivered messages in a list, for tests."""
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(message.to_dict())
+
+
+TRANSPORTS = {
+    'sendgrid': SendGridTransport,
+    'file': FileTransport,
+    'memory': MemoryTransport,
+}
+
+
+class MailQueue:
+    """Bounded in-process worker pool that delivers messages from the outbox table.
+
+    Messages are written to the outbox in the caller's transaction and handed to
+    the workers once that transaction commits. A sweeper thread re-dispatches
+    anything still due (retries, overflow when the queue was full, leftovers
+    from a previous process), so the outbox table is the source of truth.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.transport = None
+        self._queue = None
+        self._threads = []
+        self._pid = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def init_app(self, app, transport=None):
+        self.app = app
+        self.transport = transport or TRANSPORTS[os.getenv('MAIL_TRANSPORT', 'sendgrid')]()
+        self.workers = int(os.getenv('MAIL_WORKERS', 2))
+        self.max_attempts = int(os.getenv('MAIL_MAX_ATTEMPTS', 5))
+        self.retry_base = int(os.getenv('MAIL_RETRY_BASE_SECONDS', 30))
+        self.sweep_interval = int(os.getenv('MAIL_SWEEP_INTERVAL_SECONDS', 15))
+        self._queue = queue.Queue(maxsize=int(os.getenv('MAIL_QUEUE_SIZE', 1000)))
+        # The test profile shares one in-memory connection across threads, so there nothing runs in the
+        # background: messages stay pending in the outbox until deliver_due() sends them
+        self.threaded = not app.testing
+        event.listen(db.session, 'after_commit', self._after_commit)
+        event.listen(db.session, 'after_rollback', self._after_rollback)
+        # The sweeper must run even if nothing is enqueued, to resend what a previous process left
+        # in the outbox. gunicorn starts it in post_fork; this covers the development server.
+        app.before_request(self.start)
+
+    def start(self):
+        """Start the worker and sweeper threads, once per process."""
+        if not self.threaded:
+            return
+        if self._threads and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._threads and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                # Threads and queued ids do not survive a fork; a pre-forked worker starts its own
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                self._pid = os.getpid()
+            self._stopping.clear()
+            self._threads = [threading.Thread(target=self._work, name=f'mail-worker-{i}', daemon=True) for i in range(self.workers)]
+            self._threads.append(threading.Thread(target=self._sweep, name='mail-sweeper', daemon=True))
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout=5):
+        """Let in-flight sends finish and stop the threads; undelivered messages stay in the outbox."""
+        with self._lock:
+            self._stopping.set()
+            for thread in self._threads:
+                thread.join(timeout)
+            self._threads = []
+
+    def enqueue(self, to_email, subject, plain_text_content, html_content=None):
+        """Add a message to the outbox in the current transaction; it is dispatched after commit."""
+        message = OutboxMessage(
+            to_email=to_email,
+            subject=subject,
+            plain_text_content=plain_text_content,
+            html_content=html_content
+        )
+        db.session.add(message)
+        db.session.flush()
+        db.session.info.setdefault('outbox_ids', []).append(message.id)
+        return message
+
+    def dispatch(self, message_ids):
+        self.start()
+        for message_id in message_ids:
+            try:
+                self._queue.put_nowait(message_id)
+            except queue.Full:
+                break  # Still pending in the outbox; the sweeper retries later
+
+    def deliver_due(self):
+        """Synchronously deliver every message that is due. Returns the number attempted."""
+        message_ids = self._due_ids()
+        for message_id in message_ids:
+            self._deliver(message_id)
+        return len(message_ids)
+
+    def _after_commit(self, session):
+        message_ids = session.info.pop('outbox_ids', None)
+        if message_ids and self.threaded:
+            self.dispatch(message_ids)
+
+    def _after_rollback(self, session):
+        session.info.pop('outbox_ids', None)
+
+    def _due_ids(self):
+        now = datetime.utcnow()
+        return db.session.scalars(
+            select(OutboxMessage.id)
+            .where(OutboxMessage.status.in_(('pending', 'sending')), OutboxMessage.next_attempt_at <= now)
+            .order_by(OutboxMessage.next_attempt_at)
+            .limit(self._queue.maxsize)
+        ).all()
+
+    def _work(self):
+        while not self._stopping.is_set():
+            try:
+                message_id = self._queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            with self.app.app_context():
+                try:
+                    self._deliver(message_id)
+                except Exception:
+                    db.session.rollback()
+                    logger.exception('Mail worker error for message %s', message_id)
+
+    def _sweep(self):
+        while not self._stopping.wait(self.sweep_interval):
+            with self.app.app_context():
+                try:
+                    message_ids = self._due_ids()
+                except Exception:
+                    logger.exception('Mail sweeper error')
+                    continue
+            for message_id in message_ids:
+                try:
+                    self._queue.put_nowait(message_id)
+                except queue.Full:
+                    break
+
+    def _claim(self, message_id):
+        """Atomically take the lease on a due message so no other worker sends it too."""
+        now = datetime.utcnow()
+        result = db.session.execute(
+            update(OutboxMessage)
+            .where(
+                OutboxMessage.id == message_id,
+                or_(OutboxMessage.status == 'pending', OutboxMessage.status == 'sending'),
+                OutboxMessage.next_attempt_at <= now
+            )
+            .values(status='sending', attempts=OutboxMessage.attempts + 1, next_attempt_at=now + SEND_LEASE)
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    def _deliver(self, message_id):
+        if not self._claim(message_id):
+            return
+        message = db.session.get(OutboxMessage, message_id)
+        try:
+            self.transport.send(message)
+        except Exception as e:
+            message.last_error = str(e)
+            if message.attempts >= self.max_attempts:
+                message.status = 'failed'
+            else:
+                # Exponential backoff: retry_base, 2x, 4x, ...
+                message.status = 'pending'
+                message.next_attempt_at = datetime.utcnow() + timedelta(seconds=self.retry_base * 2 ** (message.attempts - 1))
+            logger.exception('Error sending email %s to %s', message.id, message.to_email)
+        else:
+            message.status = 'sent'
+            message.sent_at = datetime.utcnow()
+            message.last_error = None
+        db.session.commit()
+
+
+mail_queue = MailQueue()
@@ -0,0 +1,229 @@
+# utils/metrics.py
+"""Per-request latency, status and SQL instrumentation, exported at /metrics.
+
+Request timing starts in before_request and is recorded when the response
+is closed, so streamed responses are measured until their last chunk. SQL
+statements are timed with engine cursor events and charged to the route of
+the request that ran them. Statements slower than SLOW_QUERY_MS are written to the slow-query
+log with the shape of their parameters and the database's query plan.
+
+Metrics are kept in process memory; with several workers each one reports its
+own numbers. /metrics exists only when METRICS_TOKEN is set, and then answers
+only requests carrying it as a bearer token.
+"""
+import hmac
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from flask import g, has_request_context, request, Response
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+slow_query_logger = logging.getLogger('sweatjunkies.slow_query')
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def _format_labels(self, labels, extra=()):
+        pairs = list(zip(self.labelnames, labels)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{self._format_labels(labels)} {value}')
+        return lines
+
+
+class Histogram(Counter):
+    def __init__(self, name, documentation, labelnames, buckets):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                # One slot per bucket plus +Inf, then the running sum
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for labels, series in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ('+Inf',), series):
+                    cumulative += count
+                    le = bound if bound == '+Inf' else repr(float(bound))
+                    lines.append(f'{self.name}_bucket{self._format_labels(labels, [("le", le)])} {cumulative}')
+                lines.append(f'{self.name}_sum{self._format_labels(labels)} {series[-1]}')
+                lines.append(f'{self.name}_count{self._format_labels(labels)} {cumulative}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def parameter_shape(parameters, executemany=False):
+    """Describe bound parameters by type only, so logs never carry emails or hashes."""
+    if executemany:
+        parameters = list(parameters)
+        return f'{len(parameters)} x {parameter_shape(parameters[0]) if parameters else "()"}'
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f'{key}: {type(value).__name__}' for key, value in parameters.items()) + '}'
+    return '(' + ', '.join(type(value).__name__ for value in parameters or ()) + ')'
+
+
+class RequestMetrics:
+    """Collects route latency, status counts and SQL cost per request."""
+
+    def __init__(self):
+        self.request_seconds = Histogram(
+            'http_request_duration_seconds', 'Request latency by route.', ('method', 'route'), LATENCY_BUCKETS
+        )
+        self.requests_total = Counter(
+            'http_requests_total', 'Requests by route and status code.', ('method', 'route', 'status')
+        )
+        self.request_queries = Histogram(
+            'db_queries_per_request', 'SQL statements executed per request.', ('method', 'route'), QUERY_COUNT_BUCKETS
+        )
+        self.request_query_seconds = Histogram(
+            'db_query_duration_seconds_per_request', 'Time spent in SQL per request.', ('method', 'route'), LATENCY_BUCKETS
+        )
+        self.slow_queries_total = Counter('db_slow_queries_total', 'Statements over the slow-query threshold.', ('route',))
+        self.slow_query_seconds = None
+        self.token = None
+
+    def init_app(self, app, engine):
+        slow_query_ms = float(os.getenv('SLOW_QUERY_MS', '250'))
+        self.slow_query_seconds = slow_query_ms / 1000 if slow_query_ms > 0 else None
+        log_path = os.getenv('SLOW_QUERY_LOG')
+        if log_path:
+            handler = logging.FileHandler(log_path)
+            handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            slow_query_logger.addHandler(handler)
+        slow_query_logger.setLevel(logging.WARNING)
+
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(engine, 'handle_error', self._handle_error)
+        app.before_request(self._start_request)
+        app.after_request(self._record_status)
+        self.token = os.getenv('METRICS_TOKEN')
+        if self.token:
+            app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+
+    def expose(self):
+        lines = []
+        for metric in (self.request_seconds, self.requests_total, self.request_queries,
+                       self.request_query_seconds, self.slow_queries_total):
+            lines.extend(metric.expose())
+        return '\n'.join(lines) + '\n'
+
+    def metrics_view(self):
+        supplied = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied.encode(), f'Bearer {self.token}'.encode()):
+            return Response('Unauthorized\n', status=401, mimetype='text/plain',
+                            headers={'WWW-Authenticate': 'Bearer'})
+        return Response(self.expose(), mimetype='text/plain; version=0.0.4')
+
+    @staticmethod
+    def _labels():
+        rule = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        return request.method, rule
+
+    def _start_request(self):
+        g.request_metrics = {'started': time.perf_counter(), 'queries': 0, 'query_seconds': 0.0}
+
+    def _record_status(self, response):
+        stats = g.get('request_metrics')
+        if stats is not None:
+            stats['labels'] = self._labels()
+            stats['status'] = str(response.status_code)
+            # Runs once the server has sent the last chunk, so streamed bodies are timed in full
+            response.call_on_close(lambda: self._finish_request(stats))
+        return response
+
+    def _finish_request(self, stats):
+        labels = stats['labels']
+        self.request_seconds.observe(labels, time.perf_counter() - stats['started'])
+        self.requests_total.inc(labels + (stats['status'],))
+        self.request_queries.observe(labels, stats['queries'])
+        self.request_query_seconds.observe(labels, stats['query_seconds'])
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_query_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['metrics_query_started'].pop()
+        route = 'none'
+        stats = g.get('request_metrics') if has_request_context() else None
+        if stats is not None:
+            stats['queries'] += 1
+            stats['query_seconds'] += elapsed
+            route = self._labels()[1]
+        if self.slow_query_seconds is not None and elapsed >= self.slow_query_seconds:
+            self.slow_queries_total.inc((route,))
+            slow_query_logger.warning(
+                'slow query %.1fms route=%s params=%s\n%s\nplan:\n%s',
+                elapsed * 1000, route, parameter_shape(parameters, executemany), statement,
+                self._query_plan(conn, statement, parameters, executemany),
+            )
+
+    def _handle_error(self, exception_context):
+        # A failed statement never reaches after_cursor_execute; drop its start time
+        started = exception_context.connection.info.get('metrics_query_started') if exception_context.connection else None
+        if started:
+            started.pop()
+
+    @staticmethod
+    def _query_plan(conn, statement, parameters, executemany):
+        if executemany or not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return '(not explained)'
+        prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+        # On Postgres any failed statement aborts the request's transaction, so
+        # the EXPLAIN runs in a savepoint that is rolled back if it fails
+        savepoint = conn.dialect.name != 'sqlite'
+        # A raw DBAPI cursor, so the EXPLAIN itself does not fire these events again
+        cursor = conn.connection.cursor()
+        try:
+            if savepoint:
+                cursor.execute('SAVEPOINT slow_query_plan')
+            try:
+                cursor.execute(prefix + statement, parameters)
+                return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+            except Exception as e:
+                if savepoint:
+                    cursor.execute('ROLLBACK TO SAVEPOINT slow_query_plan')
+                return f'(plan unavailable: {e})'
+            finally:
+                if savepoint:
+                    cursor.execute('RELEASE SAVEPOINT slow_query_plan')
+        except Exception as e:
+            # Never let plan logging fail the statement that was being logged
+            return f'(plan unavailable: {e})'
+        finally:
+            cursor.close()
+
+
+request_metrics = RequestMetrics()
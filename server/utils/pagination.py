@@ -0,0 +1,33 @@
+# utils/pagination.py
+import base64
+import binascii
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(date, row_id):
+    """Build an opaque cursor pointing just past the (date, id) of the last row on a page."""
+    raw = f"{date.strftime('%Y-%m-%d')}:{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return the (date, id) pair stored in a cursor, or raise ValueError."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw_date, raw_id = base64.urlsafe_b64decode(padded).decode().split(':')
+        return datetime.strptime(raw_date, '%Y-%m-%d').date(), int(raw_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def parse_limit(raw_limit):
+    """Clamp the requested page size to 1..MAX_PAGE_SIZE, or raise ValueError."""
+    if raw_limit is None:
+        return DEFAULT_PAGE_SIZE
+    limit = int(raw_limit)
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    return min(limit, MAX_PAGE_SIZE)
@@ -0,0 +1,79 @@
+# utils/password_hashing.py
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class PasswordHashingBusy(ServiceUnavailable):
+    description = 'The server is busy handling other sign-ins. Please try again shortly.'
+
+
+class PasswordHasher:
+    """Runs password hashing on a dedicated process pool with a bounded backlog.
+
+    At most `workers + queue_size` hashes are in flight. Past that, callers get
+    PasswordHashingBusy (503 with Retry-After) instead of piling up behind the
+    CPU-heavy work. With PASSWORD_HASH_WORKERS=0 hashing runs inline, which
+    suits the CLI, seeding and tests.
+
+    PASSWORD_HASH_METHOD takes any werkzeug method string, e.g.
+    'pbkdf2:sha256:600000' or 'scrypt:32768:8:1'. Stored hashes made with other
+    parameters are reported by needs_rehash() so login can upgrade them.
+    """
+
+    def __init__(self):
+        self.method = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+        self.workers = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+        self.queue_size = int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', self.workers * 4))
+        self.retry_after = int(os.getenv('PASSWORD_HASH_RETRY_AFTER', 2))
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+        self._method_prefix = None
+
+    @property
+    def pool(self):
+        # Created lazily and per process, so forked server workers never share a pool
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown()
+            self._pool = None
+
+    def _run(self, function, *args):
+        if self.workers <= 0:
+            return function(*args)
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHashingBusy(retry_after=self.retry_after)
+        try:
+            return self.pool.submit(function, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def check(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    @property
+    def method_prefix(self):
+        """The parameter prefix werkzeug writes for the configured method, e.g. 'scrypt:32768:8:1'."""
+        if self._method_prefix is None:
+            self._method_prefix = generate_password_hash('', self.method).split('$', 1)[0]
+        return self._method_prefix
+
+    def needs_rehash(self, password_hash):
+        return password_hash.split('$', 1)[0] != self.method_prefix
+
+
+password_hasher = PasswordHasher()
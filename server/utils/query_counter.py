@@ -0,0 +1,44 @@
+# utils/query_counter.py
+from contextlib import contextmanager
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Collects the SQL statements executed on an engine."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine):
+    """Count every statement executed on `engine` inside the block."""
+    counter = QueryCounter()
+    event.listen(engine, 'before_cursor_execute', counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', counter)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(engine, budget, label='block'):
+    """Fail if the block runs more than `budget` statements on `engine`."""
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > budget:
+        statements = '\n'.join(counter.statements)
+        raise QueryBudgetExceeded(
+            f'{label} ran {counter.count} queries (budget {budget}):\n{statements}'
+        )
@@ -0,0 +1,172 @@
+# utils/race_catalogue.py
+"""Canonical races and an in-memory race-name autocomplete index.
+
+A race is identified by its normalized name, date and distance (see
+normalize_race_name), so every athlete who ran the same event shares one
+row while the distances run at one event stay separate. Distances within
+DISTANCE_TOLERANCE of each other count as the same race. get_or_create_race()
+finds that row or inserts it, tolerating a concurrent insert of the same
+event.
+
+RaceNameIndex keeps two sorted arrays in each process: whole normalized
+names, and every later word-start of them ("marathon" for "boston
+marathon"). A lookup is two binary searches plus a short scan, instead of a
+LIKE '%...%' table scan. The index is built on first use, updated as this
+process commits new races, and rebuilt every RACE_INDEX_TTL seconds to pick
+up races added by other workers.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+from sqlalchemy import event, select, func
+from sqlalchemy.exc import IntegrityError
+from config import db
+from models import Race
+from utils.race_units import distance_range, normalize_race_name, parse_distance
+from utils.upsert import upsert_insert
+
+DEFAULT_SUGGESTIONS = 10
+MAX_SUGGESTIONS = 50
+
+
+def find_race(race_name, race_date, distance_meters):
+    """The catalogue race on race_date whose distance is closest to distance_meters, within tolerance."""
+    low, high = distance_range(distance_meters)
+    return db.session.scalar(
+        select(Race)
+        .where(
+            Race.normalized_name == normalize_race_name(race_name), Race.date == race_date,
+            Race.distance_meters.between(low, high),
+        )
+        .order_by(func.abs(Race.distance_meters - distance_meters))
+        .limit(1)
+    )
+
+
+def get_or_create_race(race_name, race_date, distance):
+    """Return (race, created) for the catalogue entry matching race_name, race_date and distance.
+
+    A matching race keeps its own distance string; the caller's only
+    describes a race that is new to the catalogue. Athletes' own times belong
+    on their RaceParticipation, never on the shared race. Raises ValueError
+    for a distance that does not parse, since the catalogue is keyed on it.
+    """
+    distance_meters = parse_distance(distance)
+    if distance_meters is None:
+        raise ValueError("Invalid distance. Use a number with km, mi or m, e.g. '21.097 km'.")
+    race = find_race(race_name, race_date, distance_meters)
+    if race is not None:
+        return race, False
+
+    race = Race(race_name=race_name.strip(), date=race_date, distance=distance)
+    upsert = upsert_insert(Race)
+    if upsert is not None:
+        # The validators above filled in the derived columns. ON CONFLICT needs no savepoint,
+        # which pysqlite would otherwise commit on release, outside the request's transaction.
+        inserted = db.session.execute(
+            upsert.values(
+                race_name=race.race_name, normalized_name=race.normalized_name, date=race.date,
+                distance=race.distance, distance_meters=race.distance_meters,
+            ).on_conflict_do_nothing(index_elements=['normalized_name', 'date', 'distance_meters'])
+        ).rowcount
+        race = find_race(race_name, race_date, distance_meters)
+        if not inserted:
+            # Another request created the same race after our lookup
+            return race, False
+    else:
+        try:
+            with db.session.begin_nested():
+                db.session.add(race)
+        except IntegrityError:
+            return find_race(race_name, race_date, distance_meters), False
+
+    # Captured now: after commit the instance is expired and must not reload from inside the hook
+    db.session.info.setdefault('new_races', []).append(
+        (race.id, race.normalized_name, race.race_name, race.date, race.distance)
+    )
+    return race, True
+
+
+class RaceNameIndex:
+    """Prefix index over race names, one instance per process."""
+
+    def __init__(self):
+        self.ttl = float(os.getenv('RACE_INDEX_TTL', 300))
+        self._names = []  # Sorted (normalized name, race id)
+        self._words = []  # Sorted (later word-start of a normalized name, race id)
+        self._races = {}  # race id -> (race name, date, distance)
+        self._loaded_at = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        event.listen(db.session, 'after_commit', self._after_commit)
+        event.listen(db.session, 'after_rollback', self._after_rollback)
+
+    @staticmethod
+    def _word_starts(normalized):
+        words = normalized.split()
+        return [' '.join(words[i:]) for i in range(1, len(words))]
+
+    def load(self):
+        """Rebuild the index from the races table."""
+        rows = db.session.execute(select(Race.id, Race.normalized_name, Race.race_name, Race.date, Race.distance)).all()
+        names, words, races = [], [], {}
+        for race_id, normalized, race_name, race_date, distance in rows:
+            names.append((normalized, race_id))
+            words.extend((start, race_id) for start in self._word_starts(normalized))
+            races[race_id] = (race_name, race_date, distance)
+        names.sort()
+        words.sort()
+        with self._lock:
+            self._names, self._words, self._races = names, words, races
+            self._loaded_at = time.monotonic()
+            self._pid = os.getpid()
+
+    def add(self, race_id, normalized, race_name, race_date, distance):
+        with self._lock:
+            if self._loaded_at is None or race_id in self._races:
+                return
+            self._races[race_id] = (race_name, race_date, distance)
+            insort(self._names, (normalized, race_id))
+            for start in self._word_starts(normalized):
+                insort(self._words, (start, race_id))
+
+    def _stale(self):
+        return self._loaded_at is None or self._pid != os.getpid() or time.monotonic() - self._loaded_at > self.ttl
+
+    def search(self, text, limit=DEFAULT_SUGGESTIONS):
+        """Races whose name, or a later word of it, starts with `text`; whole-name matches come first."""
+        prefix = normalize_race_name(text)
+        if not prefix:
+            return []
+        if self._stale():
+            self.load()
+
+        names, words, races = self._names, self._words, self._races
+        found = []
+        seen = set()
+        for entries in (names, words):
+            position = bisect_left(entries, (prefix,))
+            while position < len(entries) and len(found) < limit:
+                key, race_id = entries[position]
+                if not key.startswith(prefix):
+                    break
+                position += 1
+                if race_id in seen or race_id not in races:
+                    continue
+                seen.add(race_id)
+                race_name, race_date, distance = races[race_id]
+                found.append({'id': race_id, 'race_name': race_name, 'date': race_date, 'distance': distance})
+        return found
+
+    def _after_commit(self, session):
+        for race in session.info.pop('new_races', ()):
+            self.add(*race)
+
+    def _after_rollback(self, session):
+        session.info.pop('new_races', None)
+
+
+race_index = RaceNameIndex()
@@ -0,0 +1,95 @@
+# utils/race_units.py
+import re
+import unicodedata
+
+# Meters per unit for the distance suffixes athletes type
+DISTANCE_UNITS = {
+    'm': 1, 'meter': 1, 'meters': 1, 'metre': 1, 'metres': 1,
+    'k': 1000, 'km': 1000, 'kms': 1000, 'kilometer': 1000, 'kilometers': 1000, 'kilometre': 1000, 'kilometres': 1000,
+    'mi': 1609.344, 'mile': 1609.344, 'miles': 1609.344,
+}
+
+NAMED_DISTANCES = {
+    'marathon': 42195,
+    'half marathon': 21097,
+    'half': 21097,
+}
+
+_DISTANCE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([a-z]*)\s*$')
+_DURATION = re.compile(r'^\s*(?:(\d+):)?(\d{1,2}):(\d{1,2})\s*$')
+_NAME_SEPARATORS = re.compile(r'[\W_]+')
+
+
+def parse_distance(value):
+    """Parse strings like '21.097 km', '5K', '13.1 mi' or 'Marathon' into whole meters.
+
+    A bare number is taken as kilometers. Returns None for a missing or
+    unrecognized value and raises ValueError for anything that is not a string.
+    """
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValueError("Distance must be a string such as '21.097 km'")
+    text = value.strip().lower()
+    if text in NAMED_DISTANCES:
+        return NAMED_DISTANCES[text]
+    match = _DISTANCE.match(text)
+    if not match:
+        return None
+    number, unit = match.groups()
+    factor = DISTANCE_UNITS.get(unit or 'km')
+    if factor is None:
+        return None
+    return round(float(number) * factor)
+
+
+def parse_duration(value):
+    """Parse 'HH:MM:SS' or 'MM:SS' into seconds.
+
+    Returns None for a missing or unrecognized value and raises ValueError
+    for anything that is not a string.
+    """
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValueError("Times must be strings such as '01:45:30'")
+    match = _DURATION.match(value)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    # Minutes may run past 59 only when no hours are given, e.g. '75:10'
+    if (hours is not None and int(minutes) > 59) or int(seconds) > 59:
+        return None
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds)
+
+
+# Courses are rarely measured exactly; '21.1 km' and '13.1 mi' both count as a half marathon
+DISTANCE_TOLERANCE = 0.01
+
+
+def distance_range(meters):
+    """Return the (low, high) meters that count as the same distance as `meters`."""
+    return round(meters * (1 - DISTANCE_TOLERANCE)), round(meters * (1 + DISTANCE_TOLERANCE))
+
+
+def format_duration(seconds):
+    """Format whole seconds as 'HH:MM:SS'."""
+    seconds = int(round(seconds))
+    return f'{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}'
+
+
+def normalize_race_name(value):
+    """Fold a race name to the key the catalogue deduplicates on.
+
+    Case, accents, punctuation and spacing are ignored, so 'Boston Marathon',
+    ' boston  MARATHON!' and 'Bóston-Marathon' are the same race. Letters of
+    any script are kept, so '東京マラソン' is a name too. Raises ValueError for
+    anything that is not a string.
+    """
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        raise ValueError('Race name must be a string')
+    # Decompose, then drop the combining marks (accents) and fold case
+    text = ''.join(char for char in unicodedata.normalize('NFKD', value) if unicodedata.category(char) != 'Mn')
+    return ' '.join(_NAME_SEPARATORS.sub(' ', text.casefold()).split())
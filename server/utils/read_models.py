@@ -0,0 +1,150 @@
+# utils/read_models.py
+"""Read-only query layer for list endpoints.
+
+Selects only the columns a response needs through SQLAlchemy Core and maps
+each row into a frozen __slots__ dataclass. Nothing enters the session's
+identity map and no attribute instrumentation is set up per row; orjson
+encodes the dataclasses directly (see utils/json_encoding.py). The JSON is
+field-for-field what the matching model's to_dict() produces.
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional
+from sqlalchemy import select, tuple_
+from config import db
+from models import Athlete, Activity, Race, RaceParticipation
+
+
+@dataclass(frozen=True)
+class ActivityRow:
+    __slots__ = ('id', 'description', 'duration', 'date', 'athlete_id', 'athlete_name')
+    id: int
+    description: str
+    duration: int
+    date: date
+    athlete_id: int
+    athlete_name: str
+
+
+@dataclass(frozen=True)
+class RaceRow:
+    __slots__ = ('id', 'race_name', 'date', 'distance', 'finish_time', 'distance_meters', 'finish_time_seconds')
+    id: int
+    race_name: str
+    date: date
+    distance: str
+    finish_time: Optional[str]
+    distance_meters: Optional[int]
+    finish_time_seconds: Optional[int]
+
+
+@dataclass(frozen=True)
+class ParticipationRow:
+    __slots__ = ('completion_time', 'completion_time_seconds', 'race_name', 'athlete_name')
+    completion_time: Optional[str]
+    completion_time_seconds: Optional[int]
+    race_name: Optional[str]
+    athlete_name: Optional[str]
+
+
+@dataclass(frozen=True)
+class AthleteRow:
+    __slots__ = ('id', 'first_name', 'last_name', 'email', 'activities', 'races')
+    id: int
+    first_name: str
+    last_name: str
+    email: str
+    activities: List[ActivityRow]
+    races: List[RaceRow]
+
+
+ACTIVITY_COLUMNS = (Activity.id, Activity.description, Activity.duration, Activity.date, Activity.athlete_id)
+# An athlete's races report their own time from the participation, as Race.to_dict(participation) does
+RACE_COLUMNS = (
+    Race.id, Race.race_name, Race.date, Race.distance, RaceParticipation.completion_time, Race.distance_meters,
+    RaceParticipation.completion_time_seconds,
+)
+
+
+def activity_page(athlete, limit, cursor=None, date_from=None, date_to=None):
+    """An athlete's activities newest first, keyset-paginated on (date, id); a limit of None returns them all.
+
+    `athlete` is the caller's CurrentAthlete, which already carries the name
+    every row repeats, so no join is needed.
+    """
+    statement = select(*ACTIVITY_COLUMNS).where(Activity.athlete_id == athlete.id)
+    if date_from:
+        statement = statement.where(Activity.date >= date_from)
+    if date_to:
+        statement = statement.where(Activity.date <= date_to)
+    if cursor:
+        statement = statement.where(tuple_(Activity.date, Activity.id) < tuple_(*cursor))
+    statement = statement.order_by(Activity.date.desc(), Activity.id.desc()).limit(limit)
+
+    athlete_name = f'{athlete.first_name} {athlete.last_name}'
+    return [ActivityRow(*row, athlete_name) for row in db.session.execute(statement)]
+
+
+def athlete_races(athlete_id, meters_range=None, sort_by_time=False):
+    """Races an athlete took part in, optionally within a distance range or fastest first."""
+    statement = (
+        select(*RACE_COLUMNS)
+        .join(RaceParticipation, RaceParticipation.race_id == Race.id)
+        .where(RaceParticipation.athlete_id == athlete_id)
+    )
+    if meters_range:
+        statement = statement.where(Race.distance_meters.between(*meters_range))
+    if sort_by_time:
+        statement = statement.order_by(
+            RaceParticipation.completion_time_seconds.is_(None), RaceParticipation.completion_time_seconds
+        )
+    return [RaceRow(*row) for row in db.session.execute(statement)]
+
+
+def athlete_participations(athlete_id):
+    statement = (
+        select(
+            RaceParticipation.completion_time, RaceParticipation.completion_time_seconds,
+            Race.race_name, Athlete.first_name, Athlete.last_name,
+        )
+        .outerjoin(Race, Race.id == RaceParticipation.race_id)
+        .outerjoin(Athlete, Athlete.id == RaceParticipation.athlete_id)
+        .where(RaceParticipation.athlete_id == athlete_id)
+        .order_by(RaceParticipation.id)
+    )
+    return [
+        ParticipationRow(
+            completion_time, seconds, race_name,
+            f'{first_name} {last_name}' if first_name is not None else None,
+        )
+        for completion_time, seconds, race_name, first_name, last_name in db.session.execute(statement)
+    ]
+
+
+def all_athletes():
+    """Every athlete with their activities and races, in three statements."""
+    athletes = {}
+    names = {}
+    for athlete_id, first_name, last_name, email in db.session.execute(
+        select(Athlete.id, Athlete.first_name, Athlete.last_name, Athlete.email)
+        .where(Athlete.deleted_at.is_(None))
+        .order_by(Athlete.id)
+    ):
+        athletes[athlete_id] = AthleteRow(athlete_id, first_name, last_name, email, [], [])
+        names[athlete_id] = f'{first_name} {last_name}'
+
+    for row in db.session.execute(select(*ACTIVITY_COLUMNS).order_by(Activity.id)):
+        athlete = athletes.get(row.athlete_id)
+        if athlete is not None:  # None while a deleted athlete's activities are being purged
+            athlete.activities.append(ActivityRow(*row, names[row.athlete_id]))
+
+    for athlete_id, *race in db.session.execute(
+        select(RaceParticipation.athlete_id, *RACE_COLUMNS)
+        .join(Race, Race.id == RaceParticipation.race_id)
+        .order_by(RaceParticipation.id)
+    ):
+        athlete = athletes.get(athlete_id)
+        if athlete is not None:  # Deleted athletes are left out, as above
+            athlete.races.append(RaceRow(*race))
+
+    return list(athletes.values())
@@ -0,0 +1,120 @@
+# utils/results_import.py
+from sqlalchemy import select, delete, insert, func
+from config import db
+from models import Athlete, RaceParticipation
+from utils.activity_import import MAX_REPORTED_ERRORS
+from utils.race_units import parse_duration
+from utils.upsert import upsert_insert
+
+RESULTS_BATCH_SIZE = 2000
+
+
+def validate_result(row):
+    """Return (email, completion_time, completion_time_seconds) for a valid row, or raise ValueError."""
+    if not isinstance(row, dict):
+        raise ValueError('Row must be an object with email and completion_time')
+
+    email = row.get('email')
+    if not isinstance(email, str) or '@' not in email:
+        raise ValueError('A valid email is required')
+
+    completion_time = row.get('completion_time')
+    seconds = parse_duration(completion_time) if isinstance(completion_time, str) else None
+    if seconds is None:
+        raise ValueError('Invalid completion_time. Use HH:MM:SS.')
+
+    return email.strip(), completion_time.strip(), seconds
+
+
+def _athlete_ids(emails):
+    """Map lower-cased emails to athlete ids with one IN query, ignoring case on both sides."""
+    lowered = func.lower(Athlete.email)
+    rows = db.session.execute(
+        select(Athlete.id, lowered).where(lowered.in_({email.lower() for email in emails}))
+    )
+    return {email: athlete_id for athlete_id, email in rows}
+
+
+def _upsert_participations(race_id, results):
+    """Write {athlete_id: (completion_time, seconds)} for one race as a single bulk statement."""
+    rows = [
+        {'race_id': race_id, 'athlete_id': athlete_id, 'completion_time': time, 'completion_time_seconds': seconds}
+        for athlete_id, (time, seconds) in results.items()
+    ]
+    upsert = upsert_insert(RaceParticipation)
+    if upsert is not None:
+        db.session.execute(
+            upsert.on_conflict_do_update(
+                index_elements=['race_id', 'athlete_id'],
+                set_={
+                    'completion_time': upsert.excluded.completion_time,
+                    'completion_time_seconds': upsert.excluded.completion_time_seconds,
+                },
+            ),
+            rows,
+        )
+        return
+
+    db.session.execute(
+        delete(RaceParticipation)
+        .where(RaceParticipation.race_id == race_id, RaceParticipation.athlete_id.in_(list(results)))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(insert(RaceParticipation.__table__), rows)
+
+
+def import_results(race_id, rows, batch_size=RESULTS_BATCH_SIZE, only_email=None):
+    """Stream a race's results into race_participations, one batch of rows at a time.
+
+    Each batch resolves its emails with one IN query and upserts the matched
+    finishers with one bulk statement, so memory stays bounded by `batch_size`
+    however long the file is. Everything runs in the caller's transaction.
+    Returns (report, athlete_ids): the report holds the imported count plus
+    counts and the first MAX_REPORTED_ERRORS entries of invalid and unmatched
+    rows; athlete_ids are the matched athletes, whose cached data is now stale.
+
+    With `only_email` set, a row for any other email raises PermissionError
+    before anything is resolved, so a caller who is not an organiser can
+    record only their own result and learns nothing about other accounts.
+    """
+    report = {'imported': 0, 'error_count': 0, 'errors': [], 'unmatched_count': 0, 'unmatched': []}
+    athlete_ids = set()
+    batch = []
+
+    def flush():
+        known = _athlete_ids(email for _, email, _, _ in batch)
+        results = {}
+        for row_number, email, completion_time, seconds in batch:
+            athlete_id = known.get(email.lower())
+            if athlete_id is None:
+                report['unmatched_count'] += 1
+                if len(report['unmatched']) < MAX_REPORTED_ERRORS:
+                    report['unmatched'].append({'row': row_number, 'email': email})
+                continue
+            # A finisher listed twice keeps their last time, as a re-upload would
+            results[athlete_id] = (completion_time, seconds)
+        if results:
+            _upsert_participations(race_id, results)
+            athlete_ids.update(results)
+        batch.clear()
+
+    for row_number, row in enumerate(rows, start=1):
+        try:
+            email, completion_time, seconds = validate_result(row)
+        except ValueError as e:
+            report['error_count'] += 1
+            if len(report['errors']) < MAX_REPORTED_ERRORS:
+                report['errors'].append({'row': row_number, 'message': str(e)})
+            continue
+        if only_email is not None and email.lower() != only_email.lower():
+            raise PermissionError(f'Row {row_number}: only race organisers can import results for other athletes')
+
+        batch.append((row_number, email, completion_time, seconds))
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    # Athletes listed in several batches were upserted more than once but count once
+    report['imported'] = len(athlete_ids)
+    return report, athlete_ids
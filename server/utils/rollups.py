@@ -0,0 +1,105 @@
+# utils/rollups.py
+from collections import defaultdict
+from datetime import timedelta
+from sqlalchemy import select, insert
+from config import db
+from models import Activity, TrainingRollup
+from utils.upsert import upsert_insert
+
+PERIODS = ('week', 'month')
+
+def activity_type(description):
+    """Activities have no type column, so the normalized description stands in for one."""
+    return description.strip().lower()[:100]
+
+
+def period_start(period, day):
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def aggregate(rows, totals=None):
+    """Sum (athlete_id, date, description, duration) rows into {bucket key: [duration, count]}.
+
+    Pass the result back in as `totals` to keep accumulating across batches.
+    """
+    if totals is None:
+        totals = defaultdict(lambda: [0, 0])
+    for athlete_id, day, description, duration in rows:
+        kind = activity_type(description)
+        for period in PERIODS:
+            bucket = totals[(athlete_id, period, period_start(period, day), kind)]
+            bucket[0] += duration
+            bucket[1] += 1
+    return totals
+
+
+def _add_to_bucket(key, duration, count):
+    athlete_id, period, start, kind = key
+    upsert = upsert_insert(TrainingRollup)
+    if upsert is not None:
+        db.session.execute(
+            upsert.values(
+                athlete_id=athlete_id, period=period, period_start=start, activity_type=kind,
+                total_duration=duration, activity_count=count,
+            ).on_conflict_do_update(
+                index_elements=['athlete_id', 'period', 'period_start', 'activity_type'],
+                set_={
+                    'total_duration': TrainingRollup.total_duration + duration,
+                    'activity_count': TrainingRollup.activity_count + count,
+                },
+            )
+        )
+        return
+
+    rollup = TrainingRollup.query.filter_by(
+        athlete_id=athlete_id, period=period, period_start=start, activity_type=kind
+    ).with_for_update().first()
+    if rollup is None:
+        db.session.add(TrainingRollup(
+            athlete_id=athlete_id, period=period, period_start=start, activity_type=kind,
+            total_duration=duration, activity_count=count,
+        ))
+    else:
+        rollup.total_duration += duration
+        rollup.activity_count += count
+
+
+def record_totals(totals):
+    """Apply totals built by aggregate() to the rollups, one upsert per bucket."""
+    for key, (duration, count) in totals.items():
+        _add_to_bucket(key, duration, count)
+
+
+def record_activity_rows(rows):
+    """Fold (athlete_id, date, description, duration) rows into the rollups, in the caller's transaction."""
+    record_totals(aggregate(rows))
+
+
+def record_activity(activity):
+    """Fold a new activity into the rollups; call before the session commits."""
+    record_activity_rows([(activity.athlete_id, activity.date, activity.description, activity.duration)])
+
+
+def rebuild_rollups(athlete_id=None, batch_size=1000):
+    """Recompute rollups from the activities table, for one athlete or everyone."""
+    delete = TrainingRollup.__table__.delete()
+    activities = select(Activity.athlete_id, Activity.date, Activity.description, Activity.duration)
+    if athlete_id is not None:
+        delete = delete.where(TrainingRollup.athlete_id == athlete_id)
+        activities = activities.where(Activity.athlete_id == athlete_id)
+
+    totals = aggregate(db.session.execute(activities.execution_options(yield_per=batch_size)))
+    db.session.execute(delete)
+    rows = [
+        {
+            'athlete_id': key[0], 'period': key[1], 'period_start': key[2], 'activity_type': key[3],
+            'total_duration': duration, 'activity_count': count,
+        }
+        for key, (duration, count) in totals.items()
+    ]
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(insert(TrainingRollup.__table__), rows[start:start + batch_size])
+    db.session.commit()
+    return len(rows)
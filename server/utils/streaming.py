@@ -0,0 +1,46 @@
+# utils/streaming.py
+import csv
+from flask import Response, stream_with_context
+from utils.json_encoding import dumps
+
+# Rows fetched per round trip when streaming large result sets
+STREAM_BATCH_SIZE = 1000
+
+
+def stream_json_array(items):
+    """Yield a JSON array one encoded element at a time."""
+    yield '['
+    first = True
+    for item in items:
+        if first:
+            first = False
+            yield dumps(item)
+        else:
+            yield ',' + dumps(item)
+    yield ']'
+
+
+def streaming_response(chunks, mimetype, headers=None):
+    """Wrap a generator in a response that keeps the request context alive while streaming."""
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+
+def stream_ndjson(records):
+    """Yield one JSON document per line."""
+    for record in records:
+        yield dumps(record) + '\n'
+
+
+class _LineBuffer:
+    """File-like sink that hands back whatever csv.writer just wrote."""
+
+    def write(self, line):
+        return line
+
+
+def stream_csv(header, rows):
+    """Yield a CSV document one encoded line at a time."""
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
@@ -0,0 +1,15 @@
+# utils/upsert.py
+from sqlalchemy.dialects import postgresql, sqlite
+from config import db
+
+# Dialects that support INSERT ... ON CONFLICT DO UPDATE
+_UPSERT_INSERTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+def upsert_insert(model):
+    """Return an INSERT for `model` that supports on_conflict_do_update, or None if the dialect has no upsert."""
+    insert = _UPSERT_INSERTS.get(db.engine.dialect.name)
+    return insert(model) if insert is not None else None
@@ -0,0 +1,11 @@
+# wsgi.py
+"""Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+
+Routes, extensions and error handlers are registered when app.py is
+imported, so this module only exposes that application. Under gunicorn the
+import runs once in the master (preload_app) and the workers fork from it,
+so each worker starts with the app already loaded.
+
+The schema is managed by `flask db upgrade`; nothing here creates tables.
+"""
+from app import app